@@ -0,0 +1,76 @@
+"""Baseline schema: players, courts, teams and court assignments
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+The app also creates missing tables with create_all on startup, so a
+database may already have some or all of the schema this chain builds.
+Every revision therefore checks what exists and only adds what is
+missing: `alembic upgrade head` brings an existing deployment up to date
+and simply stamps a database create_all built from the current models.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "courts" not in tables:
+        op.create_table(
+            "courts",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("court_type", sa.String(length=255), nullable=False),
+            sa.PrimaryKeyConstraint("id", name=op.f("pk_courts")),
+        )
+    if "teams" not in tables:
+        op.create_table(
+            "teams",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("number", sa.String(length=255), nullable=False),
+            sa.PrimaryKeyConstraint("id", name=op.f("pk_teams")),
+        )
+    if "players" not in tables:
+        op.create_table(
+            "players",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=255), nullable=False),
+            sa.Column("email", sa.String(length=255), nullable=True),
+            sa.Column("qualification", sa.String(length=255), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("court_id", sa.Integer(), nullable=True),
+            sa.Column("team_id", sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(["court_id"], ["courts.id"], name=op.f("fk_players_court_id_courts")),
+            sa.ForeignKeyConstraint(["team_id"], ["teams.id"], name=op.f("fk_players_team_id_teams")),
+            sa.PrimaryKeyConstraint("id", name=op.f("pk_players")),
+        )
+    if "court_assignments" not in tables:
+        op.create_table(
+            "court_assignments",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("player_id", sa.Integer(), nullable=False),
+            sa.Column("court_id", sa.Integer(), nullable=False),
+            sa.Column("timestamp", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["court_id"], ["courts.id"], name=op.f("fk_court_assignments_court_id_courts")),
+            sa.ForeignKeyConstraint(["player_id"], ["players.id"], name=op.f("fk_court_assignments_player_id_players")),
+            sa.PrimaryKeyConstraint("id", name=op.f("pk_court_assignments")),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("court_assignments")
+    op.drop_table("players")
+    op.drop_table("teams")
+    op.drop_table("courts")
@@ -0,0 +1,38 @@
+"""Queue fairness bookkeeping on players (queued_at, queued_pass, games_played)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("players")}
+    with op.batch_alter_table("players") as batch_op:
+        if "queued_at" not in columns:
+            batch_op.add_column(sa.Column("queued_at", sa.DateTime(), nullable=True))
+        if "queued_pass" not in columns:
+            batch_op.add_column(sa.Column("queued_pass", sa.Integer(), nullable=False, server_default="0"))
+        if "games_played" not in columns:
+            batch_op.add_column(sa.Column("games_played", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("players") as batch_op:
+        batch_op.drop_column("games_played")
+        batch_op.drop_column("queued_pass")
+        batch_op.drop_column("queued_at")
@@ -0,0 +1,39 @@
+"""Court cascade topology (Court.feeds_court_id, Court.fill_priority)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("courts")}
+    with op.batch_alter_table("courts") as batch_op:
+        if "feeds_court_id" not in columns:
+            batch_op.add_column(sa.Column("feeds_court_id", sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                op.f("fk_courts_feeds_court_id_courts"), "courts", ["feeds_court_id"], ["id"]
+            )
+        if "fill_priority" not in columns:
+            batch_op.add_column(sa.Column("fill_priority", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("courts") as batch_op:
+        batch_op.drop_constraint(op.f("fk_courts_feeds_court_id_courts"), type_="foreignkey")
+        batch_op.drop_column("fill_priority")
+        batch_op.drop_column("feeds_court_id")
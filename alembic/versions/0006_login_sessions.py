@@ -0,0 +1,45 @@
+"""Login sessions table and an index on players.email
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    if "sessions" not in inspector.get_table_names():
+        op.create_table(
+            "sessions",
+            sa.Column("id", sa.String(length=64), nullable=False),
+            sa.Column("player_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("revoked_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["player_id"], ["players.id"], name=op.f("fk_sessions_player_id_players"),
+                                    ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id", name=op.f("pk_sessions")),
+        )
+        op.create_index(op.f("ix_sessions_player_id"), "sessions", ["player_id"])
+    if "ix_players_email" not in {i["name"] for i in inspector.get_indexes("players")}:
+        op.create_index(op.f("ix_players_email"), "players", ["email"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_players_email"), table_name="players")
+    op.drop_index(op.f("ix_sessions_player_id"), table_name="sessions")
+    op.drop_table("sessions")
@@ -0,0 +1,32 @@
+"""Player skill rating (Elo scale) for balanced matches
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("players")}
+    if "rating" not in columns:
+        with op.batch_alter_table("players") as batch_op:
+            batch_op.add_column(sa.Column("rating", sa.Float(), nullable=False, server_default="1500"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("players") as batch_op:
+        batch_op.drop_column("rating")
@@ -0,0 +1,57 @@
+"""Match results and their players, for background rating updates
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "match_results" not in tables:
+        op.create_table(
+            "match_results",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("court_id", sa.Integer(), nullable=True),
+            sa.Column("winner", sa.String(length=1), nullable=False),
+            sa.Column("score_a", sa.Integer(), nullable=True),
+            sa.Column("score_b", sa.Integer(), nullable=True),
+            sa.Column("recorded_at", sa.DateTime(), nullable=False),
+            sa.Column("rated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["court_id"], ["courts.id"], name=op.f("fk_match_results_court_id_courts"),
+                                    ondelete="SET NULL"),
+            sa.PrimaryKeyConstraint("id", name=op.f("pk_match_results")),
+        )
+        op.create_index(op.f("ix_match_results_rated_at"), "match_results", ["rated_at"])
+    if "match_players" not in tables:
+        op.create_table(
+            "match_players",
+            sa.Column("result_id", sa.Integer(), nullable=False),
+            sa.Column("player_id", sa.Integer(), nullable=False),
+            sa.Column("side", sa.String(length=1), nullable=False),
+            sa.ForeignKeyConstraint(["player_id"], ["players.id"], name=op.f("fk_match_players_player_id_players"),
+                                    ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["result_id"], ["match_results.id"],
+                                    name=op.f("fk_match_players_result_id_match_results"), ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("result_id", "player_id", name=op.f("pk_match_players")),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("match_players")
+    op.drop_index(op.f("ix_match_results_rated_at"), table_name="match_results")
+    op.drop_table("match_results")
@@ -0,0 +1,41 @@
+"""Analytics rollup buckets (per minute and per hour)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "analytics_rollups" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "analytics_rollups",
+            sa.Column("resolution", sa.String(length=8), nullable=False),
+            sa.Column("bucket_start", sa.DateTime(), nullable=False),
+            sa.Column("metric", sa.String(length=32), nullable=False),
+            sa.Column("key", sa.String(length=64), nullable=False),
+            sa.Column("total", sa.Float(), nullable=False),
+            sa.Column("capacity", sa.Float(), nullable=False),
+            sa.Column("samples", sa.Integer(), nullable=False),
+            sa.Column("sketch", sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint("resolution", "bucket_start", "metric", "key",
+                                    name=op.f("pk_analytics_rollups")),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("analytics_rollups")
@@ -0,0 +1,32 @@
+"""Per-court capacity (players per game)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("courts")}
+    if "capacity" not in columns:
+        with op.batch_alter_table("courts") as batch_op:
+            batch_op.add_column(sa.Column("capacity", sa.Integer(), nullable=False, server_default="4"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("courts") as batch_op:
+        batch_op.drop_column("capacity")
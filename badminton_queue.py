@@ -1,29 +1,42 @@
 # main.py
-from typing import Annotated
+from functools import lru_cache
 from fastapi import FastAPI, Depends, Request
-from src.database.models import Base
-from src.database.database import engine
+from src.lifespan import lifespan
 from src.api.courts import court_router
 from src.api.queue import queue_router
 from src.api.players import player_router
 from src.api.automation import automation_router
 from src.api.auth import auth_router
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
+from src.api.health import health_router
+from src.api.teams import team_router
+from src.api.analytics import analytics_router
+from src.assets import PrecompressedStaticFiles, configure_templates
+from src.compression import SelectiveGZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
+from src import config
 
-app = FastAPI()
+# Tables are created by the lifespan handler in the background, so the
+# worker can answer /api/health before the database is reachable
+app = FastAPI(lifespan=lifespan)
 
-Base.metadata.create_all(bind=engine)
+app.include_router(health_router, prefix="/api")
 app.include_router(auth_router, prefix="/api/auth")
 app.include_router(court_router, prefix="/api/courts")
 app.include_router(queue_router, prefix="/api/queue")
 app.include_router(player_router, prefix="/api/players")
 app.include_router(automation_router, prefix="/api/automation")
+app.include_router(team_router, prefix="/api/teams")
+app.include_router(analytics_router, prefix="/api/analytics")
 
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+
+
+@lru_cache(maxsize=None)
+def get_templates():
+    # Jinja2 is only needed for page routes, keep it off the cold start path
+    from fastapi.templating import Jinja2Templates
+    return configure_templates(Jinja2Templates(directory="templates"))
 
 origins = [
     "http://localhost:8000",
@@ -41,12 +54,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses for phones on hall Wi-Fi; precompressed static
+# files and the server-sent event stream are excluded (src/compression.py)
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=config.COMPRESSION_MIN_BYTES,
+    compresslevel=config.COMPRESSION_LEVEL,
+)
+
 
 @app.get("/")
 def root(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return get_templates().TemplateResponse(request, "index.html")
 
 @app.get("/login")
 def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return get_templates().TemplateResponse(request, "login.html")
 
+@app.get("/dashboard")
+def player_dashboard(request: Request):
+    return get_templates().TemplateResponse(request, "player_dashboard.html")
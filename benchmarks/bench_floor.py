@@ -0,0 +1,109 @@
+"""Floor state benchmark.
+
+Loads a large floor (every player active, most of them queued) from an
+in-memory SQLite database as full ORM instances and as the slotted
+FloorState, and reports build time and memory held by the result of each.
+Also times building FloorState from already fetched row tuples, which is
+the cost left once the query itself is out of the picture.
+
+    python benchmarks/bench_floor.py --players 100000
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the app's module-level engine off the real database
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from sqlalchemy import create_engine, insert, or_, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base, Court, Player
+from src.services.floor import COURT_COLUMNS, PLAYER_COLUMNS, FloorState
+
+
+def populate(engine, players: int, courts: int):
+    with engine.begin() as connection:
+        connection.execute(insert(Court), [
+            {"name": f"C{i}", "court_type": "advanced" if i % 3 == 0 else "intermediate"}
+            for i in range(courts)
+        ])
+        connection.execute(insert(Player), [
+            {
+                "name": f"Player {i}",
+                "qualification": "advanced" if i % 3 == 0 else "intermediate",
+                "is_active": True,
+                "court_id": (i % courts) + 1 if i < courts * 4 else None,
+                "queued_pass": 0,
+                "games_played": 0,
+                "version": 1,
+            }
+            for i in range(players)
+        ])
+
+
+def measure(build, repeat: int):
+    """(median seconds, bytes still held by the result)"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = build()
+        times.append(time.perf_counter() - start)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(times), held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=100000)
+    parser.add_argument("--courts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    populate(engine, args.players, args.courts)
+    session_factory = sessionmaker(bind=engine)
+
+    def orm_floor():
+        with session_factory() as db:
+            players = db.query(Player).filter(
+                or_(Player.is_active == True, Player.court_id.is_not(None))).all()
+            courts = db.query(Court).all()
+            db.expunge_all()
+            return players, courts
+
+    def slotted_floor():
+        with session_factory() as db:
+            return FloorState.load(db)
+
+    with session_factory() as db:
+        player_rows = db.execute(select(*PLAYER_COLUMNS).order_by(Player.id)).all()
+        court_rows = db.execute(select(*COURT_COLUMNS).order_by(Court.id)).all()
+
+    results = [
+        ("ORM instances", measure(orm_floor, args.repeat)),
+        ("FloorState.load", measure(slotted_floor, args.repeat)),
+        ("FloorState from tuples", measure(lambda: FloorState(player_rows, court_rows), args.repeat)),
+    ]
+    print(f"players: {args.players}, courts: {args.courts}")
+    for name, (seconds, held) in results:
+        print(f"  {name:24} {seconds * 1000:8.1f} ms  {held / 2**20:7.1f} MiB "
+              f"({held / args.players:.0f} B/player)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Balanced match builder benchmark.
+
+Times build_match() alone over consecutive candidate windows (one per
+court), then a full fill pass of empty courts from a rated queue on an
+in-memory SQLite database, with and without match balancing, and reports
+the average rating gap between the two sides of the games built.
+
+    python benchmarks/bench_matchmaking.py --players 500 --courts 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the app's module-level engine off the real database
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from sqlalchemy import insert, update
+
+from src import config
+from src.api.queue import auto_fill_courts_internal
+from src.database.database import SessionLocal, engine, utcnow
+from src.database.models import Base, Court, Player
+from src.services.fairness import fair_queue
+from src.services.floor import PlayerState
+from src.services.matchmaking import build_match
+
+
+def rated_players(count: int, seed: int):
+    rng = random.Random(seed)
+    return [round(rng.gauss(1500, 200)) for _ in range(count)]
+
+
+def bench_builder(ratings, courts: int, window: int, repeat: int):
+    now = utcnow()
+    players = [PlayerState(i, f"P{i}", "advanced", True, None, now, 0, 0, 1, None, r)
+               for i, r in enumerate(ratings)]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        remaining = list(players)
+        for _ in range(courts):
+            side_a, side_b = build_match(remaining[:window], lambda p: None)
+            chosen = {p.id for p in side_a + side_b}
+            remaining = [p for p in remaining if p.id not in chosen]
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_fill_pass(ratings, courts: int, balanced: bool):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    queued_at = utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(Court), [
+            {"name": f"C{i}", "court_type": "advanced"} for i in range(courts)
+        ])
+        connection.execute(insert(Player), [
+            {"name": f"P{i}", "qualification": "advanced", "is_active": True,
+             "queued_at": queued_at, "queued_pass": 0, "games_played": 0, "version": 1, "rating": r}
+            for i, r in enumerate(ratings)
+        ])
+    fair_queue.invalidate()
+    config.MATCH_BALANCE_ENABLED = balanced
+    with SessionLocal() as db:
+        fair_queue.ensure_fresh(db)
+        start = time.perf_counter()
+        assignments = auto_fill_courts_internal(db)
+        elapsed = time.perf_counter() - start
+
+    rating = dict(enumerate(ratings, start=1))
+    games = {}
+    for a in assignments:
+        games.setdefault(a["court"]["id"], []).append(a["player"]["id"])
+    # Without balancing the first two and last two players form the sides
+    gaps = [abs(rating[g[0]] + rating[g[1]] - rating[g[2]] - rating[g[3]])
+            for g in games.values() if len(g) == 4]
+    return elapsed, statistics.mean(gaps), len(games)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--courts", type=int, default=50)
+    parser.add_argument("--window", type=int, default=config.MATCH_WINDOW)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    ratings = rated_players(args.players, args.seed)
+    builder = bench_builder(ratings, args.courts, args.window, args.repeat)
+    print(f"players: {args.players}, courts: {args.courts}, window: {args.window}")
+    print(f"  build_match x{args.courts}        {builder * 1000:8.2f} ms")
+    for balanced in (False, True):
+        elapsed, gap, games = bench_fill_pass(ratings, args.courts, balanced)
+        label = "balanced fill pass" if balanced else "plain fill pass"
+        print(f"  {label:24} {elapsed * 1000:8.2f} ms  {games} games, "
+              f"mean side rating gap {gap:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
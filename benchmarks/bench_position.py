@@ -0,0 +1,62 @@
+"""Queue position lookup benchmark.
+
+Fills a FairQueue with queued players, then times position lookups for
+random players through the rank index against finding the player in the
+fully ordered queue (what answering "you are 7th" cost before), and the
+cost of queue moves with the index maintained.
+
+    python benchmarks/bench_position.py --players 1000 --lookups 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the app's module-level engine off the real database
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from src.services.fairness import FairQueue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    start_time = datetime(2026, 1, 1, 18, 0)
+    queue = FairQueue(wait_weight=1, games_weight=10, sit_out_weight=5, resync_interval=30)
+    for player_id in range(args.players):
+        queue.update(player_id, "advanced", True, None,
+                     start_time + timedelta(seconds=rng.uniform(0, 3600)), rng.randrange(4), 0)
+    targets = [rng.randrange(args.players) for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    for player_id in targets:
+        queue.position(player_id)
+    indexed_s = time.perf_counter() - start
+
+    scans = max(1, args.lookups // 100)
+    start = time.perf_counter()
+    for player_id in targets[:scans]:
+        queue.ordered("advanced").index(player_id)
+    scan_s = (time.perf_counter() - start) * args.lookups / scans
+
+    start = time.perf_counter()
+    for player_id in targets:
+        queue.update(player_id, "advanced", True, None,
+                     start_time + timedelta(seconds=rng.uniform(3600, 7200)), rng.randrange(4), 0)
+    move_s = time.perf_counter() - start
+
+    print(f"queued players: {args.players}, lookups: {args.lookups}")
+    print(f"  rank index lookup   {indexed_s / args.lookups * 1e6:8.2f} us/lookup")
+    print(f"  ordered queue scan  {scan_s / args.lookups * 1e6:8.2f} us/lookup (estimated from {scans})")
+    print(f"  queue move          {move_s / args.lookups * 1e6:8.2f} us/move (heap + rank index)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""SQLite profile benchmark.
+
+Runs concurrent writer threads (players moving between queue and courts)
+alongside polling readers against a throwaway SQLite file, once with the
+previous default engine, with the pragma profile (WAL, tuned pragmas) and
+with the profile plus the single-writer queue, and reports throughput and
+lock errors.
+
+    python benchmarks/bench_sqlite.py --writers 8 --readers 8 --seconds 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the app's module-level engine off the real database
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.database import set_sqlite_pragmas
+from src.database.models import Base, Player, Court
+from src.database.write_queue import WriteQueue
+
+
+def build(path: str, pragmas: bool, queue: bool):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    write_queue = None
+    if pragmas:
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    if queue:
+        write_queue = WriteQueue(timeout=5)
+        write_queue.attach(session_factory)
+
+    Base.metadata.create_all(bind=engine)
+    with session_factory() as db:
+        db.add_all(Court(name=f"G{i}", court_type="intermediate") for i in range(1, 9))
+        db.add_all(
+            Player(name=f"Player {i}", email=f"p{i}@example.com",
+                   qualification="intermediate", is_active=True)
+            for i in range(200)
+        )
+        db.commit()
+    return engine, session_factory, write_queue
+
+
+def run(session_factory, writers: int, readers: int, seconds: float):
+    stop = time.perf_counter() + seconds
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def writer(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            with session_factory() as db:
+                try:
+                    player = db.get(Player, rng.randint(1, 200))
+                    player.court_id = None if player.court_id else rng.randint(1, 8)
+                    db.commit()
+                    key = "writes"
+                except Exception:
+                    db.rollback()
+                    key = "errors"
+            with lock:
+                counts[key] += 1
+
+    def reader():
+        while time.perf_counter() < stop:
+            with session_factory() as db:
+                db.query(Player).filter(Player.court_id.is_(None), Player.is_active == True).all()
+            with lock:
+                counts["reads"] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    configs = (("default", False, False), ("profile", True, False), ("queue", True, True))
+    for label, pragmas, queue in configs:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, session_factory, write_queue = build(
+                os.path.join(tmp, "bench.db"), pragmas, queue)
+            counts = run(session_factory, args.writers, args.readers, args.seconds)
+            engine.dispose()
+        print(f"{label:8} writes/s={counts['writes'] / args.seconds:8.1f} "
+              f"reads/s={counts['reads'] / args.seconds:8.1f} errors={counts['errors']}"
+              + (f" max_waiting={write_queue.max_waiting}" if write_queue else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Cold start benchmark.
+
+Boots the app in a fresh interpreter several times and measures how long it
+takes until /api/health answers. Exits non-zero when the median exceeds the
+target so it can run in CI or before a Railway deploy.
+
+    python benchmarks/bench_startup.py --app badminton_queue:app --target-ms 1500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import importlib, time
+start = time.perf_counter()
+module_name, attr = {app!r}.split(":")
+app = getattr(importlib.import_module(module_name), attr)
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    assert client.get("/api/health").status_code == 200
+    healthy = time.perf_counter()
+print(f"{{(imported - start) * 1000:.1f}} {{(healthy - start) * 1000:.1f}}")
+"""
+
+
+def run_once(app: str, database_url: str):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(app=app)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[-2]), float(output[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="badminton_queue:app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=1500.0)
+    parser.add_argument("--database-url", default=None,
+                        help="defaults to a throwaway SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/bench.db"
+        results = [run_once(args.app, database_url) for _ in range(args.runs)]
+
+    import_ms = statistics.median(r[0] for r in results)
+    health_ms = statistics.median(r[1] for r in results)
+    print(f"app:               {args.app}")
+    print(f"runs:              {args.runs}")
+    print(f"import (median):   {import_ms:.1f} ms")
+    print(f"healthy (median):  {health_ms:.1f} ms")
+    print(f"target:            {args.target_ms:.1f} ms")
+
+    if health_ms > args.target_ms:
+        print("FAIL: cold start above target")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Timer wheel benchmark.
+
+Schedules many concurrent games with random durations and advances the
+wheel one tick at a time, reporting the cost per tick and per expiry.
+
+    python benchmarks/bench_timer_wheel.py --games 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.timer_wheel import TimerWheel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--max-minutes", type=float, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    wheel = TimerWheel(tick=1.0)
+    horizon = args.max_minutes * 60
+    wheel.advance(0)
+
+    start = time.perf_counter()
+    for court_id in range(args.games):
+        wheel.schedule(court_id, rng.uniform(1, horizon))
+    schedule_s = time.perf_counter() - start
+
+    ticks = int(horizon) + 1
+    expired = 0
+    start = time.perf_counter()
+    for now in range(1, ticks + 1):
+        expired += len(wheel.advance(now))
+    advance_s = time.perf_counter() - start
+
+    assert expired == args.games and len(wheel) == 0
+    print(f"games:             {args.games}")
+    print(f"schedule:          {schedule_s / args.games * 1e6:.2f} us/game")
+    print(f"advance:           {advance_s / ticks * 1e6:.2f} us/tick over {ticks} ticks")
+    print(f"per expiry:        {advance_s / expired * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ..database.database import get_read_db, utcnow
+from ..database.models import Court
+from ..services.analytics import query_rollups
+
+analytics_router = APIRouter(
+    tags=["analytics"]
+)
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def _time_range(start: Optional[datetime], end: Optional[datetime]):
+    """[start, end) in naive UTC; defaults to the last 24 hours"""
+    if end is not None and end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    if start is not None and start.tzinfo is not None:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    end = end or utcnow()
+    start = start or end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start, end
+
+
+@analytics_router.get("/courts", response_model=List[Dict[str, Any]])
+def court_utilization(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Court utilization over a time range (default: the last 24 hours).
+
+    Utilization is the share of player places in use across the samples
+    taken in the range.
+    """
+    start, end = _time_range(start, end)
+    rollups = query_rollups(db, "court_occupancy", start, end)
+    names = dict(db.query(Court.id, Court.name).all())
+    result = []
+    for key, (total, capacity, samples, _) in sorted(rollups.items(), key=lambda item: int(item[0])):
+        court_id = int(key)
+        result.append({
+            "court_id": court_id,
+            "court_name": names.get(court_id),
+            "utilization": round(total / capacity, 4) if capacity else None,
+            "avg_players": round(total / samples, 2) if samples else None,
+            "samples": samples
+        })
+    return result
+
+
+@analytics_router.get("/queues", response_model=Dict[str, Any])
+def queue_statistics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Queue length and wait times per qualification over a time range.
+
+    Wait percentiles come from merged rollup sketches and are accurate to
+    within 2% of the true value.
+    """
+    start, end = _time_range(start, end)
+    lengths = query_rollups(db, "queue_length", start, end)
+    waits = query_rollups(db, "wait_minutes", start, end)
+    result = {}
+    for qualification in sorted(set(lengths) | set(waits)):
+        total, _, samples, _ = lengths.get(qualification, (0.0, 0.0, 0, None))
+        wait_total, _, wait_count, sketch = waits.get(qualification, (0.0, 0.0, 0, None))
+        stats = {
+            "avg_queue_length": round(total / samples, 2) if samples else None,
+            "players_placed": wait_count,
+            "avg_wait_minutes": round(wait_total / wait_count, 2) if wait_count else None,
+        }
+        for q in PERCENTILES:
+            value = sketch.quantile(q) if sketch is not None else None
+            stats[f"p{round(q * 100)}_wait_minutes"] = round(value, 2) if value is not None else None
+        result[qualification] = stats
+    return {"start": start, "end": end, "queues": result}
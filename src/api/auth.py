@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
 from typing import Optional
@@ -6,11 +6,33 @@ from typing import Optional
 from ..database.database import get_db
 from ..database.models import Player
 from ..database import schemas
+from ..services.autofill import autofill_scheduler
+from ..services.checkin import checkin_buffer
+from ..services.sessions import session_store
+
+SESSION_COOKIE = "session"
 
 auth_router = APIRouter(
     tags=["auth"]
 )
 
+
+def get_current_session(request: Request):
+    """(session id, player id) from a bearer token or the session cookie; 401 otherwise"""
+    token = request.cookies.get(SESSION_COOKIE)
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:].strip()
+    session = session_store.validate(token) if token else None
+    if session is None:
+        raise HTTPException(status_code=401, detail="Not logged in", headers={"WWW-Authenticate": "Bearer"})
+    return session
+
+
+def get_current_player_id(session=Depends(get_current_session)) -> int:
+    return session[1]
+
+
 @auth_router.post("/register", response_model=schemas.Player)
 def register_player(player: schemas.PlayerRegister, db: Session = Depends(get_db)):
     """Register a new player"""
@@ -29,6 +51,7 @@ def register_player(player: schemas.PlayerRegister, db: Session = Depends(get_db
     db.add(db_player)
     db.commit()
     db.refresh(db_player)
+    autofill_scheduler.notify("player_activated")
     return db_player
 
 @auth_router.post("/login")
@@ -39,12 +62,21 @@ def login_player(login_data: schemas.PlayerLogin, response: Response, db: Sessio
     if not player:
         raise HTTPException(status_code=400, detail="Player not found. Please register first.")
     
-    # Set logged in status (you can implement session management here if needed)
-    player.is_active = True
+    token, expires_at = session_store.issue(db, player.id)
     db.commit()
-    
+    if not player.is_active:
+        # Activated by the next check-in flush, in arrival order
+        checkin_buffer.check_in(player.id)
+
+    response.set_cookie(
+        SESSION_COOKIE, token,
+        max_age=int(session_store.ttl.total_seconds()),
+        httponly=True, samesite="lax"
+    )
     return {
         "message": "Login successful",
+        "token": token,
+        "expires_at": expires_at,
         "player": {
             "id": player.id,
             "name": player.name,
@@ -54,10 +86,21 @@ def login_player(login_data: schemas.PlayerLogin, response: Response, db: Sessio
     }
 
 @auth_router.post("/logout")
-def logout_player(email: str, db: Session = Depends(get_db)):
-    """Logout a player"""
-    player = db.query(Player).filter(Player.email == email).first()
+def logout_player(response: Response, session=Depends(get_current_session), db: Session = Depends(get_db)):
+    """Logout the current player and end their session"""
+    session_id, player_id = session
+    checkin_buffer.cancel(player_id)
+    player = db.get(Player, player_id)
     if player:
         player.is_active = False
-        db.commit()
-    return {"message": "Logout successful"}
\ No newline at end of file
+    session_store.revoke(db, session_id)
+    response.delete_cookie(SESSION_COOKIE)
+    return {"message": "Logout successful"}
+
+@auth_router.get("/me", response_model=schemas.Player)
+def current_player(player_id: int = Depends(get_current_player_id), db: Session = Depends(get_db)):
+    """The player the session belongs to"""
+    player = db.get(Player, player_id)
+    if player is None:
+        raise HTTPException(status_code=401, detail="Not logged in")
+    return player
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 import logging
+from functools import partial
 
-from ..database.database import get_db
+from ..database.database import get_db, get_read_db, read_session_factory
 from ..database.models import Court, Player
 from ..database import schemas
+from ..services.fairness import fair_queue
+from ..services.coalescing import read_coalescer
+from ..services.floor import FloorState
+from .queue import player_list
 
 automation_router = APIRouter(
     tags=["automation"]
@@ -20,30 +25,32 @@ class AutoAssignmentService:
         self.db = db
     
     def get_empty_courts(self) -> List[Court]:
-        """Get all courts that have less than 4 players"""
+        """Get all courts that are below capacity"""
         courts = self.db.query(Court).all()
         empty_courts = []
         
         for court in courts:
             player_count = self.db.query(Player).filter(Player.court_id == court.id).count()
-            if player_count < 4:
+            if player_count < court.capacity:
                 empty_courts.append(court)
         
         return empty_courts
     
     def get_queued_players(self, qualification: str) -> List[Player]:
-        """Get players in queue for a specific qualification"""
-        return self.db.query(Player).filter(
+        """Get players in queue for a specific qualification, in fairness order"""
+        players = self.db.query(Player).filter(
             Player.qualification == qualification,
             Player.is_active == True,
             Player.court_id == None
         ).all()
+        players.sort(key=fair_queue.sort_key)
+        return players
     
     def can_assign_to_court(self, player: Player, court: Court) -> bool:
         """Check if a player can be assigned to a court"""
         # Check court capacity
         current_players = self.db.query(Player).filter(Player.court_id == court.id).count()
-        if current_players >= 4:
+        if current_players >= court.capacity:
             return False
         
         # Check qualification match (allow training courts for any qualification)
@@ -91,7 +98,7 @@ class AutoAssignmentService:
             # Priority 1: Fill advanced courts with advanced players
             for court in advanced_courts:
                 current_players = self.db.query(Player).filter(Player.court_id == court.id).count()
-                slots_available = 4 - current_players
+                slots_available = court.capacity - current_players
                 
                 if slots_available > 0 and advanced_players:
                     players_to_assign = advanced_players[:slots_available]
@@ -111,7 +118,7 @@ class AutoAssignmentService:
             # Priority 2: Fill intermediate courts with intermediate players
             for court in intermediate_courts:
                 current_players = self.db.query(Player).filter(Player.court_id == court.id).count()
-                slots_available = 4 - current_players
+                slots_available = court.capacity - current_players
                 
                 if slots_available > 0 and intermediate_players:
                     players_to_assign = intermediate_players[:slots_available]
@@ -131,7 +138,7 @@ class AutoAssignmentService:
             # Priority 3: Fill training courts with any players (mixed levels allowed)
             for court in training_courts:
                 current_players = self.db.query(Player).filter(Player.court_id == court.id).count()
-                slots_available = 4 - current_players
+                slots_available = court.capacity - current_players
                 
                 if slots_available > 0:
                     # Combine remaining players
@@ -157,7 +164,7 @@ class AutoAssignmentService:
             # Priority 4: If intermediate courts are still empty, allow advanced players (overflow)
             for court in intermediate_courts:
                 current_players = self.db.query(Player).filter(Player.court_id == court.id).count()
-                slots_available = 4 - current_players
+                slots_available = court.capacity - current_players
                 
                 if slots_available > 0 and advanced_players:
                     players_to_assign = advanced_players[:slots_available]
@@ -210,30 +217,41 @@ def auto_fill_courts(db: Session = Depends(get_db)):
         data=result
     )
 
-@automation_router.get("/court-status", response_model=List[Dict[str, Any]])
-def get_court_status(db: Session = Depends(get_db)):
-    """
-    Get the current status of all courts (player count and availability)
-    """
-    courts = db.query(Court).all()
+def court_status_snapshot(db: Session, columnar: bool = False):
+    """Player count and availability for every court"""
+    floor = FloorState.load(db)
     court_status = []
     
-    for court in courts:
-        players = db.query(Player).filter(Player.court_id == court.id).all()
+    for court in floor.courts.values():
+        players = floor.on_court[court.id]
         court_status.append({
             "court_id": court.id,
             "court_name": court.name,
             "court_type": court.court_type,
             "player_count": len(players),
-            "slots_available": 4 - len(players),
-            "is_full": len(players) >= 4,
-            "players": [{"id": p.id, "name": p.name, "qualification": p.qualification} for p in players]
+            "capacity": court.capacity,
+            "slots_available": court.capacity - len(players),
+            "is_full": len(players) >= court.capacity,
+            "players": player_list(players, columnar)
         })
     
     return court_status
 
+@automation_router.get("/court-status", response_model=List[Dict[str, Any]])
+async def get_court_status(request: Request, format: schemas.SnapshotFormat = schemas.SnapshotFormat.OBJECTS):
+    """
+    Get the current status of all courts (player count and availability).
+    Concurrent calls share one computation and one serialized response.
+    `format=columnar` returns each court's players as parallel arrays.
+    """
+    columnar = format == schemas.SnapshotFormat.COLUMNAR
+    return Response(await read_coalescer.run(f"automation:court-status:{format.value}",
+                                             partial(court_status_snapshot, columnar=columnar),
+                                             read_session_factory(request)),
+                    media_type="application/json")
+
 @automation_router.get("/queue-status", response_model=Dict[str, Any])
-def get_queue_status(db: Session = Depends(get_db)):
+def get_queue_status(db: Session = Depends(get_read_db)):
     """
     Get the current status of all queues
     """
@@ -249,6 +267,10 @@ def get_queue_status(db: Session = Depends(get_db)):
         Player.court_id == None
     ).all()
     
+    # Same order the fill engine serves them in
+    advanced_queue.sort(key=fair_queue.sort_key)
+    intermediate_queue.sort(key=fair_queue.sort_key)
+    
     return {
         "advanced_queue": {
             "count": len(advanced_queue),
@@ -289,22 +311,13 @@ def smart_assign_players(db: Session = Depends(get_db)):
         training_courts.sort(key=sort_by_occupancy, reverse=True)
         
         # Get queued players
-        advanced_players = db.query(Player).filter(
-            Player.qualification == "advanced",
-            Player.is_active == True,
-            Player.court_id == None
-        ).all()
-        
-        intermediate_players = db.query(Player).filter(
-            Player.qualification == "intermediate",
-            Player.is_active == True,
-            Player.court_id == None
-        ).all()
+        advanced_players = service.get_queued_players("advanced")
+        intermediate_players = service.get_queued_players("intermediate")
         
         # PHASE 1: Advanced players to advanced courts
         for court in advanced_courts:
             current_players = db.query(Player).filter(Player.court_id == court.id).count()
-            slots_available = 4 - current_players
+            slots_available = court.capacity - current_players
             
             if slots_available > 0 and advanced_players:
                 players_to_assign = advanced_players[:slots_available]
@@ -320,7 +333,7 @@ def smart_assign_players(db: Session = Depends(get_db)):
         # PHASE 2: Intermediate players to intermediate courts
         for court in intermediate_courts:
             current_players = db.query(Player).filter(Player.court_id == court.id).count()
-            slots_available = 4 - current_players
+            slots_available = court.capacity - current_players
             
             if slots_available > 0 and intermediate_players:
                 players_to_assign = intermediate_players[:slots_available]
@@ -336,7 +349,7 @@ def smart_assign_players(db: Session = Depends(get_db)):
         # PHASE 3: Mixed players to training courts
         for court in training_courts:
             current_players = db.query(Player).filter(Player.court_id == court.id).count()
-            slots_available = 4 - current_players
+            slots_available = court.capacity - current_players
             
             if slots_available > 0:
                 # Mix of advanced and intermediate players for training
@@ -359,7 +372,7 @@ def smart_assign_players(db: Session = Depends(get_db)):
         if advanced_players:  # Still have advanced players waiting
             for court in intermediate_courts:
                 current_players = db.query(Player).filter(Player.court_id == court.id).count()
-                slots_available = 4 - current_players
+                slots_available = court.capacity - current_players
                 
                 if slots_available > 0 and advanced_players:
                     players_to_assign = advanced_players[:slots_available]
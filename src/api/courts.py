@@ -2,17 +2,27 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
-from ..database.database import get_db
-from ..database.models import Court, Player, CourtAssignment
+from ..database.database import get_db, get_read_db
+from ..database.database import utcnow
+from ..database.models import Court, Player, CourtAssignment, MatchPlayer, MatchResult
 from ..database import schemas
+from .. import config
 from .queue import move_player_to_queue_internal
+from ..services.autofill import autofill_scheduler
+from ..services.fairness import fair_queue
+from ..services.ratings import rating_updater
+from ..services.staging import next_up
+from ..services.topology import court_topology
+from .idempotency import IdempotentRoute
+from .versioning import check_version, compare_and_swap
 
 court_router = APIRouter(
-    tags=["courts"]
+    tags=["courts"],
+    route_class=IdempotentRoute
 )
 
 @court_router.get("/", response_model=List[schemas.Court])
-def get_courts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_courts(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get all courts"""
     return db.query(Court).offset(skip).limit(limit).all()
 
@@ -30,10 +40,53 @@ def create_court(court: schemas.CourtCreate, db: Session = Depends(get_db)):
     db.add(db_court)
     db.commit()
     db.refresh(db_court)
+    autofill_scheduler.notify("court_created")
+    return db_court
+
+@court_router.get("/topology", response_model=dict)
+def get_court_topology(db: Session = Depends(get_read_db)):
+    """Get the cascade topology: fill order and which court feeds which"""
+    courts = db.query(Court).all()
+    return court_topology(courts).describe({c.id: c.name for c in courts})
+
+@court_router.put("/{court_id}/topology", response_model=schemas.Court)
+def update_court_topology(court_id: int, topology: schemas.CourtTopologyUpdate, db: Session = Depends(get_db)):
+    """Set which court this court feeds into and its fill priority"""
+    courts = db.query(Court).all()
+    db_court = next((c for c in courts if c.id == court_id), None)
+    if db_court is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Court with ID {court_id} not found"
+        )
+    
+    if topology.feeds_court_id is not None:
+        if topology.feeds_court_id == court_id:
+            raise HTTPException(status_code=400, detail="A court cannot feed itself")
+        if not any(c.id == topology.feeds_court_id for c in courts):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Court with ID {topology.feeds_court_id} not found"
+            )
+        # Reject links that would close a loop
+        feeds = {c.id: c.feeds_court_id for c in courts}
+        feeds[court_id] = topology.feeds_court_id
+        target, seen = topology.feeds_court_id, set()
+        while target is not None and target not in seen:
+            if target == court_id:
+                raise HTTPException(status_code=400, detail="Court topology cannot contain cycles")
+            seen.add(target)
+            target = feeds.get(target)
+    
+    db_court.feeds_court_id = topology.feeds_court_id
+    db_court.fill_priority = topology.fill_priority
+    db.commit()
+    db.refresh(db_court)
+    autofill_scheduler.notify("court_topology_changed")
     return db_court
 
 @court_router.get("/{court_id}", response_model=schemas.Court)
-def read_court(court_id: int, db: Session = Depends(get_db)):
+def read_court(court_id: int, db: Session = Depends(get_read_db)):
     """Get a specific court by ID"""
     db_court = db.query(Court).filter(Court.id == court_id).first()
     if db_court is None:
@@ -44,17 +97,21 @@ def read_court(court_id: int, db: Session = Depends(get_db)):
     return db_court
 
 @court_router.put("/{court_id}", response_model=schemas.CourtUpdateResponse)
-def update_court(court_id: int, court: schemas.CourtCreate, db: Session = Depends(get_db)):
-    """Update court info. Auto-moves players to queue when changed to training"""
+def update_court(court_id: int, court: schemas.CourtUpdate, db: Session = Depends(get_db)):
+    """Update court info. Auto-moves players to queue when changed to training,
+    and players beyond a lowered capacity.
+    Rejected with 409 if `version` is given and the court changed since"""
     db_court = db.query(Court).filter(Court.id == court_id).first()
     if db_court is None:
         raise HTTPException(
             status_code=404,
             detail=f"Court with ID {court_id} not found"
         )
+    check_version(db_court, court.version, schemas.Court)
     
     old_court_type = db_court.court_type
     new_court_type = court.court_type
+    old_capacity = db_court.capacity
     moved_players = []
     
     if old_court_type != "training" and new_court_type == "training":
@@ -63,17 +120,32 @@ def update_court(court_id: int, court: schemas.CourtCreate, db: Session = Depend
         for player in players_on_court:
             player.court_id = None
             moved_players.append(player)
-        
-        if moved_players:
-            db.commit()
     
-    for key, value in court.model_dump().items():
+    for key, value in court.model_dump(exclude={"version"}, exclude_none=True).items():
         setattr(db_court, key, value)
     
-    db.commit()
+    # A smaller capacity sends the extra players back to the queue; those the
+    # queue would serve last go first, so the longest-waiting stay on court.
+    # Nothing is flushed before the court row, so every move commits (or
+    # loses a version race) together with the court edit
+    players_on_court = [p for p in db.query(Player).filter(Player.court_id == court_id)
+                        if p.court_id == court_id]
+    if len(players_on_court) > db_court.capacity:
+        players_on_court.sort(key=fair_queue.sort_key)
+        for player in players_on_court[db_court.capacity:]:
+            player.court_id = None
+            moved_players.append(player)
+    
+    with compare_and_swap(db, db_court, schemas.Court):
+        db.commit()
     db.refresh(db_court)
     
-
+    if old_court_type != new_court_type:
+        autofill_scheduler.notify("court_type_changed")
+    elif db_court.capacity > old_capacity:
+        autofill_scheduler.notify("court_capacity_changed")
+    elif moved_players:
+        autofill_scheduler.notify("player_released")
     
     if moved_players:
         player_names = [p.name for p in moved_players]
@@ -88,7 +160,7 @@ def update_court(court_id: int, court: schemas.CourtCreate, db: Session = Depend
     )
 
 @court_router.get("/{court_id}/players", response_model=List[schemas.Player])
-def get_players_on_court(court_id: int, db: Session = Depends(get_db)):
+def get_players_on_court(court_id: int, db: Session = Depends(get_read_db)):
     """Get all players assigned to a specific court"""
     db_court = db.query(Court).filter(Court.id == court_id).first()
     if db_court is None:
@@ -119,10 +191,10 @@ def assign_player_to_court(court_id: int, player_id: int, db: Session = Depends(
     
     current_players_count = db.query(Player).filter(Player.court_id == court_id, Player.is_active == True).count()
     
-    if current_players_count >= 4:
+    if current_players_count >= db_court.capacity:
         raise HTTPException(
             status_code=400,
-            detail=f"Court is full (maximum 4 players)"
+            detail=f"Court is full (maximum {db_court.capacity} players)"
         )
     
     if db_court.court_type == "training":
@@ -173,6 +245,7 @@ def remove_player_from_court(court_id: int, player_id: int, db: Session = Depend
     if db_player.court_id == court_id:
         db_player.court_id = None
         db.commit()
+        autofill_scheduler.notify("player_released")
         success = True
         message = f"Player {db_player.name} removed from court {db_court.name}"
     else:
@@ -183,3 +256,53 @@ def remove_player_from_court(court_id: int, player_id: int, db: Session = Depend
         success=success,
         message=message
     )
+
+@court_router.post("/{court_id}/result", response_model=schemas.MatchResult)
+def record_match_result(court_id: int, result: schemas.MatchResultCreate, db: Session = Depends(get_db)):
+    """Record the result of the game on a court and, by default, release its players.
+
+    Ratings are updated later by the background rating job.
+    """
+    db_court = db.query(Court).filter(Court.id == court_id).first()
+    if db_court is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Court with ID {court_id} not found"
+        )
+
+    player_ids = result.side_a + result.side_b
+    if len(set(player_ids)) != len(player_ids):
+        raise HTTPException(status_code=400, detail="A player can only be on one side")
+    on_court = db.query(Player).filter(Player.court_id == court_id).all()
+    missing = set(player_ids) - {p.id for p in on_court}
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Players {sorted(missing)} are not on court {db_court.name}"
+        )
+
+    db_result = MatchResult(
+        court_id=court_id,
+        winner=result.winner.value,
+        score_a=result.score_a,
+        score_b=result.score_b,
+        recorded_at=utcnow()
+    )
+    db_result.players = (
+        [MatchPlayer(player_id=p, side="A") for p in result.side_a]
+        + [MatchPlayer(player_id=p, side="B") for p in result.side_b]
+    )
+    db.add(db_result)
+    if result.release_players:
+        for player in on_court:
+            player.court_id = None
+        # The staged group goes on in the same commit as the release
+        if config.NEXT_UP_ENABLED and on_court:
+            next_up.promote(db, court_id)
+    db.commit()
+    db.refresh(db_result)
+
+    rating_updater.notify()
+    if result.release_players and on_court:
+        autofill_scheduler.notify("player_released")
+    return db_result
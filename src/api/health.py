@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Request, Response
+from sqlalchemy import text
+
+from ..database.database import engine, get_pool_status
+from ..services.analytics import analytics_recorder
+from ..services.checkin import checkin_buffer
+from ..services.coalescing import read_coalescer
+from ..services.events import event_bus
+from ..services.mutation_log import mutation_log
+from ..services.ratings import rating_updater
+from ..services.sessions import session_store
+from ..services.staging import next_up
+
+health_router = APIRouter(
+    tags=["health"]
+)
+
+
+@health_router.get("/health")
+def health_check():
+    """Liveness probe - never touches the database"""
+    return {"status": "healthy"}
+
+
+@health_router.get("/ready")
+def readiness_check(request: Request, response: Response):
+    """Readiness probe - reports database reachability and connection pool state"""
+    state = request.app.state
+    tables_initialized = getattr(state, "db_ready", False)
+    error = getattr(state, "db_error", None)
+
+    reachable = False
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        reachable = True
+    except Exception as e:
+        error = str(e)
+
+    ready = reachable and tables_initialized
+    if not ready:
+        response.status_code = 503
+
+    return {
+        "status": "ready" if ready else "not_ready",
+        "database": {
+            "reachable": reachable,
+            "tables_initialized": tables_initialized,
+            "error": error
+        },
+        "pool": get_pool_status(),
+        "coalescing": read_coalescer.status(),
+        "events": event_bus.status(),
+        "sessions": session_store.status(),
+        "checkin": checkin_buffer.status(),
+        "ratings": rating_updater.status(),
+        "analytics": analytics_recorder.status(),
+        "mutation_log": mutation_log.status(),
+        "next_up": next_up.status()
+    }
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import time
+from collections import Counter, OrderedDict
+
+from fastapi import Request, Response
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+
+from .. import config
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyStore:
+    """Bounded, TTL-evicting store of completed responses keyed by Idempotency-Key.
+
+    Keys are scoped by method and path and remember a fingerprint of the
+    request (query string and body), so a key reused for a different request
+    is rejected instead of replaying the wrong result. A duplicate that
+    arrives while the original is still running waits for it and then
+    replays its response. Only responses below 500 are kept, 4xx answers
+    included: server errors are not cached, so a failed attempt can be
+    retried.
+
+    Entries share one TTL, so insertion order is also expiry order and
+    eviction just pops from the front. The store is per process and is only
+    touched from the event loop.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = Counter()
+        self._entries = OrderedDict()
+        self._in_flight = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now: float):
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[0] > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+            self.stats["evicted"] += 1
+
+    async def run(self, key, fingerprint: str, call):
+        """Return the stored response for `key`, or run `call` once and store its result"""
+        while True:
+            self._evict(time.monotonic())
+            entry = self._entries.get(key)
+            if entry is not None:
+                _, stored_fingerprint, stored = entry
+                if stored_fingerprint != fingerprint:
+                    return self._mismatch()
+                self.stats["replayed"] += 1
+                return self._replay(stored)
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            if in_flight[0] != fingerprint:
+                return self._mismatch()
+            self.stats["waited"] += 1
+            await asyncio.shield(in_flight[1])
+
+        done = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, done)
+        try:
+            response = await call()
+            body = getattr(response, "body", None)
+            if body is not None and response.status_code < 500 and not response.background:
+                self._entries[key] = (
+                    time.monotonic() + self.ttl,
+                    fingerprint,
+                    (response.status_code, body, list(response.raw_headers))
+                )
+                self.stats["stored"] += 1
+                self._evict(time.monotonic())
+            return response
+        finally:
+            del self._in_flight[key]
+            done.set_result(None)
+
+    def _replay(self, stored):
+        status_code, body, raw_headers = stored
+        response = Response(content=body, status_code=status_code)
+        response.raw_headers = raw_headers + [(b"idempotent-replayed", b"true")]
+        return response
+
+    def _mismatch(self):
+        self.stats["mismatched"] += 1
+        return JSONResponse(
+            status_code=422,
+            content={"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request"}
+        )
+
+    def status(self):
+        return {"keys": len(self._entries), "in_flight": len(self._in_flight), **self.stats}
+
+
+class IdempotentRoute(APIRoute):
+    """Route class honouring an Idempotency-Key header on mutating methods.
+
+    A request carrying a key already seen for the same method and path gets
+    the stored response back before any dependency runs, so retries from
+    clients on flaky connections never reach the database again. An
+    HTTPException raised by the handler is turned into its response here,
+    so a 4xx is stored and replayed like any other answer. Requests without
+    the header are handled as usual.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not self.methods & MUTATING_METHODS:
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return await handler(request)
+            if len(key) > MAX_KEY_LENGTH:
+                return JSONResponse(
+                    status_code=400,
+                    content={"detail": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"}
+                )
+            fingerprint = hashlib.sha256(
+                request.url.query.encode() + b"\0" + await request.body()
+            ).hexdigest()
+
+            async def call():
+                try:
+                    return await handler(request)
+                except HTTPException as exc:
+                    return await http_exception_handler(request, exc)
+
+            return await idempotency_store.run((request.method, request.url.path, key), fingerprint, call)
+
+        return idempotent_handler
+
+
+idempotency_store = IdempotencyStore(
+    ttl=config.IDEMPOTENCY_TTL_SECONDS,
+    max_entries=config.IDEMPOTENCY_MAX_KEYS
+)
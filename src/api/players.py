@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from sqlalchemy import or_
 
-from ..database.database import get_db
+from ..database.database import get_db, get_read_db
 from ..database.models import Player, Court, Team
 from ..database import schemas
-templates = Jinja2Templates(directory="templates")
+from ..services.autofill import autofill_scheduler
+from .idempotency import IdempotentRoute
+from .versioning import check_version, compare_and_swap
 
 player_router = APIRouter(
-    tags=["players"]
+    tags=["players"],
+    route_class=IdempotentRoute
 )
 
 
@@ -19,7 +21,7 @@ def get_players(
     skip: int = 0,
     limit: int = 100,
     active_only: bool = False,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all players or only active players
@@ -41,11 +43,13 @@ def create_player(player: schemas.PlayerCreate, db: Session = Depends(get_db)):
     db.add(db_player)
     db.commit()
     db.refresh(db_player)
+    if db_player.is_active:
+        autofill_scheduler.notify("player_activated")
     return db_player
 
 
 @player_router.get("/{player_id}", response_model=schemas.Player)
-def read_player(player_id: int, db: Session = Depends(get_db)):
+def read_player(player_id: int, db: Session = Depends(get_read_db)):
     """
     Get a specific player by ID
     """
@@ -65,7 +69,10 @@ def update_player(
     db: Session = Depends(get_db)
 ):
     """
-    Update a player's information (name, qualification, is_active, and/or court assignment)
+    Update a player's information (name, qualification, is_active, rating, and/or court assignment)
+    
+    If `version` is given, the update only applies if the player has not
+    changed since; otherwise 409 is returned with the current player.
     """
     db_player = db.query(Player).filter(Player.id == player_id).first()
     if db_player is None:
@@ -73,6 +80,10 @@ def update_player(
             status_code=404,
             detail=f"Player with ID {player_id} not found"
         )
+    check_version(db_player, player_update.version, schemas.Player)
+
+    # Fields the court fill logic depends on
+    fill_state = (db_player.qualification, db_player.is_active, db_player.court_id)
 
     # Update fields if provided
     if player_update.name is not None:
@@ -87,6 +98,9 @@ def update_player(
         if not player_update.is_active and db_player.court_id is not None:
             db_player.court_id = None
     
+    if player_update.rating is not None:
+        db_player.rating = player_update.rating
+    
     if player_update.court_id is not None:
         # Check if court exists
         court = db.query(Court).filter(Court.id == player_update.court_id).first()
@@ -97,8 +111,11 @@ def update_player(
             )
         db_player.court_id = player_update.court_id
     
-    db.commit()
+    with compare_and_swap(db, db_player, schemas.Player):
+        db.commit()
     db.refresh(db_player)
+    if (db_player.qualification, db_player.is_active, db_player.court_id) != fill_state:
+        autofill_scheduler.notify("player_updated")
     return db_player
 
 @player_router.delete("/{player_id}", response_model=schemas.ApiResponse)
@@ -113,10 +130,13 @@ def delete_player(player_id: int, db: Session = Depends(get_db)):
             detail=f"Player with ID {player_id} not found"
         )
 
+    was_on_court = db_player.court_id is not None
     try:
         db.delete(db_player)
         db.commit()
         success = True
+        if was_on_court:
+            autofill_scheduler.notify("player_released")
     except Exception as e:
         db.rollback()
         success = False
@@ -150,11 +170,13 @@ def toggle_player_active(player_id: int, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(db_player)
+    if db_player.is_active:
+        autofill_scheduler.notify("player_activated")
     return db_player
 
 
 @player_router.get("/active/list", response_model=List[schemas.Player])
-def get_active_players(db: Session = Depends(get_db)):
+def get_active_players(db: Session = Depends(get_read_db)):
     """
     Get all active players
     """
@@ -162,7 +184,7 @@ def get_active_players(db: Session = Depends(get_db)):
 
 
 @player_router.get("/inactive/list", response_model=List[schemas.Player])
-def get_inactive_players(db: Session = Depends(get_db)):
+def get_inactive_players(db: Session = Depends(get_read_db)):
     """
     Get all inactive players
     """
@@ -170,7 +192,7 @@ def get_inactive_players(db: Session = Depends(get_db)):
 
 
 @player_router.get("/search/{search_term}", response_model=List[schemas.Player])
-def search_players(search_term: str, db: Session = Depends(get_db)):
+def search_players(search_term: str, db: Session = Depends(get_read_db)):
     """
     Search for players by name or email
     """
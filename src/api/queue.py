@@ -1,11 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
+from functools import partial
 
-from ..database.database import get_db
+from ..database.database import get_db, get_read_db, read_session_factory
 from ..database.models import Player, Court
-
-queue_router = APIRouter(tags=["Queue Management"])
+from .. import config
+from ..database import schemas
+from ..services.autofill import autofill_scheduler
+from .auth import get_current_player_id
+from .idempotency import IdempotentRoute
+from ..services.rotation import game_duration
+from ..services.fairness import fair_queue, pick_keeping_pairs, take_queued_players
+from ..services.topology import court_topology
+from ..services.floor import FloorState
+from ..services.matchmaking import MATCH_SIZES, take_balanced_match
+from ..services.coalescing import read_coalescer
+from ..services.events import event_bus
+from ..services.staging import next_up
+
+queue_router = APIRouter(tags=["Queue Management"], route_class=IdempotentRoute)
 
 
 def move_player_to_queue_internal(player_id: int, db: Session, qualification: str = None):
@@ -43,163 +58,226 @@ def move_player_to_queue_internal(player_id: int, db: Session, qualification: st
         }
 
 
-async def auto_fill_courts(db: Session):
-    """Automatically fill empty court spots with players from warmup courts first, then queues"""
-    try:
-        # Get all courts
-        courts = db.query(Court).all()
-        assignments_made = []
+def _feeder_partner(floor: FloorState, eligible, player):
+    """A pair moves up from a feeder court only when both halves are eligible"""
+    partner = floor.partner(player) if config.PAIR_FILL_ENABLED else None
+    return partner if partner in eligible else None
+
+
+def choose_players(floor: FloorState, topology, court, spots: int, taken: set):
+    """Who takes `spots` places on `court`: players of the court's type from
+    its feeder courts first (a pair only moves up together), then the queue -
+    advanced/intermediate courts ONLY accept players of the same
+    qualification. Players in `taken` are skipped and queue picks are added
+    to it. Returns (players, {player id: side}).
+
+    Shared by fill passes and next-up staging (src/services/staging.py).
+    """
+    chosen = []
+    for feeder_id in topology.feeders[court.id]:
+        eligible = [p for p in floor.on_court[feeder_id]
+                    if p.is_active and p.qualification == court.court_type and p.id not in taken]
+        chosen.extend(pick_keeping_pairs(
+            eligible, spots - len(chosen), partial(_feeder_partner, floor, eligible)
+        ))
+
+    # An empty singles or doubles court gets the most balanced game from
+    # the next few
+    remaining_spots = spots - len(chosen)
+    sides = {}
+    if remaining_spots > 0:
+        if (config.MATCH_BALANCE_ENABLED and remaining_spots == court.capacity
+                and court.capacity in MATCH_SIZES):
+            queue_players, sides = take_balanced_match(
+                floor, court.court_type, taken, config.MATCH_WINDOW, court.capacity)
+        else:
+            queue_players = take_queued_players(floor, court.court_type, remaining_spots, taken)
+        chosen.extend(queue_players)
+    return chosen, sides
 
-        # Court mapping: Game court -> Warmup court
-        warmup_mapping = {
-            'G1': 'W1', 'G2': 'W2', 'G3': 'W3', 'G4': 'W4'
-        }
 
-        # Sort courts to prioritize G courts first, then W courts
-        g_courts = [c for c in courts if c.name.startswith('G')]
-        w_courts = [c for c in courts if c.name.startswith('W')]
-        other_courts = [c for c in courts if not c.name.startswith('G') and not c.name.startswith('W')]
-        
-        # Process courts in order: G courts first, then W courts, then others
-        prioritized_courts = g_courts + w_courts + other_courts
+def auto_fill_courts_internal(db: Session):
+    """Internal function to fill empty court spots with players from feeder (warmup) courts first, then queues"""
+    try:
+        # Load the floor once as plain records - the whole pass then works
+        # in memory and only the players who move are written back
+        floor = FloorState.load(db)
+        courts_by_id = floor.courts
+        on_court = floor.on_court
+        topology = court_topology(courts_by_id.values())
+        assignments_made = []
 
-        for court in prioritized_courts:
-            if court.court_type != "training":
-                current_players = db.query(Player).filter(
-                    Player.court_id == court.id).count()
-                available_spots = 4 - current_players
-
-                if available_spots > 0:
-                    available_players = []
-
-                    # Step 1: Check warmup court first (if this is a G court)
-                    if court.name in warmup_mapping:
-                        warmup_court_name = warmup_mapping[court.name]
-                        warmup_court = db.query(Court).filter(Court.name == warmup_court_name).first()
-                        
-                        if warmup_court:
-                            # Get players from warmup court that match court type requirements
-                            if court.court_type == "advanced":
-                                # Advanced courts ONLY accept advanced players
-                                warmup_players = db.query(Player).filter(
-                                    Player.court_id == warmup_court.id,
-                                    Player.qualification == "advanced",
-                                    Player.is_active == True
-                                ).limit(available_spots).all()
-                            elif court.court_type == "intermediate":
-                                # Intermediate courts ONLY accept intermediate players
-                                warmup_players = db.query(Player).filter(
-                                    Player.court_id == warmup_court.id,
-                                    Player.qualification == "intermediate",
-                                    Player.is_active == True
-                                ).limit(available_spots).all()
-                            else:
-                                # Skip training courts completely
-                                warmup_players = []
-                            
-                            available_players.extend(warmup_players)
-                            
-                            # Cascade: If we took players from W court, immediately fill W court from queue
-                            if warmup_players and warmup_court.court_type != "training":
-                                w_spots_needed = len(warmup_players)
-                                
-                                if warmup_court.court_type == "advanced":
-                                    # Fill W court with advanced players from queue
-                                    queue_to_w_players = db.query(Player).filter(
-                                        Player.court_id.is_(None),
-                                        Player.qualification == "advanced",
-                                        Player.is_active == True
-                                    ).limit(w_spots_needed).all()
-                                elif warmup_court.court_type == "intermediate":
-                                    # Fill W court with intermediate players from queue
-                                    queue_to_w_players = db.query(Player).filter(
-                                        Player.court_id.is_(None),
-                                        Player.qualification == "intermediate",
-                                        Player.is_active == True
-                                    ).limit(w_spots_needed).all()
-                                else:
-                                    queue_to_w_players = []
-                                
-                                # Move queue players to W court
-                                for player in queue_to_w_players:
-                                    player.court_id = warmup_court.id
-                                    assignments_made.append({
-                                        "player": {"id": player.id, "name": player.name, "qualification": player.qualification},
-                                        "court": {"id": warmup_court.id, "name": warmup_court.name, "type": warmup_court.court_type},
-                                        "source": "queue_cascade"
-                                    })
-
-                    # Step 2: Fill remaining spots from queue (for both G and W courts)
-                    remaining_spots = available_spots - len(available_players)
-                    if remaining_spots > 0:
-                        if court.court_type == "advanced":
-                            # Advanced courts ONLY accept advanced players from queue
-                            queue_players = db.query(Player).filter(
-                                Player.court_id.is_(None),
-                                Player.qualification == "advanced",
-                                Player.is_active == True
-                            ).limit(remaining_spots).all()
-                            available_players.extend(queue_players)
-                        elif court.court_type == "intermediate":
-                            # Intermediate courts ONLY accept intermediate players from queue
-                            queue_players = db.query(Player).filter(
-                                Player.court_id.is_(None),
-                                Player.qualification == "intermediate",
-                                Player.is_active == True
-                            ).limit(remaining_spots).all()
-                            available_players.extend(queue_players)
-                        # Skip training courts - no auto-fill
-
-                    # Assign all selected players to the court
-                    for player in available_players:
-                        source = "warmup" if player.court_id is not None else "queue"
-                        player.court_id = court.id
-                        assignments_made.append({
-                            "player": {"id": player.id, "name": player.name, "qualification": player.qualification},
-                            "court": {"id": court.id, "name": court.name, "type": court.court_type},
-                            "source": source
-                        })
+        # Queue players come from the fairness heap; `taken` keeps a player
+        # picked for one court from being picked again later in this pass
+        fair_queue.ensure_fresh(db)
+        taken = set()
+        queues_drawn = set()
+        fed_courts = set()
+
+        # Single topological pass: every court is filled before the courts
+        # feeding it, so a G court pulls from its W court and the W court
+        # refills from its own feeders or the queue when its turn comes
+        for court_id in topology.order:
+            court = courts_by_id[court_id]
+            # Skip training courts - no auto-fill
+            if court.court_type == "training":
+                continue
+            available_spots = court.capacity - len(on_court[court_id])
+            if available_spots <= 0:
+                continue
+
+            # The group the boards show goes first, if it is still good
+            available_players, sides = [], {}
+            if config.NEXT_UP_ENABLED:
+                available_players, sides = next_up.claim(floor, court, available_spots, taken)
+            if len(available_players) < available_spots:
+                more_players, more_sides = choose_players(
+                    floor, topology, court, available_spots - len(available_players), taken)
+                available_players = available_players + more_players
+                sides = {**sides, **more_sides}
+            fed_courts.update(p.court_id for p in available_players if p.court_id is not None)
+            if any(p.court_id is None for p in available_players):
+                queues_drawn.add(court.court_type)
+
+            # Assign all selected players to the court
+            for player in available_players:
+                if player.court_id is not None:
+                    source = "warmup"
+                elif court_id in fed_courts:
+                    source = "queue_cascade"
+                else:
+                    source = "queue"
+                floor.move(player, court.id)
+                assignment = {
+                    "player": {"id": player.id, "name": player.name, "qualification": player.qualification},
+                    "court": {"id": court.id, "name": court.name, "type": court.court_type},
+                    "source": source
+                }
+                if player.id in sides:
+                    assignment["side"] = sides[player.id]
+                assignments_made.append(assignment)
 
         if assignments_made:
+            floor.apply(db)
             db.commit()
+        # Everyone still waiting in a queue we drew from sat out this pass
+        for qualification in queues_drawn:
+            fair_queue.record_pass(qualification)
         return assignments_made
 
-    except Exception as e:
+    except Exception:
         db.rollback()
-        raise HTTPException(
-            status_code=500, detail=f"Error auto-filling courts: {str(e)}")
+        raise
 
 
-@queue_router.get("/queues", response_model=dict)
-async def get_all_queues(db: Session = Depends(get_db)):
-    """Get all players organized by queue type"""
+async def auto_fill_courts(db: Session):
+    """Automatically fill empty court spots with players from warmup courts first, then queues"""
     try:
-        # Get all active players not assigned to courts (court_id is None)
-        queued_players = db.query(Player).filter(
-            Player.court_id.is_(None),
-            Player.is_active == True
-        ).all()
-
-        advanced_queue = [
-            {"id": p.id, "name": p.name, "qualification": p.qualification}
-            for p in queued_players if p.qualification == "advanced"
-        ]
-
-        intermediate_queue = [
-            {"id": p.id, "name": p.name, "qualification": p.qualification}
-            for p in queued_players if p.qualification == "intermediate"
-        ]
+        return auto_fill_courts_internal(db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error auto-filling courts: {str(e)}")
 
+
+def player_list(players, columnar: bool = False):
+    """Players as objects, or as parallel id/name/qualification arrays"""
+    if columnar:
         return {
-            "advanced": advanced_queue,
-            "intermediate": intermediate_queue,
-            "total_queued": len(queued_players)
+            "id": [p.id for p in players],
+            "name": [p.name for p in players],
+            "qualification": [p.qualification for p in players]
+        }
+    return [{"id": p.id, "name": p.name, "qualification": p.qualification} for p in players]
+
+
+def queues_snapshot(db: Session, floor: FloorState = None, columnar: bool = False):
+    """All queued players organized by queue type, in fairness order"""
+    # Get all active players not assigned to courts (court_id is None)
+    queued_players = (floor or FloorState.load(db)).queued()
+    # Show players in the order the fill engine will serve them
+    queued_players.sort(key=fair_queue.sort_key)
+
+    advanced_queue = player_list(
+        [p for p in queued_players if p.qualification == "advanced"], columnar)
+
+    intermediate_queue = player_list(
+        [p for p in queued_players if p.qualification == "intermediate"], columnar)
+
+    return {
+        "advanced": advanced_queue,
+        "intermediate": intermediate_queue,
+        "total_queued": len(queued_players)
+    }
+
+
+def court_snapshot(court: Court, players, columnar: bool = False):
+    """One court with its players, as shown on the board"""
+    game = None
+    if court.game_started_at is not None:
+        duration = game_duration(court.court_type)
+        game = {
+            "started_at": court.game_started_at.isoformat(),
+            "ends_at": (court.game_started_at + duration).isoformat() if duration else None
         }
+
+    staged = next_up.group(court.id)
+    return {
+        "court": {"id": court.id, "name": court.name, "type": court.court_type},
+        "game": game,
+        "players": player_list(players, columnar),
+        "count": len(players),
+        "capacity": court.capacity,
+        "capacity_remaining": court.capacity - len(players),
+        "next_up": player_list(staged.players if staged else [], columnar)
+    }
+
+
+def app_state_snapshot(db: Session, columnar: bool = False):
+    """Complete app state for refresh-all: queues plus every court with its players"""
+    floor = FloorState.load(db)
+    return {
+        "queues": queues_snapshot(db, floor, columnar),
+        "courts": [
+            court_snapshot(court, [p for p in floor.on_court[court.id] if p.is_active], columnar)
+            for court in floor.courts.values()
+        ],
+        "auto_assignments": autofill_scheduler.last_assignments,
+        "autofill": autofill_scheduler.status(),
+        "timestamp": "refreshed"
+    }
+
+
+@queue_router.get("/queues", response_model=dict)
+async def get_all_queues(request: Request, format: schemas.SnapshotFormat = schemas.SnapshotFormat.OBJECTS):
+    """Get all players organized by queue type.
+
+    Concurrent calls share one query and one serialized response.
+    `format=columnar` returns each queue as parallel arrays.
+    """
+    columnar = format == schemas.SnapshotFormat.COLUMNAR
+    try:
+        return Response(await read_coalescer.run(f"queue:queues:{format.value}",
+                                                   partial(queues_snapshot, columnar=columnar),
+                                                   read_session_factory(request)),
+                        media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error getting queues: {str(e)}")
 
 
+@queue_router.get("/events")
+async def stream_events():
+    """Server-sent events for every committed player/court change on any worker.
+
+    Boards subscribe and refresh when something changes instead of polling.
+    """
+    return StreamingResponse(
+        event_bus.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @queue_router.post("/move-to-court/{player_id}/{court_id}")
 async def move_player_to_court(player_id: int, court_id: int, db: Session = Depends(get_db)):
     """Move a player from queue to a court"""
@@ -213,12 +291,12 @@ async def move_player_to_court(player_id: int, court_id: int, db: Session = Depe
         if not court:
             raise HTTPException(status_code=404, detail="Court not found")
 
-        # Check court capacity (max 4 players)
+        # Check court capacity
         court_players = db.query(Player).filter(
             Player.court_id == court_id).count()
-        if court_players >= 4:
+        if court_players >= court.capacity:
             raise HTTPException(
-                status_code=400, detail="Court is full (max 4 players)")
+                status_code=400, detail=f"Court is full (max {court.capacity} players)")
 
         # Check if player qualification matches court type for advanced courts
         if court.court_type == "advanced" and player.qualification != "advanced":
@@ -226,9 +304,14 @@ async def move_player_to_court(player_id: int, court_id: int, db: Session = Depe
                 status_code=400, detail="Only advanced players can be assigned to advanced courts")
 
         # Assign player to court
+        old_court_id = player.court_id
         player.court_id = court_id
         db.commit()
 
+        # Moving between courts frees a spot on the old one
+        if old_court_id is not None and old_court_id != court_id:
+            autofill_scheduler.notify("player_released")
+
         return {
             "message": f"Player {player.name} moved to court {court.name}",
             "player": {"id": player.id, "name": player.name, "qualification": player.qualification},
@@ -248,6 +331,7 @@ async def move_player_to_queue(player_id: int, qualification: str = None, db: Se
     try:
         result = move_player_to_queue_internal(player_id, db, qualification)
         db.commit()
+        autofill_scheduler.notify("player_released")
         return result
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -260,7 +344,7 @@ async def move_player_to_queue(player_id: int, qualification: str = None, db: Se
 
 
 @queue_router.get("/court-players/{court_id}")
-async def get_court_players(court_id: int, db: Session = Depends(get_db)):
+async def get_court_players(court_id: int, db: Session = Depends(get_read_db)):
     """Get all players assigned to a specific court"""
     try:
         court = db.query(Court).filter(Court.id == court_id).first()
@@ -268,16 +352,7 @@ async def get_court_players(court_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Court not found")
 
         players = db.query(Player).filter(Player.court_id == court_id, Player.is_active == True).all()
-
-        return {
-            "court": {"id": court.id, "name": court.name, "type": court.court_type},
-            "players": [
-                {"id": p.id, "name": p.name, "qualification": p.qualification}
-                for p in players
-            ],
-            "count": len(players),
-            "capacity_remaining": 4 - len(players)
-        }
+        return court_snapshot(court, players)
     except HTTPException:
         raise
     except Exception as e:
@@ -285,6 +360,65 @@ async def get_court_players(court_id: int, db: Session = Depends(get_db)):
             status_code=500, detail=f"Error getting court players: {str(e)}")
 
 
+@queue_router.get("/next-up", response_model=List[dict])
+def get_next_up(db: Session = Depends(get_read_db)):
+    """The staged next group for every court, for the boards"""
+    result = []
+    for court_id, name, court_type in db.query(Court.id, Court.name, Court.court_type).order_by(Court.id):
+        staged = next_up.group(court_id)
+        result.append({
+            "court": {"id": court_id, "name": name, "type": court_type},
+            "players": player_list(staged.players if staged else []),
+            "sides": staged.sides if staged else {}
+        })
+    return result
+
+
+def queue_position(db: Session, player_id: int) -> schemas.QueuePosition:
+    """Where a player stands, from the fair queue's rank index (no queue scan)"""
+    player = db.get(Player, player_id)
+    if player is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    result = schemas.QueuePosition(
+        player_id=player.id, name=player.name, qualification=player.qualification,
+        status=schemas.PlayerStatus.INACTIVE
+    )
+    if not player.is_active:
+        return result
+    if player.court_id is not None:
+        court = db.get(Court, player.court_id)
+        result.status = schemas.PlayerStatus.ON_COURT
+        result.court_id, result.court_name, result.court_type = court.id, court.name, court.court_type
+        return result
+
+    fair_queue.ensure_fresh(db)
+    position = fair_queue.position(player.id)
+    if position is None or position[0] != player.qualification:
+        # Joined through another worker and not applied here yet
+        fair_queue.reload_players(db, [player.id])
+        position = fair_queue.position(player.id)
+    result.status = schemas.PlayerStatus.QUEUED
+    if position is not None:
+        _, ahead, length = position
+        result.position, result.players_ahead, result.queue_length = ahead + 1, ahead, length
+    staged_court_id = next_up.court_for(player.id)
+    if staged_court_id is not None:
+        result.next_up_court_name = db.query(Court.name).filter(Court.id == staged_court_id).scalar()
+    return result
+
+
+@queue_router.get("/position", response_model=schemas.QueuePosition)
+def get_my_position(player_id: int = Depends(get_current_player_id), db: Session = Depends(get_db)):
+    """The logged-in player's queue position, players ahead and current court"""
+    return queue_position(db, player_id)
+
+
+@queue_router.get("/position/{player_id}", response_model=schemas.QueuePosition)
+def get_player_position(player_id: int, db: Session = Depends(get_db)):
+    """A player's queue position, players ahead and current court"""
+    return queue_position(db, player_id)
+
+
 @queue_router.post("/auto-fill-courts")
 async def auto_fill_courts_endpoint(db: Session = Depends(get_db)):
     """Manually trigger auto-fill of courts with queued players"""
@@ -307,30 +441,20 @@ async def auto_fill_courts_endpoint(db: Session = Depends(get_db)):
 
 
 @queue_router.post("/refresh-all")
-async def refresh_all_data(db: Session = Depends(get_db)):
-    """Get complete app state - all queues and courts with players, with auto-fill"""
+async def refresh_all_data(request: Request, format: schemas.SnapshotFormat = schemas.SnapshotFormat.OBJECTS):
+    """Get complete app state - all queues and courts with players.
+
+    Read-only: auto-fill runs in the background scheduler after state changes,
+    this only reports the latest pass and whether another one is pending.
+    Screens polling at the same moment share one computation.
+    `format=columnar` returns player lists as parallel arrays.
+    """
+    columnar = format == schemas.SnapshotFormat.COLUMNAR
     try:
-        # Auto-fill courts before returning data
-        auto_assignments = await auto_fill_courts(db)
-
-        # Get queue data
-        queues_response = await get_all_queues(db)
-
-        # Get all courts with their players
-        courts = db.query(Court).all()
-        courts_data = []
-        print(auto_assignments)
-        print(queues_response)
-        for court in courts:
-            court_response = await get_court_players(court.id, db)
-            courts_data.append(court_response)
-
-        return {
-            "queues": queues_response,
-            "courts": courts_data,
-            "auto_assignments": auto_assignments,
-            "timestamp": "refreshed"
-        }
+        return Response(await read_coalescer.run(f"queue:refresh-all:{format.value}",
+                                                   partial(app_state_snapshot, columnar=columnar),
+                                                   read_session_factory(request)),
+                        media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error refreshing data: {str(e)}")
@@ -344,6 +468,7 @@ async def start_new_session(db: Session = Depends(get_db)):
         players = db.query(Player).all()
         deactivated_count = 0
         for player in players:
+            player.games_played = 0  # Fairness counts games per session
             if player.is_active:
                 player.is_active = False
                 player.court_id = None  # Remove from court
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from typing import List
+
+from ..database.database import get_db, get_read_db
+from ..database.models import Player, Team
+from ..database import schemas
+from ..services.autofill import autofill_scheduler
+from .auth import get_current_player_id
+from .idempotency import IdempotentRoute
+
+team_router = APIRouter(
+    tags=["teams"],
+    route_class=IdempotentRoute
+)
+
+
+def create_pair(db: Session, players: List[Player], number: str = None) -> Team:
+    """Pair two players into a doubles team; the fill pass keeps them on one court"""
+    first, second = players
+    if first.id == second.id:
+        raise HTTPException(status_code=400, detail="A pair needs two different players")
+    for player in players:
+        if player.team_id is not None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Player {player.name} is already paired (team {player.team_id})"
+            )
+    if first.qualification != second.qualification:
+        raise HTTPException(status_code=400, detail="Paired players must share a qualification")
+
+    if not number:
+        number = str((db.query(func.max(Team.id)).scalar() or 0) + 1)
+    team = Team(number=number)
+    db.add(team)
+    db.flush()
+    for player in players:
+        player.team_id = team.id
+    db.commit()
+    db.refresh(team)
+    autofill_scheduler.notify("team_changed")
+    return team
+
+
+@team_router.get("/", response_model=List[schemas.Team])
+def get_teams(db: Session = Depends(get_read_db)):
+    """Get all doubles pairs with their players"""
+    return db.query(Team).options(selectinload(Team.players)).order_by(Team.id).all()
+
+
+@team_router.post("/", response_model=schemas.Team)
+def create_team(team: schemas.TeamCreate, db: Session = Depends(get_db)):
+    """Pair two players so they queue and play together"""
+    players = db.query(Player).filter(Player.id.in_(team.player_ids)).all()
+    if len(players) != len(set(team.player_ids)):
+        raise HTTPException(status_code=404, detail="Player not found")
+    players.sort(key=lambda p: team.player_ids.index(p.id))
+    if len(players) != 2:
+        raise HTTPException(status_code=400, detail="A pair needs two different players")
+    return create_pair(db, players, team.number)
+
+
+@team_router.post("/partner", response_model=schemas.Team)
+def pair_with_partner(
+    request: schemas.PartnerRequest,
+    player_id: int = Depends(get_current_player_id),
+    db: Session = Depends(get_db)
+):
+    """Pair the logged-in player with a partner, by the partner's email"""
+    player = db.get(Player, player_id)
+    partner = db.query(Player).filter(Player.email == request.partner_email).first()
+    if player is None or partner is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return create_pair(db, [player, partner])
+
+
+@team_router.get("/{team_id}", response_model=schemas.Team)
+def read_team(team_id: int, db: Session = Depends(get_read_db)):
+    """Get a specific pair by ID"""
+    team = db.get(Team, team_id)
+    if team is None:
+        raise HTTPException(status_code=404, detail=f"Team with ID {team_id} not found")
+    return team
+
+
+@team_router.delete("/{team_id}", response_model=schemas.ApiResponse)
+def delete_team(team_id: int, db: Session = Depends(get_db)):
+    """Split a pair; both players go back to queueing as singles"""
+    team = db.get(Team, team_id)
+    if team is None:
+        raise HTTPException(status_code=404, detail=f"Team with ID {team_id} not found")
+    for player in team.players:
+        player.team_id = None
+    db.delete(team)
+    db.commit()
+    autofill_scheduler.notify("team_changed")
+    return schemas.ApiResponse(success=True, message=f"Team {team.number} split")
@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+
+def version_conflict(current, schema) -> HTTPException:
+    """409 carrying the row as it is now, so the client can merge and retry"""
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": f"{type(current).__name__} {current.id} was changed by someone else",
+            "current": schema.model_validate(current).model_dump(mode="json")
+        }
+    )
+
+
+def check_version(db_obj, expected, schema):
+    """Reject the edit up front if the client's copy is already out of date"""
+    if expected is not None and expected != db_obj.version:
+        raise version_conflict(db_obj, schema)
+
+
+@contextmanager
+def compare_and_swap(db: Session, db_obj, schema):
+    """Turn a lost version race at flush time into a 409.
+
+    Versioned rows are written as UPDATE ... WHERE id = ? AND version = ?;
+    if another transaction got there first no row matches and SQLAlchemy
+    raises StaleDataError. Nothing is held locked between requests.
+    """
+    try:
+        yield
+    except StaleDataError:
+        db.rollback()
+        db.refresh(db_obj)
+        raise version_conflict(db_obj, schema)
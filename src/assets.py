@@ -0,0 +1,125 @@
+"""Static asset pipeline.
+
+`python -m src.assets` copies each stylesheet and script in static/ to
+static/dist/ under a content-hashed name (scripts.<hash>.js) with gzip and,
+if the optional `brotli` package is installed, brotli variants next to it,
+and writes static/dist/manifest.json. Templates link assets through
+asset_url(), which returns the hashed URL once the manifest exists and the
+plain /static URL otherwise (development without a build step).
+
+PrecompressedStaticFiles serves the best precompressed variant the client
+accepts and marks hashed files immutable, so phones download each version
+of an asset once.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import stat
+from functools import lru_cache
+from pathlib import Path
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+
+try:
+    import brotli
+except ImportError:  # optional: gzip variants only
+    brotli = None
+
+STATIC_DIR = Path("static")
+DIST_DIR = "dist"
+MANIFEST = "manifest.json"
+ASSET_SUFFIXES = (".js", ".css")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def build_assets(static_dir: Path = STATIC_DIR):
+    """Write hashed and precompressed copies of static assets; returns the manifest"""
+    dist = static_dir / DIST_DIR
+    if dist.exists():
+        shutil.rmtree(dist)
+    dist.mkdir(parents=True)
+
+    manifest = {}
+    for source in sorted(static_dir.iterdir()):
+        if not source.is_file() or source.suffix not in ASSET_SUFFIXES:
+            continue
+        content = source.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        target = dist / f"{source.stem}.{digest}{source.suffix}"
+        target.write_bytes(content)
+        # mtime=0 keeps the .gz byte-identical across builds
+        target.with_name(target.name + ".gz").write_bytes(gzip.compress(content, 9, mtime=0))
+        if brotli is not None:
+            target.with_name(target.name + ".br").write_bytes(brotli.compress(content, quality=11))
+        manifest[source.name] = f"{DIST_DIR}/{target.name}"
+
+    (dist / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+@lru_cache(maxsize=None)
+def load_manifest(static_dir: Path = STATIC_DIR):
+    try:
+        return json.loads((static_dir / DIST_DIR / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def asset_url(name: str) -> str:
+    """URL for a static asset, hashed when the asset pipeline has been run"""
+    return f"/static/{load_manifest().get(name, name)}"
+
+
+def configure_templates(templates):
+    """Expose asset_url() to Jinja2 templates"""
+    templates.env.globals["asset_url"] = asset_url
+    return templates
+
+
+def _accepted_encodings(scope):
+    accepted = set()
+    for part in Headers(scope=scope).get("accept-encoding", "").split(","):
+        coding, _, params = part.partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that picks .br / .gz variants by Accept-Encoding and
+    serves content-hashed files with immutable cache headers"""
+
+    async def get_response(self, path: str, scope):
+        response = None
+        hashed = path.startswith(DIST_DIR + "/") or path.startswith(DIST_DIR + os.sep)
+        if hashed and not path.endswith((".br", ".gz")):
+            accepted = _accepted_encodings(scope)
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                    response = self.file_response(full_path, stat_result, scope)
+                    response.headers["content-encoding"] = encoding
+                    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                    if media_type.startswith("text/"):
+                        media_type += "; charset=utf-8"
+                    response.headers["content-type"] = media_type
+                    break
+        if response is None:
+            response = await super().get_response(path, scope)
+        if hashed and response.status_code in (200, 304):
+            response.headers["cache-control"] = IMMUTABLE
+            response.headers["vary"] = "Accept-Encoding"
+        return response
+
+
+if __name__ == "__main__":
+    for name, hashed_name in build_assets().items():
+        print(f"{name} -> {hashed_name}")
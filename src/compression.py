@@ -0,0 +1,26 @@
+"""Response compression.
+
+Starlette's GZipMiddleware only learned to leave text/event-stream and
+already encoded responses alone in recent releases; older ones buffer the
+server-sent event stream and gzip the precompressed static files a second
+time. Those paths are excluded by prefix instead, so the behaviour does not
+depend on the installed Starlette version.
+"""
+from fastapi.middleware.gzip import GZipMiddleware
+
+# The server-sent event stream and the precompressed static files
+UNCOMPRESSED_PATHS = ("/api/queue/events", "/static/")
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes requests under `exclude_paths` straight through"""
+
+    def __init__(self, app, exclude_paths=UNCOMPRESSED_PATHS, **kwargs):
+        super().__init__(app, **kwargs)
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
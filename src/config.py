@@ -0,0 +1,109 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Database startup: retries run in the background so the app can serve
+# /api/health while the database is still coming up
+DB_INIT_MAX_RETRIES = int(os.getenv("DB_INIT_MAX_RETRIES", "5"))
+DB_INIT_RETRY_DELAY = float(os.getenv("DB_INIT_RETRY_DELAY", "2"))
+
+# SQLite profile (ignored on PostgreSQL): WAL journal and tuned pragmas, plus
+# an optional in-process single-writer queue (see benchmarks/bench_sqlite.py)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "1") == "1"
+SQLITE_WRITE_QUEUE = os.getenv("SQLITE_WRITE_QUEUE", "0") == "1"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Venue identifier, used to scope background runners shared by all workers
+VENUE_ID = os.getenv("VENUE_ID", "default")
+
+# Auto-fill scheduler: state changes are debounced into a single fill pass
+AUTOFILL_DEBOUNCE_SECONDS = float(os.getenv("AUTOFILL_DEBOUNCE_SECONDS", "0.5"))
+AUTOFILL_MAX_DELAY_SECONDS = float(os.getenv("AUTOFILL_MAX_DELAY_SECONDS", "2"))
+
+# Timed game rotation: release players back to the queue when a game on a
+# full court has run for its court type's duration (0 = untimed)
+GAME_ROTATION_ENABLED = os.getenv("GAME_ROTATION_ENABLED", "0") == "1"
+GAME_DURATION_MINUTES = {
+    "advanced": float(os.getenv("GAME_DURATION_ADVANCED_MINUTES", "15")),
+    "intermediate": float(os.getenv("GAME_DURATION_INTERMEDIATE_MINUTES", "15")),
+    "training": float(os.getenv("GAME_DURATION_TRAINING_MINUTES", "0")),
+}
+GAME_ROTATION_TICK_SECONDS = float(os.getenv("GAME_ROTATION_TICK_SECONDS", "1"))
+GAME_ROTATION_RESYNC_SECONDS = float(os.getenv("GAME_ROTATION_RESYNC_SECONDS", "30"))
+
+# Queue fairness: players are served by a score of minutes waited, minus
+# games played this session, plus fill passes sat out
+FAIRNESS_WAIT_WEIGHT = float(os.getenv("FAIRNESS_WAIT_WEIGHT", "1"))
+FAIRNESS_GAMES_WEIGHT = float(os.getenv("FAIRNESS_GAMES_WEIGHT", "10"))
+FAIRNESS_SIT_OUT_WEIGHT = float(os.getenv("FAIRNESS_SIT_OUT_WEIGHT", "5"))
+FAIRNESS_RESYNC_SECONDS = float(os.getenv("FAIRNESS_RESYNC_SECONDS", "30"))
+
+# Doubles pairs: fill passes put both players of a pair on the same court
+# or neither (0 = pairs are filled as individuals)
+PAIR_FILL_ENABLED = os.getenv("PAIR_FILL_ENABLED", "1") == "1"
+
+# Balanced matches: an empty court takes the four players (and 2v2 split)
+# with the closest ratings from the next MATCH_WINDOW queued players; the
+# longest-waiting player always plays
+MATCH_BALANCE_ENABLED = os.getenv("MATCH_BALANCE_ENABLED", "1") == "1"
+MATCH_WINDOW = int(os.getenv("MATCH_WINDOW", "8"))
+
+# Idempotency-Key support on mutating routes: completed responses are kept
+# per process for replay to retried requests
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+
+# Optional read replica: read-only routes use it unless the client wrote
+# within the sticky window or replication lag exceeds the threshold
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "2"))
+
+# Response compression (gzip, negotiated by Accept-Encoding) for API
+# responses of at least COMPRESSION_MIN_BYTES
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+
+# Login sessions: signed tokens, validated against a per-process cache that
+# falls back to the sessions table. Set SESSION_SECRET when running more
+# than one worker so every worker accepts the same tokens
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", "12"))
+SESSION_CACHE_SECONDS = float(os.getenv("SESSION_CACHE_SECONDS", "300"))
+SESSION_CACHE_MAX = int(os.getenv("SESSION_CACHE_MAX", "10000"))
+
+# Check-in burst buffer: logins are queued in memory and activated in
+# batches, one transaction and one fill notification per flush
+CHECKIN_FLUSH_SECONDS = float(os.getenv("CHECKIN_FLUSH_SECONDS", "0.25"))
+CHECKIN_MAX_BATCH = int(os.getenv("CHECKIN_MAX_BATCH", "500"))
+
+# Rating updates: recorded match results are applied to player ratings by a
+# background job, in result order, RATING_BATCH_SIZE results per transaction
+RATING_K_FACTOR = float(os.getenv("RATING_K_FACTOR", "32"))
+RATING_BATCH_SIZE = int(os.getenv("RATING_BATCH_SIZE", "500"))
+RATING_DEBOUNCE_SECONDS = float(os.getenv("RATING_DEBOUNCE_SECONDS", "2"))
+
+# Analytics: the floor is sampled every ANALYTICS_SAMPLE_SECONDS and waits
+# are recorded as players go on court, rolled up into per-minute buckets
+# (kept ANALYTICS_MINUTE_RETENTION_DAYS) and per-hour buckets (kept forever)
+ANALYTICS_ENABLED = os.getenv("ANALYTICS_ENABLED", "1") == "1"
+ANALYTICS_SAMPLE_SECONDS = float(os.getenv("ANALYTICS_SAMPLE_SECONDS", "60"))
+ANALYTICS_MINUTE_RETENTION_DAYS = float(os.getenv("ANALYTICS_MINUTE_RETENTION_DAYS", "14"))
+
+# Mutation log: every committed change to courts, teams, players and match
+# results is appended to this file for `python -m src.replay` (unset = off).
+# "{pid}" in the path is replaced by the process id, one log per worker
+MUTATION_LOG_PATH = os.getenv("MUTATION_LOG_PATH") or None
+
+# Next-up staging: the next group for every court is planned ahead as the
+# queue and floor change, shown on the boards, and put on court with one
+# write when a game ends (0 = freed courts wait for the next fill pass)
+NEXT_UP_ENABLED = os.getenv("NEXT_UP_ENABLED", "1") == "1"
+NEXT_UP_DEBOUNCE_SECONDS = float(os.getenv("NEXT_UP_DEBOUNCE_SECONDS", "0.1"))
+NEXT_UP_RESYNC_SECONDS = float(os.getenv("NEXT_UP_RESYNC_SECONDS", "60"))
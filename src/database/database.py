@@ -1,40 +1,137 @@
 import os
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
+from .. import config
+from .replica import STICKY_COOKIE, ReplicaRouter
+from .write_queue import WriteQueue
+
 # Load environment variables
 load_dotenv()
 
 # Get database URL from environment or fall back to default SQLite connection
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-# Configure engine based on database type
-if DATABASE_URL.startswith("postgresql"):
-    engine = create_engine(
-        DATABASE_URL,
-        pool_pre_ping=True,
-        pool_recycle=300,
-        pool_size=10,
-        max_overflow=20,
-        connect_args={
-            "connect_timeout": 10,
-            "application_name": "badminton_queue"
-        }
-    )
-else:
-    engine = create_engine(
-        DATABASE_URL,
+def _create_engine(url: str):
+    """Configure engine based on database type"""
+    if url.startswith("postgresql"):
+        return create_engine(
+            url,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            pool_size=10,
+            max_overflow=20,
+            connect_args={
+                "connect_timeout": 10,
+                "application_name": "badminton_queue"
+            }
+        )
+    return create_engine(
+        url,
         pool_pre_ping=True,
         pool_recycle=300,
+        connect_args={"check_same_thread": False}
     )
 
+engine = _create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Optional read replica for read-only routes (see get_read_db)
+replica_engine = _create_engine(config.DATABASE_REPLICA_URL) if config.DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None else None
+)
+replica_router = ReplicaRouter(
+    SessionLocal,
+    ReplicaSessionLocal,
+    max_lag=config.REPLICA_MAX_LAG_SECONDS,
+    sticky_seconds=config.REPLICA_STICKY_SECONDS,
+    check_interval=config.REPLICA_LAG_CHECK_SECONDS
+)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning for multi-tablet club nights.
+
+    WAL lets readers run while a write is in progress and makes
+    synchronous=NORMAL safe (no fsync per commit, only at checkpoints).
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute(f"PRAGMA synchronous = {config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size = -{config.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size = {config.SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+
+
+# SQLite production profile: pragmas on every pooled connection, and
+# optionally a single-writer queue so concurrent write transactions wait
+# their turn in arrival order instead of polling the file lock
+write_queue = None
+if engine.dialect.name == "sqlite" and config.SQLITE_PROFILE:
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    if replica_engine is not None and replica_engine.dialect.name == "sqlite":
+        event.listen(replica_engine, "connect", set_sqlite_pragmas)
+    if config.SQLITE_WRITE_QUEUE:
+        write_queue = WriteQueue(timeout=config.SQLITE_BUSY_TIMEOUT_MS / 1000)
+        write_queue.attach(SessionLocal)
+
+def get_db(request: Request, response: Response):
+    if replica_router.enabled and request.method not in ("GET", "HEAD"):
+        # Read-your-writes: this client's reads go to the primary for a while
+        response.set_cookie(STICKY_COOKIE, f"{replica_router.sticky_until():.3f}",
+                            max_age=int(replica_router.sticky_seconds) + 1,
+                            httponly=True, samesite="lax")
+    # Labels this request's commits in the mutation log
+    db = SessionLocal(info={"source": f"{request.method} {request.url.path}"})
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def read_session_factory(request: Request):
+    """Session factory for a read-only request: replica unless the client
+    just wrote or the replica is lagging or down"""
+    return replica_router.session_factory(request.cookies.get(STICKY_COOKIE))
+
+def get_read_db(request: Request):
+    """Session for read-only routes, routed by read_session_factory"""
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Simulation and replay tools swap in a virtual clock
+_clock = None
+
+def set_clock(clock):
+    """Use `clock()` instead of wall time for utcnow(); pass None to restore"""
+    global _clock
+    _clock = clock
+
+def utcnow():
+    """Naive UTC timestamp, matching how DateTime columns round-trip on SQLite"""
+    if _clock is not None:
+        return _clock()
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def get_pool_status():
+    """Snapshot of the engine's connection pool for the readiness probe"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            status[name] = counter()
+    if write_queue is not None:
+        status["write_queue"] = write_queue.status()
+    status["replica"] = replica_router.status()
+    return status
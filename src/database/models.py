@@ -17,10 +17,18 @@ class Player(Base):
     __tablename__ = "players"
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
-    email: Mapped[str] = mapped_column(String(255), nullable=True)
+    email: Mapped[str] = mapped_column(String(255), nullable=True, index=True)
     qualification : Mapped[str] = mapped_column(String(255), nullable=False)
     is_active : Mapped[bool] = mapped_column(nullable=False,default=False)
     
+    # Queue fairness bookkeeping (see src/services/fairness.py)
+    queued_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    queued_pass: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    games_played: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Skill rating (Elo scale) used to balance games (see src/services/matchmaking.py)
+    rating: Mapped[float] = mapped_column(Float, nullable=False, default=1500.0, server_default="1500")
+    
     court_id: Mapped[int | None] = mapped_column(ForeignKey("courts.id"), nullable=True)
     court: Mapped["Court"] = relationship("Court", back_populates="players")
     
@@ -29,6 +37,11 @@ class Player(Base):
     
     # Add relationship to court assignments
     court_assignments: Mapped[list["CourtAssignment"]] = relationship("CourtAssignment", back_populates="player")
+    
+    # Optimistic concurrency: every ORM update runs as
+    # UPDATE ... WHERE id = ? AND version = ? and bumps the version
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
 
 
 class Court(Base):
@@ -36,10 +49,21 @@ class Court(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     court_type: Mapped[str] = mapped_column(String(255), nullable=False,default= "training")
-    players: Mapped[list["Player"]] = relationship("Player", back_populates="court")
+    # Cascade topology: players on this court move up into `feeds_court_id`
+    # (e.g. W1 feeds G1); higher fill_priority is filled first within a level
+    feeds_court_id: Mapped[int | None] = mapped_column(ForeignKey("courts.id"), nullable=True)
+    fill_priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # Players per game: 2 singles, 4 doubles, 5-6 doubles with rotation
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False, default=4, server_default="4")
+    # Set when the court fills up, cleared when it drops below capacity
+    game_started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    players: Mapped[list["Player"]] = relationship("Player", back_populates="court", foreign_keys="Player.court_id")
     
     # Add relationship to court assignments
     assignments: Mapped[list["CourtAssignment"]] = relationship("CourtAssignment", back_populates="court")
+    
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
 
 
 class Team(Base):
@@ -59,4 +83,56 @@ class CourtAssignment(Base):
     
     # Relationships
     player: Mapped["Player"] = relationship("Player", back_populates="court_assignments")
-    court: Mapped["Court"] = relationship("Court", back_populates="assignments")
\ No newline at end of file
+    court: Mapped["Court"] = relationship("Court", back_populates="assignments")
+
+class AuthSession(Base):
+    """Login session; the id is what session tokens sign (see src/services/sessions.py)"""
+    __tablename__ = "sessions"
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class MatchResult(Base):
+    """A finished game; ratings are updated from it in the background (see src/services/ratings.py)"""
+    __tablename__ = "match_results"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    court_id: Mapped[int | None] = mapped_column(ForeignKey("courts.id", ondelete="SET NULL"), nullable=True)
+    winner: Mapped[str] = mapped_column(String(1), nullable=False)  # "A" or "B"
+    score_a: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    score_b: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Set once the rating job has applied this result
+    rated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+
+    players: Mapped[list["MatchPlayer"]] = relationship("MatchPlayer", back_populates="result")
+
+
+class MatchPlayer(Base):
+    __tablename__ = "match_players"
+    result_id: Mapped[int] = mapped_column(ForeignKey("match_results.id", ondelete="CASCADE"), primary_key=True)
+    player_id: Mapped[int] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"), primary_key=True)
+    side: Mapped[str] = mapped_column(String(1), nullable=False)
+
+    result: Mapped["MatchResult"] = relationship("MatchResult", back_populates="players")
+
+
+class AnalyticsRollup(Base):
+    """One pre-aggregated analytics bucket (see src/services/analytics.py).
+
+    `metric` is court_occupancy (key: court id), queue_length or
+    wait_minutes (key: qualification). Buckets only ever add, so a range
+    query sums rows and merges sketches.
+    """
+    __tablename__ = "analytics_rollups"
+    resolution: Mapped[str] = mapped_column(String(8), primary_key=True)  # "minute" or "hour"
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    metric: Mapped[str] = mapped_column(String(32), primary_key=True)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    total: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    capacity: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    samples: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Mergeable quantile sketch (JSON), for wait_minutes
+    sketch: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "db_primary_until"
+
+# NULL when the server is not a standby (e.g. a second local database in
+# development), and 0 while the standby has replayed everything it received,
+# so an idle primary does not look like growing lag
+POSTGRES_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+class ReplicaRouter:
+    """Chooses between the primary and the read replica for read-only requests.
+
+    Reads go to the replica unless
+      - the client mutated something within the last `sticky_seconds`
+        (read-your-writes: mutating requests set a cookie with a deadline),
+      - the replica's replication lag exceeds `max_lag`, or
+      - the replica could not be reached on the last check.
+    Lag is measured at most every `check_interval` seconds and shared by
+    all requests. Replicas on other backends are assumed to be current.
+    """
+
+    def __init__(self, primary_factory, replica_factory, max_lag: float,
+                 sticky_seconds: float, check_interval: float):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self.stats = Counter()
+        self._lag = None
+        self._healthy = True
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.replica_factory is not None
+
+    def sticky_until(self):
+        return time.time() + self.sticky_seconds
+
+    def is_sticky(self, cookie_value) -> bool:
+        try:
+            return cookie_value is not None and float(cookie_value) > time.time()
+        except ValueError:
+            return False
+
+    def session_factory(self, cookie_value=None):
+        """Session factory to read from for a request carrying `cookie_value`"""
+        if not self.enabled:
+            return self.primary_factory
+        if self.is_sticky(cookie_value):
+            self.stats["primary_sticky"] += 1
+            return self.primary_factory
+        if not self._replica_usable():
+            self.stats["primary_fallback"] += 1
+            return self.primary_factory
+        self.stats["replica"] += 1
+        return self.replica_factory
+
+    def _replica_usable(self) -> bool:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            # One request refreshes the measurement; the rest use the last one
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._check()
+                    self._checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        return self._healthy and (self._lag or 0) <= self.max_lag
+
+    def _check(self):
+        try:
+            with self.replica_factory() as db:
+                if db.get_bind().dialect.name == "postgresql":
+                    lag = db.execute(POSTGRES_LAG_SQL).scalar()
+                else:
+                    db.execute(text("SELECT 1"))
+                    lag = 0
+            self._lag = float(lag or 0)
+            if not self._healthy:
+                logger.info("Read replica reachable again")
+            self._healthy = True
+        except Exception as e:
+            if self._healthy:
+                logger.warning(f"Read replica unavailable, reading from primary: {e}")
+            self._healthy = False
+
+    def status(self):
+        if not self.enabled:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "healthy": self._healthy,
+            "lag_seconds": self._lag,
+            "max_lag_seconds": self.max_lag,
+            **self.stats
+        }
@@ -12,6 +12,12 @@ class CourtType(str, Enum):
     INTERMEDIATE = "intermediate"
     TRAINING = "training"
 
+class SnapshotFormat(str, Enum):
+    # objects: one {"id", "name", "qualification"} object per player
+    # columnar: {"id": [...], "name": [...], "qualification": [...]}
+    OBJECTS = "objects"
+    COLUMNAR = "columnar"
+
 class PlayerBase(BaseModel):
     name: str
     qualification: QualificationType = QualificationType.INTERMEDIATE
@@ -33,10 +39,16 @@ class PlayerUpdate(BaseModel):
     qualification: Optional[QualificationType] = None
     is_active: Optional[bool] = None
     court_id: Optional[int] = None
+    rating: Optional[float] = None
+    # Version the client last saw; the update is rejected with 409 if it changed
+    version: Optional[int] = None
 
 class Player(PlayerBase):
     id: int
     email: Optional[str] = None
+    team_id: Optional[int] = None
+    rating: float = 1500.0
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -45,14 +57,65 @@ class CourtBase(BaseModel):
     court_type: CourtType = CourtType.INTERMEDIATE
 
 class CourtCreate(CourtBase):
-    pass
+    # Players per game: 2 singles, 4 doubles, 5-6 doubles with rotation
+    capacity: int = Field(4, ge=2, le=8)
+
+class CourtUpdate(CourtBase):
+    capacity: Optional[int] = Field(None, ge=2, le=8)
+    version: Optional[int] = None
 
 class Court(CourtBase):
     id: int
+    capacity: int = 4
+    version: int = 1
+    feeds_court_id: Optional[int] = None
+    fill_priority: int = 0
+    game_started_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
+class TeamCreate(BaseModel):
+    # A doubles pair: exactly two players of the same qualification
+    player_ids: List[int] = Field(min_length=2, max_length=2)
+    number: Optional[str] = None
+
+class PartnerRequest(BaseModel):
+    partner_email: str
+
+class Team(BaseModel):
+    id: int
+    number: str
+    players: List[Player] = []
+
+    class Config:
+        from_attributes = True
+
+class Side(str, Enum):
+    A = "A"
+    B = "B"
+
+class MatchResultCreate(BaseModel):
+    side_a: List[int] = Field(min_length=1)
+    side_b: List[int] = Field(min_length=1)
+    winner: Side
+    score_a: Optional[int] = None
+    score_b: Optional[int] = None
+    # Send everyone on the court back to the queue with the result
+    release_players: bool = True
+
+class MatchResult(BaseModel):
+    id: int
+    court_id: Optional[int] = None
+    winner: Side
+    score_a: Optional[int] = None
+    score_b: Optional[int] = None
+    recorded_at: datetime
+    rated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class QueueEntryBase(BaseModel):
     player_id: int
     queue_type: str
@@ -82,6 +145,10 @@ class CourtAssignment(CourtAssignmentBase):
     class Config:
         from_attributes = True
 
+class CourtTopologyUpdate(BaseModel):
+    feeds_court_id: Optional[int] = None
+    fill_priority: int = 0
+
 class CourtWithPlayers(Court):
     players: List[Player] = []
     
@@ -92,6 +159,27 @@ class QueueInfo(BaseModel):
     advanced_queue: List[Player] = []
     intermediate_queue: List[Player] = []
 
+class PlayerStatus(str, Enum):
+    INACTIVE = "inactive"
+    QUEUED = "queued"
+    ON_COURT = "on_court"
+
+class QueuePosition(BaseModel):
+    player_id: int
+    name: str
+    qualification: str
+    status: PlayerStatus
+    # Place in the qualification's fairness order (1 = next up), when queued
+    position: Optional[int] = None
+    players_ahead: Optional[int] = None
+    queue_length: Optional[int] = None
+    # The court the player is on
+    court_id: Optional[int] = None
+    court_name: Optional[str] = None
+    court_type: Optional[str] = None
+    # The court the player is staged to go on next, when queued
+    next_up_court_name: Optional[str] = None
+
 class ApiResponse(BaseModel):
     success: bool
     message: str
@@ -0,0 +1,94 @@
+import threading
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class WriteQueueTimeout(Exception):
+    """Raised when a session waits longer than the busy timeout for its write turn"""
+
+
+class WriteQueue:
+    """In-process single-writer queue for SQLite.
+
+    SQLite allows one writer at a time; without coordination concurrent
+    writers spin on the file lock until they hit "database is locked".
+    Sessions instead take a ticket on their first write and hold the turn
+    until their transaction ends, in arrival order. Reads never queue, and
+    with WAL they run concurrently with the active writer.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._waiting = deque()
+        self._owner = None
+        self.writes = 0
+        self.max_waiting = 0
+
+    def acquire(self, session: Session):
+        with self._lock:
+            if self._owner is session:
+                return
+            self.writes += 1
+            if self._owner is None:
+                self._owner = session
+                return
+            # Direct FIFO handoff: release() wakes exactly the next waiter
+            turn = threading.Event()
+            entry = (turn, session)
+            self._waiting.append(entry)
+            self.max_waiting = max(self.max_waiting, len(self._waiting))
+
+        if turn.wait(self.timeout):
+            return
+        with self._lock:
+            if turn.is_set():
+                return
+            self._waiting.remove(entry)
+            self.writes -= 1
+        raise WriteQueueTimeout(
+            f"Timed out after {self.timeout}s waiting for the database write queue")
+
+    def release(self, session: Session):
+        with self._lock:
+            if self._owner is not session:
+                return
+            if self._waiting:
+                turn, self._owner = self._waiting.popleft()
+                turn.set()
+            else:
+                self._owner = None
+
+    def status(self):
+        with self._lock:
+            return {
+                "active": self._owner is not None,
+                "waiting": len(self._waiting),
+                "max_waiting": self.max_waiting,
+                "writes": self.writes
+            }
+
+    def attach(self, session_factory):
+        """Hook the queue into every session created by the factory.
+
+        Sessions also carry the queue in `session.info["write_queue"]`, for
+        code that takes SQLite's write lock itself (see try_runner_lock).
+        """
+        session_factory.configure(info={**session_factory.kw.get("info", {}), "write_queue": self})
+
+        @event.listens_for(session_factory, "before_flush")
+        def _acquire_on_flush(session, flush_context, instances):
+            self.acquire(session)
+
+        @event.listens_for(session_factory, "do_orm_execute")
+        def _acquire_on_bulk_write(orm_execute_state):
+            if (orm_execute_state.is_update or orm_execute_state.is_delete
+                    or orm_execute_state.is_insert):
+                self.acquire(orm_execute_state.session)
+
+        @event.listens_for(session_factory, "after_transaction_end")
+        def _release_on_transaction_end(session, transaction):
+            if transaction.parent is None:
+                self.release(session)
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI
+from sqlalchemy.exc import OperationalError
+
+from . import config
+from .database.database import engine, replica_engine
+from .database.models import Base
+
+logger = logging.getLogger(__name__)
+
+
+def _connect_and_create_tables():
+    """Blocking part of database initialization, run in a worker thread"""
+    with engine.connect():
+        logger.info("Database connection successful!")
+
+    logger.info("Creating database tables...")
+    Base.metadata.create_all(bind=engine)
+    logger.info("Database tables created successfully!")
+
+
+async def init_database(
+    app: FastAPI,
+    max_retries: int = config.DB_INIT_MAX_RETRIES,
+    retry_delay: float = config.DB_INIT_RETRY_DELAY,
+) -> bool:
+    """Initialize database with retry logic for Railway deployment.
+
+    Connection attempts run in a worker thread and backoff uses asyncio.sleep,
+    so the event loop keeps serving requests while the database comes up.
+    """
+    for attempt in range(max_retries):
+        try:
+            logger.info(f"Database initialization attempt {attempt + 1}...")
+            await asyncio.to_thread(_connect_and_create_tables)
+            if config.MUTATION_LOG_PATH:
+                from .services.mutation_log import mutation_log
+                # Snapshot or checkpoint first, so the log covers every later commit
+                await asyncio.to_thread(mutation_log.open)
+            app.state.db_ready = True
+            app.state.db_error = None
+            # Catch up on anything that changed while this worker was down
+            from .services.autofill import autofill_scheduler
+            from .services.ratings import rating_updater
+            autofill_scheduler.notify("startup")
+            rating_updater.notify()
+            if config.GAME_ROTATION_ENABLED:
+                from .services.rotation import game_rotation
+                await game_rotation.start()
+            return True
+
+        except OperationalError as e:
+            app.state.db_error = str(e)
+            logger.warning(f"Database connection failed (attempt {attempt + 1}): {e}")
+            if attempt < max_retries - 1:
+                logger.info(f"Retrying in {retry_delay} seconds...")
+                await asyncio.sleep(retry_delay)
+                retry_delay *= 2  # Exponential backoff
+            else:
+                logger.error("Failed to connect to database after all retries")
+        except Exception as e:
+            app.state.db_error = str(e)
+            logger.error(f"Unexpected error during database setup: {e}")
+            break
+
+    return False
+
+
+def _background_services():
+    """The services this worker runs, in start order.
+
+    Imported here, not at module level, so importing the app does not pay
+    for them, and optional ones only load when their feature flag is on.
+    """
+    from .services.autofill import autofill_scheduler
+    from .services.checkin import checkin_buffer
+    from .services.events import event_bus
+    from .services.ratings import rating_updater
+
+    services = [autofill_scheduler, checkin_buffer, rating_updater]
+    if config.ANALYTICS_ENABLED:
+        from .services.analytics import analytics_recorder
+        services.append(analytics_recorder)
+    if config.NEXT_UP_ENABLED:
+        from .services.staging import next_up
+        services.append(next_up)
+    services.append(event_bus)
+    return services
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start database initialization and background services, clean up on shutdown"""
+    app.state.db_ready = False
+    app.state.db_error = None
+    db_init_task = asyncio.create_task(init_database(app))
+    services = _background_services()
+    for service in services:
+        await service.start()
+
+    try:
+        yield
+    finally:
+        db_init_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await db_init_task
+        if config.GAME_ROTATION_ENABLED:
+            from .services.rotation import game_rotation
+            await game_rotation.stop()
+        for service in reversed(services):
+            await service.stop()
+        if config.MUTATION_LOG_PATH:
+            from .services.mutation_log import mutation_log
+            await asyncio.to_thread(mutation_log.close)
+        engine.dispose()
+        if replica_engine is not None:
+            replica_engine.dispose()
@@ -1,14 +1,14 @@
-from fastapi import FastAPI, Depends, HTTPException
+from functools import lru_cache
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import os
 import logging
 from dotenv import load_dotenv
-import psycopg2
-from sqlalchemy import inspect
-from sqlalchemy.exc import OperationalError
 
-from .database.database import engine, Base, SessionLocal
+from .assets import PrecompressedStaticFiles, configure_templates
+from .compression import SelectiveGZipMiddleware
+from . import config
+from .lifespan import lifespan
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -17,52 +17,15 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Create FastAPI app
+# Create FastAPI app - database initialization with retry logic runs in the
+# lifespan handler so startup never blocks on the database
 app = FastAPI(
     title="Badminton Queue System",
     description="API for managing badminton courts and player queues",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Try to create database tables with better error handling
-def init_database():
-    """Initialize database with retry logic for Railway deployment"""
-    import time
-    max_retries = 5
-    retry_delay = 2
-    
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"Database initialization attempt {attempt + 1}...")
-            
-            # Test database connection
-            with engine.connect() as connection:
-                logger.info("Database connection successful!")
-            
-            # Create tables if they don't exist
-            logger.info("Creating database tables...")
-            Base.metadata.create_all(bind=engine)
-            logger.info("Database tables created successfully!")
-            return True
-            
-        except OperationalError as e:
-            logger.warning(f"Database connection failed (attempt {attempt + 1}): {e}")
-            if attempt < max_retries - 1:
-                logger.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-            else:
-                logger.error("Failed to connect to database after all retries")
-                raise e
-        except Exception as e:
-            logger.error(f"Unexpected error during database setup: {e}")
-            raise e
-    
-    return False
-
-# Initialize database
-init_database()
-
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -72,33 +35,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses; precompressed static files and the server-sent
+# event stream are excluded (see src/compression.py)
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=config.COMPRESSION_MIN_BYTES,
+    compresslevel=config.COMPRESSION_LEVEL,
+)
+
 # Import API routers
-from .api import players, courts, queue, auth
+from .api import players, courts, queue, auth, health, teams, analytics
 
 # Include routers with API prefixes
+app.include_router(health.health_router, prefix="/api")
 app.include_router(auth.auth_router, prefix="/api/auth")
 app.include_router(players.player_router, prefix="/api/players")
 app.include_router(courts.court_router, prefix="/api/courts")
 app.include_router(queue.queue_router, prefix="/api/queue")
+app.include_router(teams.team_router, prefix="/api/teams")
+app.include_router(analytics.analytics_router, prefix="/api/analytics")
+
+# Mount static files (hashed, precompressed builds from `python -m src.assets`)
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+@lru_cache(maxsize=None)
+def get_templates():
+    from fastapi.templating import Jinja2Templates
+    return configure_templates(Jinja2Templates(directory="templates"))
 
 @app.get("/")
-async def read_root():
+async def read_root(request: Request):
     # Serve the main HTML page
-    from fastapi.responses import FileResponse
-    return FileResponse('templates/index.html')
+    return get_templates().TemplateResponse(request, "index.html")
 
 @app.get("/login")
-async def login_page():
+async def login_page(request: Request):
     # Serve the login page
-    from fastapi.responses import FileResponse
-    return FileResponse('templates/login.html')
+    return get_templates().TemplateResponse(request, "login.html")
 
-@app.get("/api/health")
-def health_check():
-    return {"status": "healthy"}
+@app.get("/dashboard")
+async def player_dashboard(request: Request):
+    # Serve the player's own queue position page
+    return get_templates().TemplateResponse(request, "player_dashboard.html")
 
 # If running this script directly
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+"""Replay a recorded mutation log.
+
+Rebuilds the floor from the log's snapshot (see
+src/services/mutation_log.py), then applies every logged transaction in
+order as fast as it will go, against a fresh database (in-memory SQLite by
+default) or plain in-memory state. The state is checked against each
+checkpoint digest in the log, and throughput is reported, so a recorded
+club night doubles as a realistic write workload for benchmarking.
+
+    python -m src.replay mutations.log
+    python -m src.replay mutations.log --memory
+    python -m src.replay mutations.log --database-url postgresql://localhost/replay_test
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import create_engine, delete, func, insert, select, update
+from sqlalchemy.pool import StaticPool
+
+from .database.models import Base
+from .services.mutation_log import LOGGED_TABLES, decode_row, read_tables, state_digest
+
+
+class ReplayError(Exception):
+    pass
+
+
+class MemoryState:
+    """Logged tables as {table: {primary key: {column: encoded value}}}"""
+
+    def __init__(self):
+        self.tables = {name: {} for name in LOGGED_TABLES}
+
+    def load(self, snapshot, columns):
+        for name, rows in snapshot.items():
+            for values in rows:
+                self._insert(name, dict(zip(columns[name], values)))
+
+    def apply(self, ops):
+        for op in ops:
+            kind, name = op[0], op[1]
+            if kind == "i":
+                self._insert(name, op[2])
+                continue
+            row = self.tables[name].get(tuple(op[2]))
+            if row is None:
+                raise ReplayError(f"{name} {op[2]} does not exist")
+            if kind == "u":
+                row.update(op[3])
+            else:
+                del self.tables[name][tuple(op[2])]
+
+    def digest(self):
+        tables = {}
+        for name, rows in self.tables.items():
+            columns = [c.name for c in Base.metadata.tables[name].c]
+            tables[name] = [[row.get(c) for c in columns] for row in rows.values()]
+        return state_digest(tables)
+
+    def close(self):
+        pass
+
+    def _insert(self, name, values):
+        table = Base.metadata.tables[name]
+        row = {c.name: None for c in table.c}
+        row.update(values)
+        key = tuple(row[c.name] for c in table.primary_key)
+        if key in self.tables[name]:
+            raise ReplayError(f"{name} {list(key)} already exists")
+        self.tables[name][key] = row
+
+
+class DatabaseState:
+    """A fresh database; each logged transaction is applied in one transaction"""
+
+    def __init__(self, url: str):
+        if url.startswith("sqlite"):
+            self.engine = create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+        else:
+            self.engine = create_engine(url)
+        Base.metadata.create_all(bind=self.engine)
+        with self.engine.connect() as connection:
+            for name in LOGGED_TABLES:
+                if connection.execute(select(func.count()).select_from(Base.metadata.tables[name])).scalar():
+                    raise ReplayError(f"{url} is not empty ({name} has rows); replay needs a fresh database")
+
+    def load(self, snapshot, columns):
+        with self.engine.begin() as connection:
+            for name in LOGGED_TABLES:
+                table = Base.metadata.tables[name]
+                rows = [decode_row(table, dict(zip(columns[name], values))) for values in snapshot.get(name, ())]
+                if rows:
+                    connection.execute(insert(table), rows)
+
+    def apply(self, ops):
+        with self.engine.begin() as connection:
+            for op in ops:
+                kind, table = op[0], Base.metadata.tables[op[1]]
+                if kind == "i":
+                    connection.execute(insert(table).values(decode_row(table, op[2])))
+                    continue
+                where = [column == value for column, value in zip(table.primary_key, op[2])]
+                if kind == "u":
+                    result = connection.execute(update(table).where(*where).values(decode_row(table, op[3])))
+                else:
+                    result = connection.execute(delete(table).where(*where))
+                if result.rowcount != 1:
+                    raise ReplayError(f"{op[1]} {op[2]} does not exist")
+
+    def digest(self):
+        with self.engine.connect() as connection:
+            return state_digest(read_tables(connection))
+
+    def close(self):
+        self.engine.dispose()
+
+
+def replay(path: str, state):
+    """Apply the log at `path` to `state`; returns replay statistics"""
+    stats = {"entries": 0, "ops": 0, "apply_seconds": 0.0, "checkpoints": 0, "mismatches": [],
+             "sources": Counter(), "first": None, "last": None}
+    with open(path) as log:
+        for number, line in enumerate(log, start=1):
+            entry = json.loads(line)
+            moment = datetime.fromisoformat(entry["t"])
+            stats["first"] = stats["first"] or moment
+            stats["last"] = moment
+
+            if "snapshot" in entry:
+                if number != 1:
+                    raise ReplayError(f"line {number}: snapshot in the middle of the log")
+                state.load(entry["snapshot"], entry["columns"])
+            elif "checkpoint" in entry:
+                digest, rows = state.digest()
+                stats["checkpoints"] += 1
+                if digest != entry["checkpoint"]:
+                    stats["mismatches"].append((number, rows, entry["rows"]))
+            else:
+                if number == 1:
+                    raise ReplayError("log does not start with a snapshot")
+                started = time.perf_counter()
+                try:
+                    state.apply(entry["ops"])
+                except ReplayError as e:
+                    raise ReplayError(f"line {number} ({entry['src']}): {e}") from None
+                stats["apply_seconds"] += time.perf_counter() - started
+                stats["entries"] += 1
+                stats["ops"] += len(entry["ops"])
+                stats["sources"][entry["src"]] += 1
+    return stats
+
+
+def print_report(stats):
+    recorded = (stats["last"] - stats["first"]).total_seconds() if stats["first"] else 0.0
+    seconds = stats["apply_seconds"]
+    print(f"  transactions:   {stats['entries']} ({stats['ops']} row changes) "
+          f"over {recorded / 60:.1f} recorded minutes")
+    if seconds > 0:
+        print(f"  replayed in:    {seconds:.3f} s, {stats['entries'] / seconds:,.0f} transactions/s, "
+              f"{stats['ops'] / seconds:,.0f} row changes/s ({recorded / seconds:,.0f}x real time)")
+    for source, count in stats["sources"].most_common(8):
+        print(f"    {count:8}  {source}")
+    failed = len(stats["mismatches"])
+    print(f"  checkpoints:    {stats['checkpoints'] - failed} verified, {failed} failed")
+    for number, rows, expected_rows in stats["mismatches"]:
+        print(f"    line {number}: state differs ({rows} rows replayed, {expected_rows} recorded)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", help="mutation log written with MUTATION_LOG_PATH set")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--database-url", default="sqlite://",
+                        help="empty database to replay into (default: in-memory SQLite)")
+    target.add_argument("--memory", action="store_true", help="replay into plain in-memory state")
+    args = parser.parse_args()
+
+    try:
+        state = MemoryState() if args.memory else DatabaseState(args.database_url)
+        try:
+            stats = replay(args.log, state)
+        finally:
+            state.close()
+    except ReplayError as e:
+        sys.exit(f"replay failed: {e}")
+    print(f"== {args.log} -> {'memory' if args.memory else args.database_url} ==")
+    print_report(stats)
+    if stats["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
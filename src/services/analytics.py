@@ -0,0 +1,301 @@
+import asyncio
+import json
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+from contextlib import suppress
+from datetime import timedelta
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from .. import config
+from ..database.database import SessionLocal, utcnow
+from ..database.models import AnalyticsRollup, Court, Player
+from .locks import try_runner_lock
+
+logger = logging.getLogger(__name__)
+
+# Every sketch uses the same accuracy, so any two of them can be merged
+SKETCH_ACCURACY = 0.02
+# Waits shorter than this (minutes) share one bucket
+SKETCH_MIN_VALUE = 0.01
+# Ranges up to this long are answered from minute buckets, longer ones
+# from hour buckets
+MINUTE_RANGE_LIMIT = timedelta(hours=6)
+
+
+class QuantileSketch:
+    """Log-bucketed histogram with bounded relative error (DDSketch style).
+
+    A value v lands in bucket ceil(log(v) / log(gamma)), so any quantile
+    read back is within SKETCH_ACCURACY of the true value. Merging is
+    adding bucket counts. Minute sketches therefore roll up into hours,
+    and any range of hours merges into one sketch for percentiles, with no
+    raw waits kept.
+    """
+
+    __slots__ = ("counts", "zeros", "count")
+
+    gamma = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+    log_gamma = math.log(gamma)
+
+    def __init__(self, counts=None, zeros: int = 0):
+        self.counts = Counter(counts or {})
+        self.zeros = zeros
+        self.count = zeros + sum(self.counts.values())
+
+    def add(self, value: float):
+        if value <= SKETCH_MIN_VALUE:
+            self.zeros += 1
+        else:
+            self.counts[math.ceil(math.log(value) / self.log_gamma)] += 1
+        self.count += 1
+
+    def merge(self, other: "QuantileSketch"):
+        self.counts.update(other.counts)
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def quantile(self, q: float):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.counts) / (self.gamma + 1)
+
+    def to_json(self) -> str:
+        return json.dumps({"z": self.zeros, "c": {str(i): n for i, n in self.counts.items()}},
+                          separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data: str):
+        raw = json.loads(data)
+        return cls({int(i): n for i, n in raw["c"].items()}, raw["z"])
+
+
+def _floor_minute(moment):
+    return moment.replace(second=0, microsecond=0)
+
+
+def _floor_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class AnalyticsRecorder:
+    """Maintains the analytics rollups incrementally.
+
+    Waits are collected in memory as players go on court (see
+    track_waits). Every interval, each worker adds its waits to the
+    current minute and hour buckets. The first worker in each minute also
+    samples court occupancy and queue lengths. Every write only adds to
+    buckets, so range queries never touch raw events. A per-venue runner
+    lock serializes the read-modify-write of bucket rows across workers.
+    """
+
+    def __init__(self, interval: float, minute_retention: timedelta, venue: str):
+        self.interval = interval
+        self.minute_retention = minute_retention
+        self.lock_key = f"analytics:{venue}"
+        self.stats = Counter()
+        self._waits = defaultdict(list)
+        self._lock = threading.Lock()
+        self._task = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+
+    def record_waits(self, waits):
+        """[(qualification, minutes waited)] for players who just went on court"""
+        with self._lock:
+            for qualification, minutes in waits:
+                self._waits[qualification].append(minutes)
+
+    def status(self):
+        with self._lock:
+            pending = sum(len(v) for v in self._waits.values())
+        return {"pending_waits": pending, **self.stats}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Analytics rollup failed: {e}")
+
+    def flush(self, now=None):
+        """Add pending waits (and a floor sample, once per minute) to the rollups"""
+        now = now or utcnow()
+        with self._lock:
+            waits, self._waits = self._waits, defaultdict(list)
+        db = SessionLocal()
+        try:
+            if not try_runner_lock(db, self.lock_key):
+                self.stats["skipped_locked"] += 1
+                self.record_waits((q, m) for q, values in waits.items() for m in values)
+                return False
+
+            minute = _floor_minute(now)
+            deltas = {}
+            if not self._sampled(db, minute):
+                self._sample(db, deltas)
+                self.stats["samples"] += 1
+            for qualification, values in waits.items():
+                sketch = QuantileSketch()
+                for minutes in values:
+                    sketch.add(minutes)
+                deltas[("wait_minutes", qualification)] = (sum(values), 0.0, len(values), sketch)
+
+            if deltas:
+                self._add(db, "minute", minute, deltas)
+                self._add(db, "hour", _floor_hour(now), deltas)
+            db.execute(delete(AnalyticsRollup).where(
+                AnalyticsRollup.resolution == "minute",
+                AnalyticsRollup.bucket_start < minute - self.minute_retention
+            ))
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            self.record_waits((q, m) for q, values in waits.items() for m in values)
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _sampled(db: Session, minute) -> bool:
+        return db.execute(
+            select(AnalyticsRollup.key).where(
+                AnalyticsRollup.resolution == "minute",
+                AnalyticsRollup.bucket_start == minute,
+                AnalyticsRollup.metric == "queue_length"
+            ).limit(1)
+        ).first() is not None
+
+    @staticmethod
+    def _sample(db: Session, deltas):
+        on_court = dict(db.execute(
+            select(Player.court_id, func.count())
+            .where(Player.is_active == True, Player.court_id.is_not(None))
+            .group_by(Player.court_id)
+        ).all())
+        for court_id, capacity in db.execute(select(Court.id, Court.capacity)):
+            deltas[("court_occupancy", str(court_id))] = (
+                float(on_court.get(court_id, 0)), float(capacity), 1, None)
+
+        queued = dict(db.execute(
+            select(Player.qualification, func.count())
+            .where(Player.is_active == True, Player.court_id.is_(None))
+            .group_by(Player.qualification)
+        ).all())
+        # Always write both queues: an existing queue_length row marks the minute sampled
+        for qualification in ("advanced", "intermediate", *queued):
+            deltas[("queue_length", qualification)] = (float(queued.get(qualification, 0)), 0.0, 1, None)
+
+    @staticmethod
+    def _add(db: Session, resolution: str, bucket, deltas):
+        rows = {
+            (row.metric, row.key): row
+            for row in db.query(AnalyticsRollup).filter(
+                AnalyticsRollup.resolution == resolution,
+                AnalyticsRollup.bucket_start == bucket,
+                AnalyticsRollup.metric.in_({metric for metric, _ in deltas})
+            )
+        }
+        for (metric, key), (total, capacity, samples, sketch) in deltas.items():
+            row = rows.get((metric, key))
+            if row is None:
+                row = AnalyticsRollup(resolution=resolution, bucket_start=bucket, metric=metric, key=key,
+                                      total=0.0, capacity=0.0, samples=0)
+                db.add(row)
+            row.total += total
+            row.capacity += capacity
+            row.samples += samples
+            if sketch is not None:
+                merged = QuantileSketch.from_json(row.sketch) if row.sketch else QuantileSketch()
+                row.sketch = merged.merge(sketch).to_json()
+
+
+def query_rollups(db: Session, metric: str, start, end):
+    """{key: (total, capacity, samples, merged sketch or None)} over [start, end).
+
+    Short recent ranges read minute buckets, anything longer reads hour
+    buckets (the hours at either end are counted whole).
+    """
+    minute_cutoff = utcnow() - timedelta(days=config.ANALYTICS_MINUTE_RETENTION_DAYS)
+    if end - start <= MINUTE_RANGE_LIMIT and start >= minute_cutoff:
+        resolution, start = "minute", _floor_minute(start)
+    else:
+        resolution, start = "hour", _floor_hour(start)
+    where = (
+        AnalyticsRollup.resolution == resolution,
+        AnalyticsRollup.metric == metric,
+        AnalyticsRollup.bucket_start >= start,
+        AnalyticsRollup.bucket_start < end
+    )
+    totals = {
+        key: (total, capacity, samples, None)
+        for key, total, capacity, samples in db.execute(
+            select(AnalyticsRollup.key, func.sum(AnalyticsRollup.total),
+                   func.sum(AnalyticsRollup.capacity), func.sum(AnalyticsRollup.samples))
+            .where(*where).group_by(AnalyticsRollup.key)
+        )
+    }
+    sketches = {}
+    for key, data in db.execute(
+        select(AnalyticsRollup.key, AnalyticsRollup.sketch).where(*where, AnalyticsRollup.sketch.is_not(None))
+    ):
+        sketches.setdefault(key, QuantileSketch()).merge(QuantileSketch.from_json(data))
+    return {key: (*values[:3], sketches.get(key)) for key, values in totals.items()}
+
+
+def track_waits(session_factory):
+    """Report each queue-to-court move's wait to the analytics recorder after commit"""
+
+    @event.listens_for(session_factory, "before_flush")
+    def _collect_waits(session, flush_context, instances):
+        now = utcnow()
+        for obj in session.dirty:
+            if not isinstance(obj, Player) or obj.court_id is None or obj.queued_at is None:
+                continue
+            court = inspect(obj).attrs.court_id.history
+            if court.added and court.deleted == [None]:
+                minutes = (now - obj.queued_at).total_seconds() / 60
+                session.info.setdefault("analytics_waits", []).append((obj.qualification, max(minutes, 0.0)))
+
+    @event.listens_for(session_factory, "after_commit")
+    def _report_waits(session):
+        waits = session.info.pop("analytics_waits", None)
+        if waits:
+            analytics_recorder.record_waits(waits)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _discard_waits(session):
+        session.info.pop("analytics_waits", None)
+
+
+analytics_recorder = AnalyticsRecorder(
+    interval=config.ANALYTICS_SAMPLE_SECONDS,
+    minute_retention=timedelta(days=config.ANALYTICS_MINUTE_RETENTION_DAYS),
+    venue=config.VENUE_ID
+)
+
+if config.ANALYTICS_ENABLED:
+    track_waits(SessionLocal)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from collections import Counter
+from contextlib import suppress
+
+from sqlalchemy.orm.exc import StaleDataError
+
+from .. import config
+from ..database.database import SessionLocal
+from .locks import try_runner_lock
+
+logger = logging.getLogger(__name__)
+
+
+class AutoFillScheduler:
+    """Runs the court fill engine in the background after relevant state changes.
+
+    Mutation endpoints call notify() once their change is committed (player
+    released from a court, player activated, court type changed). Bursts of
+    notifications are debounced into a single fill pass, so polling reads
+    never write and a busy desk does not trigger one pass per click. A
+    per-venue runner lock keeps passes from different workers from racing.
+    """
+
+    def __init__(self, debounce: float, max_delay: float, venue: str):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.lock_key = f"autofill:{venue}"
+        self.pending = False
+        self.running = False
+        self.pass_id = 0
+        self.last_assignments = []
+        self.stats = Counter()
+        self._loop = None
+        self._wake = None
+        self._task = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if self.pending:
+            self._wake.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._loop = self._wake = self._task = None
+
+    def notify(self, reason: str):
+        """Record a state change; safe to call from the event loop or a worker thread"""
+        self.stats[f"event:{reason}"] += 1
+        self.pending = True
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake.set()
+        else:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def status(self):
+        return {
+            "pending": self.pending,
+            "running": self.running,
+            "last_pass_id": self.pass_id
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wake.wait()
+
+            # Debounce: wait for a quiet period, but never longer than max_delay
+            deadline = loop.time() + self.max_delay
+            while True:
+                self._wake.clear()
+                timeout = min(self.debounce, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            self.pending = False
+            self.running = True
+            try:
+                assignments = await asyncio.to_thread(self._fill_pass)
+            except StaleDataError:
+                # A player or court changed under the pass; rerun on fresh state
+                self.stats["version_conflicts"] += 1
+                assignments = None
+            except Exception as e:
+                logger.error(f"Auto-fill pass failed: {e}")
+                assignments = []
+            finally:
+                self.running = False
+
+            if assignments is None:
+                # Another worker holds the venue lock, or a player or court
+                # changed under the pass; retry on fresh state
+                self.pending = True
+                self._wake.set()
+                continue
+
+            self.stats["passes"] += 1
+            if assignments:
+                self.pass_id += 1
+                self.last_assignments = assignments
+                logger.info(f"Auto-fill pass {self.pass_id} made {len(assignments)} assignments")
+
+    def _fill_pass(self):
+        # Imported here: the queue router imports this module for notify()
+        from ..api.queue import auto_fill_courts_internal
+
+        db = SessionLocal(info={"source": "autofill"})
+        try:
+            if not try_runner_lock(db, self.lock_key):
+                self.stats["skipped_locked"] += 1
+                return None
+            assignments = auto_fill_courts_internal(db)
+            db.commit()
+            return assignments
+        finally:
+            db.close()
+
+
+autofill_scheduler = AutoFillScheduler(
+    debounce=config.AUTOFILL_DEBOUNCE_SECONDS,
+    max_delay=config.AUTOFILL_MAX_DELAY_SECONDS,
+    venue=config.VENUE_ID
+)
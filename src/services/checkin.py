@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import threading
+from collections import Counter, OrderedDict
+from contextlib import suppress
+
+from sqlalchemy.orm.exc import StaleDataError
+
+from .. import config
+from ..database.database import SessionLocal, utcnow
+from ..database.models import Player
+from .autofill import autofill_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class CheckInBuffer:
+    """Batches player activations from logins.
+
+    At the start of a session most of the club logs in within a few
+    minutes. Instead of each login updating its player row and committing,
+    check_in() records the arrival in memory and returns; a flusher task
+    activates everyone who arrived in the last interval in one transaction,
+    stamping queued_at with each player's arrival time so the queue keeps
+    arrival order, and then notifies the auto-fill scheduler once.
+
+    A failed flush puts its batch back in front of newer arrivals. Before
+    start() (no event loop yet) and on stop() check-ins are flushed inline,
+    so none are lost.
+    """
+
+    def __init__(self, flush_interval: float, max_batch: int):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.stats = Counter()
+        self._pending = OrderedDict()  # player id -> arrival time, in arrival order
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wake = None
+        self._task = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if self._pending:
+            self._wake.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._loop = self._wake = self._task = None
+        while self._pending:
+            if await asyncio.to_thread(self._flush) is None:
+                break
+
+    def check_in(self, player_id: int):
+        """Queue a player's activation; safe to call from the event loop or a worker thread"""
+        with self._lock:
+            # A repeat login keeps the player's original place in line
+            self._pending.setdefault(player_id, utcnow())
+        self.stats["checked_in"] += 1
+        loop = self._loop
+        if loop is None:
+            self._flush()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake.set()
+        else:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def cancel(self, player_id: int):
+        """Drop a check-in that has not been flushed yet (the player logged out)"""
+        with self._lock:
+            self._pending.pop(player_id, None)
+
+    def status(self):
+        return {"pending": len(self._pending), **self.stats}
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            # Let the burst accumulate for one interval
+            await asyncio.sleep(self.flush_interval)
+            self._wake.clear()
+            while self._pending:
+                if await asyncio.to_thread(self._flush) is None:
+                    # Back off for an interval before retrying the batch
+                    self._wake.set()
+                    break
+
+    def _flush(self):
+        """Activate one batch of check-ins; returns the number activated, None on failure"""
+        with self._lock:
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                batch.append(self._pending.popitem(last=False))
+        if not batch:
+            return 0
+
+        arrivals = dict(batch)
+        activated = 0
+        db = SessionLocal(info={"source": "checkin"})
+        try:
+            for player in db.query(Player).filter(Player.id.in_(arrivals)).all():
+                if not player.is_active:
+                    player.is_active = True
+                    player.queued_at = arrivals[player.id]
+                    activated += 1
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            if isinstance(e, StaleDataError):
+                self.stats["version_conflicts"] += 1
+            else:
+                logger.error(f"Check-in flush of {len(batch)} players failed: {e}")
+            with self._lock:
+                for player_id, arrived_at in reversed(batch):
+                    self._pending[player_id] = arrived_at
+                    self._pending.move_to_end(player_id, last=False)
+            return None
+        finally:
+            db.close()
+
+        self.stats["flushes"] += 1
+        self.stats["activated"] += activated
+        if activated:
+            autofill_scheduler.notify("player_activated")
+        return activated
+
+
+checkin_buffer = CheckInBuffer(
+    flush_interval=config.CHECKIN_FLUSH_SECONDS,
+    max_batch=config.CHECKIN_MAX_BATCH
+)
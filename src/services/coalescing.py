@@ -0,0 +1,71 @@
+import asyncio
+import json
+from collections import Counter
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+
+from ..database.database import SessionLocal
+
+
+class SingleFlight:
+    """Coalesces concurrent identical reads into one computation.
+
+    The first request for a key starts `build(db)` in a worker thread with
+    its own session from `session_factory`; requests for the same key
+    arriving while it runs wait on the same task instead of querying
+    again. The result is serialized
+    to JSON once and every waiter gets the same bytes. Nothing is kept once
+    the computation finishes, so a later request always sees fresh state.
+
+    Flights are also keyed by a commit generation, bumped whenever a
+    session in this process commits: a read arriving after its own write
+    starts a new computation rather than joining one that began before the
+    write and would return the old state.
+    """
+
+    def __init__(self):
+        self.stats = Counter()
+        self.generation = 0
+        self._in_flight = {}
+
+    def committed(self):
+        """A local commit happened; later reads must not join older flights"""
+        self.generation += 1
+
+    async def run(self, key: str, build, session_factory=SessionLocal) -> bytes:
+        # Primary and replica reads are never shared with each other
+        flight = (key, session_factory, self.generation)
+        task = self._in_flight.get(flight)
+        if task is None:
+            self.stats[f"computed:{key}"] += 1
+            task = asyncio.ensure_future(asyncio.to_thread(self._compute, build, session_factory))
+            self._in_flight[flight] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(flight, None))
+        else:
+            self.stats[f"coalesced:{key}"] += 1
+        # Shielded: one waiter disconnecting must not cancel it for the rest
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _compute(build, session_factory) -> bytes:
+        with session_factory() as db:
+            result = build(db)
+        return json.dumps(
+            jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    def status(self):
+        return {"in_flight": len(self._in_flight), **self.stats}
+
+
+def track_commits(session_factory, coalescer: SingleFlight):
+    """Bump the coalescer's generation on every commit made by the factory's sessions"""
+    @event.listens_for(session_factory, "after_commit")
+    def _bump_generation(session):
+        coalescer.committed()
+
+
+read_coalescer = SingleFlight()
+
+track_commits(SessionLocal, read_coalescer)
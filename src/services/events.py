@@ -0,0 +1,249 @@
+import asyncio
+import json
+import logging
+import re
+import select
+import threading
+import uuid
+from collections import Counter
+
+from sqlalchemy import event, text
+
+from .. import config
+from ..database.database import SessionLocal, engine
+from ..database.models import Court, Player
+
+logger = logging.getLogger(__name__)
+
+# Identifies this worker process so handlers can tell their own events apart
+WORKER_ID = uuid.uuid4().hex[:12]
+
+# NOTIFY payloads are capped at 8000 bytes; past this many ids an event just
+# says "everything changed"
+MAX_IDS_PER_EVENT = 500
+
+
+class EventBus:
+    """Fans state-change events out to every worker.
+
+    Events are small JSON dicts, usually published as part of the commit
+    they describe. With PostgreSQL they travel over LISTEN/NOTIFY: a
+    listener thread per worker holds one dedicated connection and hands
+    each notification to the subscribed handlers. On other backends
+    (SQLite, tests) there is a single process, so events are delivered
+    directly once their commit is done.
+
+    Handlers run on the delivering thread (the listener thread, or the
+    publisher's thread in-process) and must be thread-safe. Browser streams
+    get their own bounded asyncio queue fed from the event loop.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.stats = Counter()
+        self._handlers = []
+        self._streams = set()
+        self._loop = None
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def uses_postgres(self):
+        return engine.dialect.name == "postgresql"
+
+    def subscribe(self, handler):
+        self._handlers.append(handler)
+        return handler
+
+    def publish(self, kind: str, session=None, **data):
+        """Send an event to every worker.
+
+        With `session` (call before it commits) the event belongs to that
+        transaction: delivered when it commits, dropped if it rolls back.
+        On PostgreSQL that is a NOTIFY on the session's own connection,
+        which the server holds until COMMIT. Without a session it is sent
+        straight away on a pooled connection.
+        """
+        payload = {"kind": kind, "origin": WORKER_ID, **data}
+        self.stats[f"published:{kind}"] += 1
+        if not self.uses_postgres:
+            if session is None:
+                self._deliver(payload)
+            else:
+                session.info.setdefault("pending_events", []).append(payload)
+            return
+        if session is not None:
+            self._notify(session.connection(), payload)
+            return
+        try:
+            with engine.begin() as connection:
+                self._notify(connection, payload)
+        except Exception as e:
+            # Other workers catch up on their periodic resyncs
+            self.stats["publish_errors"] += 1
+            logger.warning(f"Failed to publish {kind} event: {e}")
+
+    def _notify(self, connection, payload):
+        connection.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": self.channel, "payload": json.dumps(payload, default=str)}
+        )
+
+    def _deliver(self, payload):
+        self.stats[f"received:{payload.get('kind')}"] += 1
+        for handler in self._handlers:
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.error(f"Event handler {handler.__name__} failed: {e}")
+        loop = self._loop
+        if loop is not None and self._streams:
+            loop.call_soon_threadsafe(self._feed_streams, payload)
+
+    def _feed_streams(self, payload):
+        for queue in self._streams:
+            if queue.full():
+                # Slow client: it refreshes the whole board anyway
+                self.stats["stream_dropped"] += 1
+            else:
+                queue.put_nowait(payload)
+
+    async def stream(self, heartbeat: float = 15.0):
+        """Server-sent event lines for one browser connection"""
+        queue = asyncio.Queue(maxsize=100)
+        self._streams.add(queue)
+        try:
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {payload['kind']}\ndata: {json.dumps(payload, default=str)}\n\n"
+        finally:
+            self._streams.discard(queue)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        if self.uses_postgres:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._listen, name="event-bus", daemon=True)
+            self._thread.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 5)
+        self._thread = None
+        self._loop = None
+
+    def _listen(self):
+        """Listener thread: one dedicated connection, reconnecting with backoff"""
+        delay = 1.0
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                connection.detach()  # never return a LISTENing connection to the pool
+                driver = connection.driver_connection
+                driver.autocommit = True
+                with driver.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                logger.info(f"Listening for events on {self.channel}")
+                delay = 1.0
+                while not self._stopping.is_set():
+                    for payload in self._wait_for_notifies(driver, timeout=1.0):
+                        self._deliver(json.loads(payload))
+            except Exception as e:
+                self.stats["listen_errors"] += 1
+                logger.warning(f"Event listener disconnected: {e}; reconnecting in {delay:.0f}s")
+                self._stopping.wait(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    @staticmethod
+    def _wait_for_notifies(driver, timeout: float):
+        if hasattr(driver, "poll"):
+            # psycopg2
+            if select.select([driver], [], [], timeout) == ([], [], []):
+                return []
+            driver.poll()
+            payloads = [n.payload for n in driver.notifies]
+            driver.notifies.clear()
+            return payloads
+        # psycopg 3
+        return [n.payload for n in driver.notifies(timeout=timeout)]
+
+    def status(self):
+        return {
+            "backend": "postgres" if self.uses_postgres else "in_process",
+            "worker": WORKER_ID,
+            "streams": len(self._streams),
+            **self.stats
+        }
+
+
+def _id_list(ids):
+    ids = sorted(i for i in ids if i is not None)
+    return ids if len(ids) <= MAX_IDS_PER_EVENT else None
+
+
+def mark_changed(session, players=(), courts=()):
+    """Add changes the ORM hooks cannot see (Core statements); they are
+    published with the rest of the session's transaction"""
+    session.info.setdefault("changed_players", set()).update(players)
+    session.info.setdefault("changed_courts", set()).update(courts)
+
+
+def track_state_changes(session_factory):
+    """Publish a state_changed event with every commit that touched players or courts.
+
+    Hooked on the session rather than individual routes so every mutation
+    path (queue moves, court and player edits, login activation, fill
+    passes, game rotation) is covered. `players` / `courts` list the ids
+    changed, or are null when too many changed to list.
+    """
+
+    @event.listens_for(session_factory, "after_flush")
+    def _collect_changed(session, flush_context):
+        players = session.info.setdefault("changed_players", set())
+        courts = session.info.setdefault("changed_courts", set())
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, Player):
+                players.add(obj.id)
+            elif isinstance(obj, Court):
+                courts.add(obj.id)
+
+    @event.listens_for(session_factory, "before_commit")
+    def _publish_changed(session):
+        if session.in_nested_transaction():
+            return
+        # Commit flushes after this hook; flush now so the last changes
+        # are in the event, which then commits with them
+        for _ in range(100):
+            if not (session.new or session.dirty or session.deleted):
+                break
+            session.flush()
+        players = session.info.pop("changed_players", None) or set()
+        courts = session.info.pop("changed_courts", None) or set()
+        if players or courts:
+            event_bus.publish("state_changed", session=session,
+                              players=_id_list(players), courts=_id_list(courts))
+
+    @event.listens_for(session_factory, "after_commit")
+    def _deliver_pending(session):
+        for payload in session.info.pop("pending_events", None) or ():
+            event_bus._deliver(payload)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _discard_changed(session):
+        session.info.pop("changed_players", None)
+        session.info.pop("changed_courts", None)
+        session.info.pop("pending_events", None)
+
+
+event_bus = EventBus(channel=f"badminton_events_{re.sub(r'[^A-Za-z0-9_]', '_', config.VENUE_ID)}")
+
+track_state_changes(SessionLocal)
@@ -0,0 +1,456 @@
+import heapq
+from bisect import bisect_left, insort
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timezone
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from .. import config
+from ..database.database import SessionLocal, utcnow
+from ..database.models import Player
+from .events import WORKER_ID, event_bus
+
+
+class IndexedHeap:
+    """Binary min-heap with an index from key to its live entry.
+
+    push() also serves as update (the old entry is invalidated in place) and
+    remove() is O(1); stale entries are skipped on read and compacted away
+    once they outnumber live ones. peek() walks the heap as a tree, so the
+    k smallest keys cost O(k log k) instead of a full sort.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def push(self, key, priority):
+        self.remove(key)
+        entry = [priority, key, True]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = [e for e in self._heap if e[2]]
+            heapq.heapify(self._heap)
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[2] = False
+
+    def priority_of(self, key):
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def peek(self, count: int, exclude=()):
+        """Keys of the `count` smallest live entries, skipping `exclude`"""
+        heap = self._heap
+        result = []
+        if not heap or count <= 0:
+            return result
+        frontier = [(heap[0][0], 0)]
+        while frontier and len(result) < count:
+            _, index = heapq.heappop(frontier)
+            _, key, live = heap[index]
+            if live and key not in exclude:
+                result.append(key)
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child][0], child))
+        return result
+
+    def ordered(self):
+        return [key for _, key, _ in sorted(e for e in self._heap if e[2])]
+
+
+class RankIndex:
+    """Sorted set of keys that answers "how many keys are smaller" in O(log n).
+
+    Keys are kept in sorted blocks of at most 2 * BLOCK keys with a Fenwick
+    tree over the block sizes: rank() bisects the block maxima, bisects
+    inside one block and adds up the sizes of the blocks before it. add()
+    and remove() shift one block (a C-level list move) and update the
+    tree, which is only rebuilt when a block splits or empties.
+    """
+
+    BLOCK = 256
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self._blocks = [keys[i:i + self.BLOCK] for i in range(0, len(keys), self.BLOCK)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(keys)
+        self._rebuild()
+
+    def __len__(self):
+        return self._len
+
+    def add(self, key):
+        if not self._blocks:
+            self._blocks, self._maxes, self._len = [[key]], [key], 1
+            self._rebuild()
+            return
+        i = min(bisect_left(self._maxes, key), len(self._blocks) - 1)
+        block = self._blocks[i]
+        insort(block, key)
+        self._maxes[i] = block[-1]
+        self._len += 1
+        if len(block) > 2 * self.BLOCK:
+            self._blocks[i:i + 1] = [block[:self.BLOCK], block[self.BLOCK:]]
+            self._maxes[i:i + 1] = [block[self.BLOCK - 1], block[-1]]
+            self._rebuild()
+        else:
+            self._tree_add(i, 1)
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._blocks):
+            return
+        block = self._blocks[i]
+        j = bisect_left(block, key)
+        if j == len(block) or block[j] != key:
+            return
+        del block[j]
+        self._len -= 1
+        if block:
+            self._maxes[i] = block[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._blocks[i], self._maxes[i]
+            self._rebuild()
+
+    def rank(self, key) -> int:
+        """Number of keys smaller than `key`"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._blocks):
+            return self._len
+        count = bisect_left(self._blocks[i], key)
+        while i > 0:
+            count += self._tree[i]
+            i &= i - 1
+        return count
+
+    def _tree_add(self, i, delta):
+        i += 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _rebuild(self):
+        tree = [0] + [len(block) for block in self._blocks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+
+class FairQueue:
+    """Fairness-ordered view of the queue, one indexed heap per qualification.
+
+    A queued player's score is
+
+        wait_weight * minutes waited
+        - games_weight * games played this session
+        + sit_out_weight * fill passes sat out since joining the queue
+
+    Both time waited and sit-outs grow at the same rate for everyone in a
+    queue, so ordering only depends on when a player joined (queued_at and
+    the pass counter at that moment, queued_pass) and games_played. That
+    makes the heap key static per player: it only changes when the player
+    moves, and each move is a single O(log n) heap update. A RankIndex per
+    qualification holds the same keys so a player's queue position is an
+    O(log n) lookup rather than a sort of the queue.
+    """
+
+    def __init__(self, wait_weight: float, games_weight: float, sit_out_weight: float,
+                 resync_interval: float):
+        self.wait_weight = wait_weight
+        self.games_weight = games_weight
+        self.sit_out_weight = sit_out_weight
+        self.resync_interval = resync_interval
+        self.passes = Counter()
+        self._heaps = defaultdict(IndexedHeap)
+        self._ranks = defaultdict(RankIndex)
+        self._qualification = {}
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    def priority(self, player_id: int, queued_at, games_played, queued_pass):
+        """Heap key: smaller is served first"""
+        queued_ts = (queued_at or utcnow()).replace(tzinfo=timezone.utc).timestamp()
+        return (
+            self.wait_weight * queued_ts / 60
+            + self.games_weight * (games_played or 0)
+            + self.sit_out_weight * (queued_pass or 0),
+            queued_ts,
+            player_id
+        )
+
+    def sort_key(self, player: Player):
+        return self.priority(player.id, player.queued_at, player.games_played, player.queued_pass)
+
+    def update(self, player_id: int, qualification: str, is_active: bool, court_id,
+               queued_at, games_played, queued_pass):
+        """Apply a player's committed state"""
+        with self._lock:
+            self.discard(player_id)
+            if is_active and court_id is None:
+                priority = self.priority(player_id, queued_at, games_played, queued_pass)
+                self._heaps[qualification].push(player_id, priority)
+                self._ranks[qualification].add(priority)
+                self._qualification[player_id] = qualification
+
+    def discard(self, player_id: int):
+        with self._lock:
+            qualification = self._qualification.pop(player_id, None)
+            if qualification is not None:
+                heap = self._heaps[qualification]
+                self._ranks[qualification].remove(heap.priority_of(player_id))
+                heap.remove(player_id)
+
+    def position(self, player_id: int):
+        """(qualification, players ahead, queue length) for a queued player, else None"""
+        with self._lock:
+            qualification = self._qualification.get(player_id)
+            if qualification is None:
+                return None
+            ranks = self._ranks[qualification]
+            return qualification, ranks.rank(self._heaps[qualification].priority_of(player_id)), len(ranks)
+
+    def candidates(self, qualification: str, count: int, exclude=()):
+        """Ids of the next `count` queued players of a qualification, in fairness order"""
+        with self._lock:
+            return self._heaps[qualification].peek(count, exclude)
+
+    def ordered(self, qualification: str):
+        with self._lock:
+            return self._heaps[qualification].ordered()
+
+    def record_pass(self, qualification: str):
+        """A fill pass took players from this queue: everyone left behind sat out once"""
+        with self._lock:
+            self.passes[qualification] += 1
+
+    def load(self, db: Session):
+        """Rebuild from the database (startup, and periodically for other workers' moves)"""
+        rows = db.execute(
+            select(Player.id, Player.qualification, Player.queued_at,
+                   Player.games_played, Player.queued_pass)
+            .where(Player.court_id.is_(None), Player.is_active == True)
+        ).all()
+        with self._lock:
+            self._heaps = defaultdict(IndexedHeap)
+            self._qualification = {}
+            keys = defaultdict(list)
+            for player_id, qualification, queued_at, games_played, queued_pass in rows:
+                priority = self.priority(player_id, queued_at, games_played, queued_pass)
+                self._heaps[qualification].push(player_id, priority)
+                keys[qualification].append(priority)
+                self._qualification[player_id] = qualification
+                # The pass counter lives in memory; never fall behind persisted marks
+                self.passes[qualification] = max(self.passes[qualification], queued_pass or 0)
+            self._ranks = defaultdict(RankIndex, {q: RankIndex(k) for q, k in keys.items()})
+            self._loaded_at = time.monotonic()
+
+    def reload_players(self, db: Session, player_ids):
+        """Re-read a few players' committed state (changed by another worker)"""
+        rows = db.execute(
+            select(Player.id, Player.qualification, Player.is_active, Player.court_id,
+                   Player.queued_at, Player.games_played, Player.queued_pass)
+            .where(Player.id.in_(player_ids))
+        ).all()
+        for player_id, *state in rows:
+            self.update(player_id, *state)
+        for player_id in set(player_ids) - {row[0] for row in rows}:
+            self.discard(player_id)
+
+    def invalidate(self):
+        """Force a full reload on the next ensure_fresh()"""
+        self._loaded_at = None
+
+    def ensure_fresh(self, db: Session):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.resync_interval:
+            self.load(db)
+
+
+def pick_keeping_pairs(candidates, spots: int, partner_of):
+    """Up to `spots` players from `candidates` (in priority order), never splitting a pair.
+
+    partner_of(player) returns the partner who must come along, or None for
+    a single. A pair is placed when its second member comes up, so it is
+    served by its less-waited member and does not jump ahead of singles; a
+    pair that no longer fits is skipped and keeps its place, which gives
+    two pairs, or a pair plus two singles, on a four-player court.
+    """
+    chosen = []
+    waiting = {}
+    for player in candidates:
+        partner = partner_of(player)
+        if partner is None:
+            unit = (player,)
+        elif partner.id in waiting:
+            unit = (waiting.pop(partner.id), player)
+        else:
+            waiting[player.id] = player
+            continue
+        if len(chosen) + len(unit) <= spots:
+            chosen.extend(unit)
+            if len(chosen) == spots:
+                break
+    return chosen
+
+
+def take_queued_players(floor, qualification: str, count: int, taken: set):
+    """Next `count` queued players of a qualification in fairness order.
+
+    Candidates are checked against the freshly loaded FloorState. `taken`
+    collects ids already picked in this fill pass so later courts in the
+    same pass never pick them again. Heap entries that turn out stale
+    (moved by another worker since the last resync) are dropped.
+
+    With PAIR_FILL_ENABLED, doubles pairs (see src/api/teams.py) only go on
+    court together: the heap is read in growing windows, so the search stops
+    as soon as the court is full instead of scanning the whole queue, and a
+    player whose partner is still on a court waits for them.
+    """
+
+    def partner_of(player):
+        partner = floor.partner(player)
+        if partner is not None and floor.is_queued(partner.id, qualification):
+            return partner
+        return None
+
+    def candidates():
+        seen = set()
+        window = 2 * count
+        while True:
+            ids = fair_queue.candidates(qualification, window, exclude=taken | seen)
+            for player_id in ids:
+                seen.add(player_id)
+                if not floor.is_queued(player_id, qualification):
+                    taken.add(player_id)
+                    fair_queue.discard(player_id)
+                    continue
+                player = floor.players[player_id]
+                partner = floor.partner(player)
+                if partner is not None and partner.is_active and partner.court_id is not None:
+                    continue
+                yield player
+            if len(ids) < window:
+                return
+            window *= 2
+
+    if config.PAIR_FILL_ENABLED:
+        players = pick_keeping_pairs(candidates(), count, partner_of)
+        taken.update(p.id for p in players)
+        return players
+
+    players = []
+    while len(players) < count:
+        ids = fair_queue.candidates(qualification, count - len(players), exclude=taken)
+        if not ids:
+            break
+        for player_id in ids:
+            taken.add(player_id)
+            if floor.is_queued(player_id, qualification):
+                players.append(floor.players[player_id])
+            else:
+                fair_queue.discard(player_id)
+    return players
+
+
+def track_queue_entries(session_factory):
+    """Keep queue bookkeeping columns and the in-memory FairQueue in step with moves.
+
+    Joining the queue (activated, released from a court, registered) stamps
+    queued_at and queued_pass; going onto a court from the queue counts a
+    game played. Committed player state is then applied to the heaps.
+    """
+
+    @event.listens_for(session_factory, "before_flush")
+    def _stamp_queue_entries(session, flush_context, instances):
+        touched = session.info.setdefault("touched_players", set())
+        deleted = session.info.setdefault("deleted_players", set())
+        for obj in session.deleted:
+            if isinstance(obj, Player):
+                deleted.add(obj.id)
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, Player):
+                continue
+            touched.add(obj)
+            state = inspect(obj)
+            court = state.attrs.court_id.history
+            active = state.attrs.is_active.history
+            qualification = state.attrs.qualification.history
+
+            if obj.court_id is not None and court.added and court.deleted == [None]:
+                obj.games_played = (obj.games_played or 0) + 1
+            elif obj.is_active and obj.court_id is None:
+                joined = (obj in session.new
+                          or any(c is not None for c in court.deleted)
+                          or False in active.deleted)
+                if joined:
+                    # Keep an arrival time set by the caller (batched check-ins)
+                    if not state.attrs.queued_at.history.added:
+                        obj.queued_at = utcnow()
+                    obj.queued_pass = fair_queue.passes[obj.qualification]
+                elif qualification.added:
+                    obj.queued_pass = fair_queue.passes[obj.qualification]
+
+    @event.listens_for(session_factory, "after_flush_postexec")
+    def _snapshot_players(session, flush_context):
+        touched = session.info.pop("touched_players", None)
+        if not touched:
+            return
+        snapshot = session.info.setdefault("player_snapshot", {})
+        for obj in touched:
+            if obj.id is not None and obj not in session.deleted:
+                snapshot[obj.id] = (obj.qualification, obj.is_active, obj.court_id,
+                                    obj.queued_at, obj.games_played, obj.queued_pass)
+
+    @event.listens_for(session_factory, "after_commit")
+    def _apply_to_fair_queue(session):
+        snapshot = session.info.pop("player_snapshot", None) or {}
+        deleted = session.info.pop("deleted_players", None) or set()
+        for player_id, state in snapshot.items():
+            fair_queue.update(player_id, *state)
+        for player_id in deleted:
+            fair_queue.discard(player_id)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _discard_snapshot(session):
+        for key in ("touched_players", "deleted_players", "player_snapshot"):
+            session.info.pop(key, None)
+
+
+fair_queue = FairQueue(
+    wait_weight=config.FAIRNESS_WAIT_WEIGHT,
+    games_weight=config.FAIRNESS_GAMES_WEIGHT,
+    sit_out_weight=config.FAIRNESS_SIT_OUT_WEIGHT,
+    resync_interval=config.FAIRNESS_RESYNC_SECONDS
+)
+
+track_queue_entries(SessionLocal)
+
+
+@event_bus.subscribe
+def _apply_remote_player_changes(payload):
+    """Keep this worker's heaps current with moves made by other workers"""
+    if payload["kind"] != "state_changed" or payload["origin"] == WORKER_ID:
+        return
+    player_ids = payload.get("players", [])
+    if player_ids is None:
+        fair_queue.invalidate()
+    elif player_ids:
+        with SessionLocal() as db:
+            fair_queue.reload_players(db, player_ids)
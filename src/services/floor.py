@@ -0,0 +1,142 @@
+from collections import defaultdict
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from ..database.models import Court, Player
+
+
+class PlayerState:
+    """One player on the floor: just the fields fill and status decisions use"""
+
+    __slots__ = ("id", "name", "qualification", "is_active", "court_id",
+                 "queued_at", "games_played", "queued_pass", "version", "team_id", "rating",
+                 "loaded_court_id")
+
+    def __init__(self, id, name, qualification, is_active, court_id,
+                 queued_at, games_played, queued_pass, version, team_id, rating):
+        self.id = id
+        self.name = name
+        self.qualification = qualification
+        self.is_active = is_active
+        self.court_id = court_id
+        self.queued_at = queued_at
+        self.games_played = games_played
+        self.queued_pass = queued_pass
+        self.version = version
+        self.team_id = team_id
+        self.rating = rating
+        self.loaded_court_id = court_id
+
+
+class CourtState:
+    __slots__ = ("id", "name", "court_type", "feeds_court_id", "fill_priority", "game_started_at",
+                 "capacity")
+
+    def __init__(self, id, name, court_type, feeds_court_id, fill_priority, game_started_at, capacity):
+        self.id = id
+        self.name = name
+        self.court_type = court_type
+        self.feeds_court_id = feeds_court_id
+        self.fill_priority = fill_priority
+        self.game_started_at = game_started_at
+        self.capacity = capacity
+
+
+# Column order matches the constructors above
+PLAYER_COLUMNS = (Player.id, Player.name, Player.qualification, Player.is_active, Player.court_id,
+                  Player.queued_at, Player.games_played, Player.queued_pass, Player.version,
+                  Player.team_id, Player.rating)
+COURT_COLUMNS = (Court.id, Court.name, Court.court_type, Court.feeds_court_id,
+                 Court.fill_priority, Court.game_started_at, Court.capacity)
+
+
+class FloorState:
+    """Compact in-memory view of the floor: courts, and every player who is
+    active or on a court.
+
+    Built from plain row tuples (no ORM identity map or change tracking),
+    so fill passes, snapshots and status endpoints can load the whole floor
+    in one query per table. Fill decisions move players with move(); apply()
+    then writes only the players whose court changed, through the ORM so
+    the session hooks (fairness bookkeeping, game clocks, events) still run,
+    and refuses to write over a player someone else changed meanwhile.
+    """
+
+    __slots__ = ("players", "courts", "on_court", "teams")
+
+    def __init__(self, player_rows, court_rows):
+        self.courts = {}
+        for row in court_rows:
+            court = CourtState(*row)
+            self.courts[court.id] = court
+        self.players = {}
+        self.on_court = defaultdict(list)
+        self.teams = defaultdict(list)
+        for row in player_rows:
+            player = PlayerState(*row)
+            self.players[player.id] = player
+            if player.court_id is not None:
+                self.on_court[player.court_id].append(player)
+            if player.team_id is not None:
+                self.teams[player.team_id].append(player)
+
+    @classmethod
+    def load(cls, db: Session):
+        courts = db.execute(select(*COURT_COLUMNS).order_by(Court.id)).all()
+        players = db.execute(
+            select(*PLAYER_COLUMNS)
+            .where(or_(Player.is_active == True, Player.court_id.is_not(None)))
+            .order_by(Player.id)
+        ).all()
+        return cls(players, courts)
+
+    def queued(self, qualification: str = None):
+        """Active players not on a court, optionally of one qualification"""
+        return [
+            p for p in self.players.values()
+            if p.is_active and p.court_id is None
+            and (qualification is None or p.qualification == qualification)
+        ]
+
+    def is_queued(self, player_id: int, qualification: str) -> bool:
+        player = self.players.get(player_id)
+        return (player is not None and player.is_active and player.court_id is None
+                and player.qualification == qualification)
+
+    def partner(self, player: PlayerState):
+        """The other half of the player's doubles pair, if both are on the floor"""
+        if player.team_id is None:
+            return None
+        members = self.teams.get(player.team_id, ())
+        if len(members) != 2:
+            return None
+        return members[1] if members[0] is player else members[0]
+
+    def move(self, player: PlayerState, court_id):
+        if player.court_id is not None:
+            self.on_court[player.court_id].remove(player)
+        player.court_id = court_id
+        if court_id is not None:
+            self.on_court[court_id].append(player)
+
+    def diff(self):
+        """{player_id: new court_id} for every player moved since loading"""
+        return {p.id: p.court_id for p in self.players.values() if p.court_id != p.loaded_court_id}
+
+    def apply(self, db: Session):
+        """Write the diff to the session (caller commits); returns players written"""
+        changes = self.diff()
+        if not changes:
+            return []
+        rows = db.query(Player).filter(Player.id.in_(changes)).all()
+        if len(rows) != len(changes):
+            raise StaleDataError("Players were deleted while the floor was being planned")
+        for row in rows:
+            state = self.players[row.id]
+            if row.version != state.version:
+                raise StaleDataError(f"Player {row.id} changed while the floor was being planned")
+            row.court_id = changes[row.id]
+            state.loaded_court_id = row.court_id
+        return rows
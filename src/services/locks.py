@@ -0,0 +1,40 @@
+import zlib
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from ..database.write_queue import WriteQueueTimeout
+
+
+def try_runner_lock(db: Session, key: str) -> bool:
+    """Take a transaction-scoped lock so only one worker runs `key` at a time.
+
+    PostgreSQL uses an advisory transaction lock; SQLite takes the database
+    write lock up front with BEGIN IMMEDIATE, which also makes the read-then-
+    write pass atomic against other workers. Either way the lock is released
+    when the session commits or rolls back.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return bool(db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"),
+            {"key": zlib.crc32(key.encode())}
+        ).scalar())
+    if dialect == "sqlite":
+        write_queue = db.info.get("write_queue")
+        if write_queue is not None:
+            # Take the write turn before SQLite's write lock: a session that
+            # holds the turn would otherwise wait out the busy timeout on
+            # our lock while we wait for the turn at our first flush
+            try:
+                write_queue.acquire(db)
+            except WriteQueueTimeout:
+                return False
+        try:
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        except OperationalError:
+            db.rollback()
+            return False
+        return True
+    return True
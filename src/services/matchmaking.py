@@ -0,0 +1,93 @@
+from functools import lru_cache
+from itertools import combinations
+
+from .. import config
+from .fairness import take_queued_players
+
+# Court capacities that are played as two even sides: singles and doubles
+MATCH_SIZES = (2, 4)
+
+
+@lru_cache(maxsize=None)
+def lineups(window: int, size: int = 4):
+    """Every (side A, side B) index lineup of `size` players from a window.
+
+    The first candidate (longest waiting) is always in the game, on side
+    A, so the window only trades the remaining places. Lineups are ordered
+    by how far down the queue they reach, so among equally balanced
+    lineups the first is the fairest. Computed once per window and size.
+    """
+    half = size // 2
+    result = []
+    for rest in sorted(combinations(range(1, window), size - 1), key=lambda c: (c[-1], c)):
+        for partners in combinations(rest, half - 1):
+            side_a = (0, *partners)
+            side_b = tuple(i for i in rest if i not in partners)
+            result.append((side_a, side_b))
+    return tuple(result)
+
+
+def build_match(candidates, partner_of, size: int = 4):
+    """The most balanced game of `size` players from candidates in priority order.
+
+    Returns (side A, side B) minimizing the difference in summed rating,
+    with the first candidate always playing and doubles pairs (partner_of)
+    kept whole on one side; None if there are too few candidates or no
+    lineup satisfies the pairs.
+    """
+    count = len(candidates)
+    if count < size:
+        return None
+    rating = [p.rating for p in candidates].__getitem__
+    position = {p.id: i for i, p in enumerate(candidates)}
+    partners = {}
+    for i, player in enumerate(candidates):
+        partner = partner_of(player)
+        if partner is not None and partner.id in position:
+            partners[i] = position[partner.id]
+
+    best, best_diff = None, None
+    for lineup in lineups(count, size):
+        side_a, side_b = lineup
+        diff = abs(sum(map(rating, side_a)) - sum(map(rating, side_b)))
+        if best_diff is not None and diff >= best_diff:
+            continue
+        if partners and not _keeps_pairs(lineup, partners):
+            continue
+        best, best_diff = lineup, diff
+        if diff == 0:
+            break
+    if best is None:
+        return None
+    side_a, side_b = best
+    return [candidates[i] for i in side_a], [candidates[i] for i in side_b]
+
+
+def _keeps_pairs(lineup, partners):
+    side_a, side_b = lineup
+    side = {**dict.fromkeys(side_a, 0), **dict.fromkeys(side_b, 1)}
+    for index, partner in partners.items():
+        if index in side and side.get(partner) != side[index]:
+            return False
+    return True
+
+
+def take_balanced_match(floor, qualification: str, taken: set, window: int, size: int = 4):
+    """`size` queued players for an empty court as a balanced game.
+
+    Draws the next `window` candidates in fairness order (pairs whole, see
+    take_queued_players) without claiming them, builds the match, then
+    claims only the players in the game; the rest stay first in line for the
+    next court. Returns (players, {player id: "A" or "B"}), or falls back
+    to the plain next `size` when no balanced game can be built.
+    """
+    partner_of = floor.partner if config.PAIR_FILL_ENABLED else (lambda player: None)
+    candidates = take_queued_players(floor, qualification, window, set(taken))
+    match = build_match(candidates, partner_of, size)
+    if match is None:
+        return take_queued_players(floor, qualification, size, taken), {}
+    side_a, side_b = match
+    sides = {p.id: "A" for p in side_a}
+    sides.update((p.id, "B") for p in side_b)
+    taken.update(sides)
+    return side_a + side_b, sides
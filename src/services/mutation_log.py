@@ -0,0 +1,226 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import DateTime, event, inspect, select
+from sqlalchemy.orm import Session
+
+from .. import config
+from ..database.database import SessionLocal, utcnow
+from ..database.models import Base
+
+logger = logging.getLogger(__name__)
+
+# Tables whose rows are logged and replayed, in foreign key order. Login
+# sessions (secrets) and analytics rollups (derived) are left out
+LOGGED_TABLES = ("courts", "teams", "players", "match_results", "match_players")
+
+
+def encode_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def decode_row(table, values: dict):
+    """Column values from the log back to Python values for `table`"""
+    row = {}
+    for name, value in values.items():
+        if value is not None and isinstance(table.c[name].type, DateTime):
+            value = datetime.fromisoformat(value)
+        row[name] = value
+    return row
+
+
+def state_digest(tables) -> tuple:
+    """(sha256 hex, row count) of {table name: rows as encoded value lists}.
+
+    Rows are sorted, so the digest only depends on the state itself, not on
+    the order it was read or built in.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    for name in LOGGED_TABLES:
+        rows = sorted(tables.get(name, ()), key=lambda row: json.dumps(row))
+        digest.update(json.dumps([name, rows], separators=(",", ":")).encode())
+        count += len(rows)
+    return digest.hexdigest(), count
+
+
+def read_tables(db: Session) -> dict:
+    """Every logged table's rows, encoded, in column order"""
+    tables = {}
+    for name in LOGGED_TABLES:
+        table = Base.metadata.tables[name]
+        tables[name] = [[encode_value(v) for v in row] for row in db.execute(select(table))]
+    return tables
+
+
+class MutationLog:
+    """Append-only log of every committed change to the floor.
+
+    Hooked on the session like the event bus, so every mutation path
+    (requests, fill passes, check-in flushes, game rotation, rating jobs)
+    is captured. Each commit becomes one JSON line holding its timestamp,
+    its source (request method and path, or the background job) and the
+    row inserts, column updates and deletes it made:
+
+        {"t": "...", "src": "POST /api/queue/move", "ops": [["u", "players", [12], {"court_id": 3, "version": 5}]]}
+
+    A new log starts with a snapshot of the logged tables, and a checkpoint
+    line (digest of the same tables) is written whenever the log is opened
+    again or closed, so `python -m src.replay` can rebuild the state from an
+    empty database and verify it. Lines are written with one O_APPEND write
+    each, in commit order: a transaction with changes to log takes the
+    log's commit turn just before its COMMIT and hands it on once its line
+    is written, so concurrent sessions cannot log in the opposite order to
+    the one the database applied them in.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.stats = Counter()
+        self._fd = None
+        self._lock = threading.Lock()
+        self._commit_turn = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self._fd is not None
+
+    def open(self):
+        """Start logging; blocking (reads the logged tables)"""
+        if self.path is None or self._fd is not None:
+            return
+        path = self.path.format(pid=os.getpid())
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        with SessionLocal() as db:
+            tables = read_tables(db)
+        if os.fstat(self._fd).st_size == 0:
+            columns = {name: [c.name for c in Base.metadata.tables[name].c] for name in LOGGED_TABLES}
+            self._write({"t": encode_value(utcnow()), "snapshot": tables, "columns": columns})
+        else:
+            self._write_checkpoint(tables)
+        logger.info(f"Recording mutations to {path}")
+
+    def close(self):
+        """Write a closing checkpoint and stop logging; blocking"""
+        if self._fd is None:
+            return
+        try:
+            with SessionLocal() as db:
+                self._write_checkpoint(read_tables(db))
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def stage(self, session: Session, ops):
+        """Add ops for writes the ORM hooks cannot see (Core statements);
+        they are logged with the rest of the session's transaction"""
+        if self._fd is not None:
+            session.info.setdefault("mutation_ops", []).extend(ops)
+
+    def begin_commit(self, session: Session):
+        """Hold the commit turn from just before COMMIT until end_commit()"""
+        self._commit_turn.acquire()
+        session.info["mutation_log_turn"] = True
+
+    def end_commit(self, session: Session):
+        if session.info.pop("mutation_log_turn", False):
+            self._commit_turn.release()
+
+    def append(self, source: str, ops):
+        self._write({"t": encode_value(utcnow()), "src": source, "ops": ops})
+        self.stats["entries"] += 1
+        self.stats["ops"] += len(ops)
+
+    def status(self):
+        return {"enabled": self.enabled, **self.stats}
+
+    def _write_checkpoint(self, tables):
+        digest, rows = state_digest(tables)
+        self._write({"t": encode_value(utcnow()), "checkpoint": digest, "rows": rows})
+
+    def _write(self, entry):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._fd is None:
+                return
+            os.write(self._fd, line.encode())
+        self.stats["bytes"] += len(line)
+
+
+def _row_ops(session):
+    """Ops for the objects this flush wrote, read before their history is reset"""
+    ops = []
+    for obj in session.new:
+        state = inspect(obj)
+        table = state.mapper.local_table
+        if table.name in LOGGED_TABLES:
+            ops.append(["i", table.name, {
+                prop.columns[0].name: encode_value(state.dict.get(prop.key))
+                for prop in state.mapper.column_attrs
+            }])
+    for obj in session.dirty:
+        state = inspect(obj)
+        mapper = state.mapper
+        if mapper.local_table.name not in LOGGED_TABLES or obj in session.new:
+            continue
+        changes = {
+            prop.columns[0].name: encode_value(state.dict.get(prop.key))
+            for prop in mapper.column_attrs
+            if state.attrs[prop.key].history.has_changes()
+        }
+        if not changes:
+            continue
+        if mapper.version_id_col is not None:
+            # The new version, set by the flush itself
+            changes[mapper.version_id_col.name] = state.dict.get(mapper.version_id_col.key)
+        ops.append(["u", mapper.local_table.name, list(mapper.primary_key_from_instance(obj)), changes])
+    for obj in session.deleted:
+        mapper = inspect(obj).mapper
+        if mapper.local_table.name in LOGGED_TABLES:
+            ops.append(["d", mapper.local_table.name, list(mapper.primary_key_from_instance(obj))])
+    return ops
+
+
+def track_mutations(session_factory, log: MutationLog):
+    """Append one log entry per committed transaction that changed logged rows"""
+
+    @event.listens_for(session_factory, "after_flush")
+    def _collect_ops(session, flush_context):
+        if log.enabled:
+            session.info.setdefault("mutation_ops", []).extend(_row_ops(session))
+
+    @event.listens_for(session_factory, "before_commit")
+    def _take_commit_turn(session):
+        if not log.enabled or session.in_nested_transaction():
+            return
+        # Commit flushes after this hook; flush now so every op is known
+        # and nothing is left to wait on row locks while holding the turn
+        for _ in range(100):
+            if not (session.new or session.dirty or session.deleted):
+                break
+            session.flush()
+        if session.info.get("mutation_ops"):
+            log.begin_commit(session)
+
+    @event.listens_for(session_factory, "after_commit")
+    def _write_ops(session):
+        try:
+            ops = session.info.pop("mutation_ops", None)
+            if ops and log.enabled:
+                log.append(session.info.get("source", "background"), ops)
+        finally:
+            log.end_commit(session)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _discard_ops(session):
+        session.info.pop("mutation_ops", None)
+        log.end_commit(session)
+
+mutation_log = MutationLog(config.MUTATION_LOG_PATH)
+
+track_mutations(SessionLocal, mutation_log)
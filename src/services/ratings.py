@@ -0,0 +1,211 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from contextlib import suppress
+
+from sqlalchemy import bindparam, select, update
+
+from .. import config
+from ..database.database import SessionLocal, utcnow
+from ..database.models import MatchPlayer, MatchResult, Player
+from .events import mark_changed
+from .locks import try_runner_lock
+from .mutation_log import mutation_log
+
+logger = logging.getLogger(__name__)
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+def apply_elo(ratings, sides, winner: str, k: float):
+    """Update `ratings` in place for one doubles game.
+
+    Each side plays at its players' mean rating; every player on a side
+    gains (or loses) the same K * (actual - expected) points, so a game
+    moves as many points to the winners as it takes from the losers.
+    """
+    mean = {
+        side: sum(ratings[p] for p in players) / len(players)
+        for side, players in sides.items()
+    }
+    delta = k * ((1.0 if winner == "A" else 0.0) - expected_score(mean["A"], mean["B"]))
+    for player_id in sides["A"]:
+        ratings[player_id] += delta
+    for player_id in sides["B"]:
+        ratings[player_id] -= delta
+
+
+class RatingUpdater:
+    """Applies recorded match results to player ratings in the background.
+
+    Recording a result only inserts rows and calls notify(). After a quiet
+    period the job takes the unrated results in id order, reads the
+    involved players' ratings in one query, replays the games in memory,
+    and writes every changed rating with a single executemany UPDATE in
+    the same transaction that marks the results rated. A per-venue runner
+    lock keeps workers from applying a result twice.
+
+    The UPDATE is guarded by the player versions read with the ratings and
+    bumps them, like an ORM write: an operator edit made meanwhile makes
+    the batch roll back and rerun on fresh ratings, and a later edit from a
+    view taken before the batch gets a 409 instead of overwriting it.
+    """
+
+    def __init__(self, k_factor: float, batch_size: int, debounce: float, venue: str):
+        self.k_factor = k_factor
+        self.batch_size = batch_size
+        self.debounce = debounce
+        self.lock_key = f"ratings:{venue}"
+        self.pending = False
+        self.stats = Counter()
+        self._loop = None
+        self._wake = None
+        self._task = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if self.pending:
+            self._wake.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._loop = self._wake = self._task = None
+
+    def notify(self):
+        """A result was recorded; safe to call from the event loop or a worker thread"""
+        self.pending = True
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake.set()
+        else:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def status(self):
+        return {"pending": self.pending, **self.stats}
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            await asyncio.sleep(self.debounce)
+            self._wake.clear()
+            self.pending = False
+            try:
+                while True:
+                    rated = await asyncio.to_thread(self.process_batch)
+                    if rated is None:
+                        # Another worker holds the lock, or a player was
+                        # edited under the batch; try again later
+                        self.pending = True
+                        self._wake.set()
+                        break
+                    if rated < self.batch_size:
+                        break
+            except Exception as e:
+                logger.error(f"Rating update failed: {e}")
+                self.stats["errors"] += 1
+
+    def process_batch(self):
+        """Rate the next batch of results; returns how many, None to retry later"""
+        db = SessionLocal(info={"source": "ratings"})
+        try:
+            if not try_runner_lock(db, self.lock_key):
+                self.stats["skipped_locked"] += 1
+                return None
+            results = db.execute(
+                select(MatchResult.id, MatchResult.winner)
+                .where(MatchResult.rated_at.is_(None))
+                .order_by(MatchResult.id)
+                .limit(self.batch_size)
+            ).all()
+            if not results:
+                db.commit()
+                return 0
+
+            result_ids = [result_id for result_id, _ in results]
+            sides = defaultdict(lambda: {"A": [], "B": []})
+            for result_id, player_id, side in db.execute(
+                select(MatchPlayer.result_id, MatchPlayer.player_id, MatchPlayer.side)
+                .where(MatchPlayer.result_id.in_(result_ids))
+            ):
+                sides[result_id][side].append(player_id)
+            player_ids = {p for game in sides.values() for side in game.values() for p in side}
+            rows = db.execute(
+                select(Player.id, Player.rating, Player.version).where(Player.id.in_(player_ids))
+            ).all()
+            ratings = {player_id: rating for player_id, rating, _ in rows}
+            versions = {player_id: version for player_id, _, version in rows}
+            before = dict(ratings)
+
+            for result_id, winner in results:
+                game = sides[result_id]
+                # Players deleted since the game no longer count
+                game = {side: [p for p in players if p in ratings] for side, players in game.items()}
+                if game["A"] and game["B"]:
+                    apply_elo(ratings, game, winner, self.k_factor)
+
+            changed = [
+                {"player_id": player_id, "old_version": versions[player_id], "new_rating": rating}
+                for player_id, rating in ratings.items() if rating != before[player_id]
+            ]
+            if changed:
+                # Core executemany with the ORM's compare-and-swap on version
+                players = Player.__table__
+                statement = (
+                    update(players)
+                    .where(players.c.id == bindparam("player_id"),
+                           players.c.version == bindparam("old_version"))
+                    .values(rating=bindparam("new_rating"), version=players.c.version + 1)
+                )
+                if db.get_bind().dialect.supports_sane_multi_rowcount:
+                    matched = db.execute(statement, changed).rowcount
+                else:
+                    # The driver cannot count executemany matches: one UPDATE per player
+                    matched = sum(db.execute(statement, row).rowcount for row in changed)
+                if matched != len(changed):
+                    # A player was edited since the ratings were read
+                    db.rollback()
+                    self.stats["version_conflicts"] += 1
+                    return None
+                mark_changed(db, players=[c["player_id"] for c in changed])
+            rated_at = utcnow()
+            db.execute(
+                update(MatchResult.__table__)
+                .where(MatchResult.__table__.c.id.in_(result_ids))
+                .values(rated_at=rated_at)
+            )
+            mutation_log.stage(db, [
+                *(["u", "players", [c["player_id"]], {"rating": c["new_rating"], "version": c["old_version"] + 1}]
+                  for c in changed),
+                *(["u", "match_results", [result_id], {"rated_at": rated_at.isoformat()}]
+                  for result_id in result_ids)
+            ])
+            db.commit()
+            self.stats["results_rated"] += len(results)
+            self.stats["ratings_updated"] += len(changed)
+            return len(results)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+rating_updater = RatingUpdater(
+    k_factor=config.RATING_K_FACTOR,
+    batch_size=config.RATING_BATCH_SIZE,
+    debounce=config.RATING_DEBOUNCE_SECONDS,
+    venue=config.VENUE_ID
+)
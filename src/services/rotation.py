@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, inspect, select
+
+from .. import config
+from ..database.database import SessionLocal, utcnow
+from ..database.models import Court, Player
+from .autofill import autofill_scheduler
+from .events import WORKER_ID, event_bus
+from .locks import try_runner_lock
+from .timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+def game_duration(court_type: str):
+    """Configured game length for a court type, or None if games there are untimed"""
+    minutes = config.GAME_DURATION_MINUTES.get(court_type, 0)
+    return timedelta(minutes=minutes) if minutes > 0 else None
+
+
+def track_game_clocks(session_factory):
+    """Start and stop Court.game_started_at as courts fill up and empty out.
+
+    A game starts when a court reaches capacity and ends when it drops below.
+    Hooked on flush so every assignment path (fill passes, manual moves,
+    player and court edits) keeps the persisted clock right, and the game
+    rotation scheduler is told about it once the transaction commits.
+    """
+
+    @event.listens_for(session_factory, "before_flush")
+    def _collect_touched_courts(session, flush_context, instances):
+        touched = session.info.setdefault("touched_courts", set())
+        for obj in list(session.dirty) + list(session.new) + list(session.deleted):
+            if isinstance(obj, Player):
+                history = inspect(obj).attrs.court_id.history
+                touched.update(c for c in (*history.added, *history.deleted) if c is not None)
+                if obj in session.deleted and obj.court_id is not None:
+                    touched.add(obj.court_id)
+            elif (isinstance(obj, Court) and obj in session.dirty
+                  and inspect(obj).attrs.capacity.history.has_changes()):
+                touched.add(obj.id)
+
+    @event.listens_for(session_factory, "after_flush_postexec")
+    def _update_game_clocks(session, flush_context):
+        touched = session.info.pop("touched_courts", None)
+        if not touched:
+            return
+        counts = dict(session.execute(
+            select(Player.court_id, func.count())
+            .where(Player.court_id.in_(touched))
+            .group_by(Player.court_id)
+        ).all())
+        changes = session.info.setdefault("game_clock_changes", {})
+        for court in session.scalars(select(Court).where(Court.id.in_(touched))):
+            is_full = counts.get(court.id, 0) >= court.capacity
+            if is_full and court.game_started_at is None:
+                court.game_started_at = utcnow()
+                changes[court.id] = (court.court_type, court.game_started_at)
+            elif not is_full and court.game_started_at is not None:
+                court.game_started_at = None
+                changes[court.id] = None
+
+    @event.listens_for(session_factory, "after_commit")
+    def _publish_game_clocks(session):
+        changes = session.info.pop("game_clock_changes", None)
+        if not changes:
+            return
+        for court_id, game in changes.items():
+            if game is None:
+                game_rotation.cancel_game(court_id)
+            else:
+                game_rotation.schedule_game(court_id, *game)
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _discard_game_clocks(session):
+        session.info.pop("touched_courts", None)
+        session.info.pop("game_clock_changes", None)
+
+
+class GameRotationScheduler:
+    """Releases players back to the queue when a timed game runs out.
+
+    Running games live in a timer wheel keyed by court id, so a tick costs
+    O(1) however many games are in progress. Start times are persisted on
+    the court, so the wheel is rebuilt from the database on startup and
+    resynced periodically to pick up games started by other workers. Each
+    expiry re-checks the persisted start time before releasing, which keeps
+    it idempotent across workers and restarts; freed courts are refilled
+    through the auto-fill scheduler.
+    """
+
+    def __init__(self, tick: float, resync_interval: float, venue: str):
+        self.tick = tick
+        self.resync_interval = resync_interval
+        self.lock_key = f"rotation:{venue}"
+        self.stats = Counter()
+        self._wheel = TimerWheel(tick=tick)
+        self._lock = threading.Lock()
+        self._task = None
+
+    def _deadline(self, court_type: str, started_at: datetime):
+        duration = game_duration(court_type)
+        if duration is None:
+            return None
+        ends_at = started_at + duration
+        # Wheel runs on wall-clock seconds so persisted start times line up
+        return ends_at.replace(tzinfo=timezone.utc).timestamp()
+
+    def schedule_game(self, court_id: int, court_type: str, started_at: datetime):
+        deadline = self._deadline(court_type, started_at)
+        with self._lock:
+            if deadline is None:
+                self._wheel.cancel(court_id)
+            else:
+                self._wheel.schedule(court_id, deadline, started_at)
+
+    def cancel_game(self, court_id: int):
+        with self._lock:
+            self._wheel.cancel(court_id)
+
+    def status(self):
+        with self._lock:
+            running = len(self._wheel)
+        return {"enabled": self._task is not None, "games_running": running, **self.stats}
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+
+    async def _run(self):
+        next_resync = 0.0
+        while True:
+            if time.monotonic() >= next_resync:
+                try:
+                    await asyncio.to_thread(self.resync)
+                    next_resync = time.monotonic() + self.resync_interval
+                except Exception as e:
+                    logger.warning(f"Game clock resync failed: {e}")
+                    next_resync = time.monotonic() + self.tick * 5
+
+            with self._lock:
+                expired = self._wheel.advance(time.time())
+            for court_id, started_at in expired:
+                try:
+                    released = await asyncio.to_thread(self._finish_game, court_id, started_at)
+                except Exception as e:
+                    logger.error(f"Failed to finish game on court {court_id}: {e}")
+                    released = None
+                if released is None:
+                    # Lock busy or transient error - try again shortly
+                    with self._lock:
+                        self._wheel.schedule(court_id, time.time() + self.tick, started_at)
+
+            await asyncio.sleep(self.tick)
+
+    def resync(self):
+        """Rebuild the wheel from persisted game start times"""
+        with SessionLocal() as db:
+            games = db.execute(
+                select(Court.id, Court.court_type, Court.game_started_at)
+                .where(Court.game_started_at.is_not(None))
+            ).all()
+        with self._lock:
+            self._wheel = TimerWheel(tick=self.tick)
+            for court_id, court_type, started_at in games:
+                deadline = self._deadline(court_type, started_at)
+                if deadline is not None:
+                    self._wheel.schedule(court_id, deadline, started_at)
+        self.stats["resyncs"] += 1
+
+    def changed(self, court_ids):
+        """Courts changed in another worker (None: unknown, resync everything).
+
+        Ignored while the scheduler is not running; start() resyncs anyway.
+        """
+        if self._task is None:
+            return
+        if court_ids is None:
+            self.resync()
+        elif court_ids:
+            self.reload_courts(court_ids)
+
+    def reload_courts(self, court_ids):
+        """Pick up game clocks started or stopped by another worker"""
+        with SessionLocal() as db:
+            games = db.execute(
+                select(Court.id, Court.court_type, Court.game_started_at)
+                .where(Court.id.in_(court_ids))
+            ).all()
+        for court_id, court_type, started_at in games:
+            if started_at is None:
+                self.cancel_game(court_id)
+            else:
+                self.schedule_game(court_id, court_type, started_at)
+
+    def _finish_game(self, court_id: int, started_at: datetime):
+        """Move everyone on the court back to the queue; returns players released"""
+        with SessionLocal(info={"source": "rotation"}) as db:
+            if not try_runner_lock(db, self.lock_key):
+                return None
+            court = db.get(Court, court_id)
+            if court is None or court.game_started_at != started_at:
+                # Game already ended or a new one started - nothing to do
+                db.rollback()
+                return 0
+
+            players = db.query(Player).filter(Player.court_id == court_id).all()
+            for player in players:
+                player.court_id = None
+            court.game_started_at = None
+            if config.NEXT_UP_ENABLED:
+                # Imported here: staging imports this module for game lengths
+                from .staging import next_up
+                promoted = next_up.promote(db, court_id)
+                if promoted:
+                    logger.info(f"Court {court_id} takes its {len(promoted)} staged players")
+            db.commit()
+
+        self.stats["games_finished"] += 1
+        logger.info(f"Game on court {court_id} finished, released {len(players)} players")
+        autofill_scheduler.notify("game_finished")
+        return len(players)
+
+
+game_rotation = GameRotationScheduler(
+    tick=config.GAME_ROTATION_TICK_SECONDS,
+    resync_interval=config.GAME_ROTATION_RESYNC_SECONDS,
+    venue=config.VENUE_ID
+)
+
+track_game_clocks(SessionLocal)
+
+
+@event_bus.subscribe
+def _apply_remote_game_clocks(payload):
+    if payload["kind"] == "state_changed" and payload["origin"] != WORKER_ID:
+        game_rotation.changed(payload.get("courts", []))
@@ -0,0 +1,148 @@
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import config
+from ..database.database import SessionLocal, utcnow
+from ..database.models import AuthSession
+from .events import event_bus
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """Issues and validates signed login session tokens.
+
+    A token is `<session id>.<expiry>.<signature>`, HMAC-signed with the
+    server secret, so forged or expired tokens are rejected without any
+    lookup. Valid tokens are checked against a bounded per-process cache of
+    live sessions and only fall back to the sessions table on a miss, so an
+    authenticated request normally costs no database round trip.
+
+    Logout marks the session revoked in the table and publishes a
+    session_revoked event; every worker drops it from its cache right away.
+    The cache TTL bounds how long a revocation can go unseen if an event is
+    lost.
+    """
+
+    def __init__(self, secret, ttl: timedelta, cache_seconds: float, max_entries: int):
+        if not secret:
+            logger.warning("SESSION_SECRET is not set; using a random secret, so sessions "
+                           "end on restart and are not shared between workers")
+            secret = secrets.token_hex(32)
+        self._secret = secret.encode()
+        self.ttl = ttl
+        self.cache_seconds = cache_seconds
+        self.max_entries = max_entries
+        self.stats = Counter()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._secret, payload.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def issue(self, db: Session, player_id: int):
+        """Create a session row (the caller commits); returns (token, expires_at)"""
+        session_id = secrets.token_hex(16)
+        now = utcnow()
+        expires_at = now + self.ttl
+        db.add(AuthSession(id=session_id, player_id=player_id, created_at=now, expires_at=expires_at))
+        expires_ts = int(expires_at.replace(tzinfo=timezone.utc).timestamp())
+        payload = f"{session_id}.{expires_ts}"
+        self._remember(session_id, player_id, expires_ts)
+        self.stats["issued"] += 1
+        return f"{payload}.{self._sign(payload)}", expires_at
+
+    def parse(self, token: str):
+        """(session id, expiry timestamp) for an authentic, unexpired token, else None"""
+        try:
+            session_id, expires, signature = token.split(".")
+            expires_ts = int(expires)
+        except (AttributeError, ValueError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(f"{session_id}.{expires}")):
+            self.stats["bad_signature"] += 1
+            return None
+        if expires_ts <= time.time():
+            self.stats["expired"] += 1
+            return None
+        return session_id, expires_ts
+
+    def validate(self, token: str):
+        """(session id, player id) for a live session, else None"""
+        parsed = self.parse(token)
+        if parsed is None:
+            return None
+        session_id, expires_ts = parsed
+
+        with self._lock:
+            entry = self._cache.get(session_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self.stats["cache_hits"] += 1
+                return session_id, entry[0]
+
+        self.stats["cache_misses"] += 1
+        with SessionLocal() as db:
+            player_id = db.execute(
+                select(AuthSession.player_id).where(
+                    AuthSession.id == session_id,
+                    AuthSession.revoked_at.is_(None),
+                    AuthSession.expires_at > utcnow()
+                )
+            ).scalar()
+        if player_id is None:
+            self.forget(session_id)
+            return None
+        self._remember(session_id, player_id, expires_ts)
+        return session_id, player_id
+
+    def revoke(self, db: Session, session_id: str):
+        """End a session everywhere: persisted, then evicted from every worker's cache"""
+        session = db.get(AuthSession, session_id)
+        if session is not None and session.revoked_at is None:
+            session.revoked_at = utcnow()
+        event_bus.publish("session_revoked", session=db, session_id=session_id)
+        db.commit()
+        self.stats["revoked"] += 1
+        self.forget(session_id)
+
+    def _remember(self, session_id: str, player_id: int, expires_ts: int):
+        cached_until = time.monotonic() + min(self.cache_seconds, expires_ts - time.time())
+        with self._lock:
+            self._cache[session_id] = (player_id, cached_until)
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+    def status(self):
+        with self._lock:
+            cached = len(self._cache)
+        return {"cached": cached, **self.stats}
+
+
+session_store = SessionStore(
+    secret=config.SESSION_SECRET,
+    ttl=timedelta(hours=config.SESSION_TTL_HOURS),
+    cache_seconds=config.SESSION_CACHE_SECONDS,
+    max_entries=config.SESSION_CACHE_MAX
+)
+
+
+@event_bus.subscribe
+def _drop_revoked_session(payload):
+    if payload["kind"] == "session_revoked":
+        session_store.forget(payload["session_id"])
@@ -0,0 +1,292 @@
+import asyncio
+import logging
+import threading
+from collections import Counter
+from contextlib import suppress
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .. import config
+from ..database.database import SessionLocal
+from ..database.models import Court, Player
+from .events import event_bus
+from .fairness import fair_queue
+from .floor import FloorState
+from .rotation import game_duration
+from .topology import court_topology
+
+logger = logging.getLogger(__name__)
+
+
+class StagedGroup:
+    """The players who go on a court when its current game ends"""
+
+    __slots__ = ("court_id", "court_setup", "players", "versions", "sides")
+
+    def __init__(self, court, players, sides):
+        self.court_id = court.id
+        # What the group was chosen for; the court's version is no use here,
+        # it changes whenever a game starts or ends
+        self.court_setup = (court.court_type, court.capacity)
+        self.players = players  # PlayerState records, as planned
+        self.versions = {p.id: p.version for p in players}
+        self.sides = sides
+
+
+def release_order(court):
+    """Courts without a game come free first, then games by expected end"""
+    if court.game_started_at is None:
+        return (0, 0, court.id)
+    duration = game_duration(court.court_type)
+    ends_at = court.game_started_at + duration if duration else court.game_started_at
+    return (1, ends_at, court.id)
+
+
+class NextUpStaging:
+    """Keeps the next group for every court planned ahead of time.
+
+    Groups are chosen with the fill pass's own rules (choose_players:
+    court type, feeders first, balanced matches), court by court in the
+    order courts are expected to come free, so the longest-waiting players
+    are lined up for the court that frees up first and no player is staged
+    twice.
+
+    Planning is incremental. Every state_changed event (from any worker)
+    marks courts dirty: a court that changed, the court a changed feeder
+    feeds, the court of a staged player who changed, and a court whose
+    group a newly queued player outranks. Only dirty courts are replanned,
+    around the players the other groups already hold, so boards show
+    stable groups. A topology change or a missed event (periodic resync)
+    replans everything.
+
+    When a game ends, promote() moves the staged group onto the court in
+    the release transaction, with no queue reads; a court freed any other
+    way gets its group from the fill pass (claim()). If any staged player
+    changed since planning, or the court's type or capacity did, the group
+    is skipped and the pass picks as usual.
+    """
+
+    def __init__(self, debounce: float, resync_interval: float):
+        self.debounce = debounce
+        self.resync_interval = resync_interval
+        self.stats = Counter()
+        self._groups = {}  # court id -> StagedGroup
+        self._staged = {}  # player id -> court id
+        self._feeds = None
+        self._changed_players = set()
+        self._changed_courts = set()
+        self._full = True
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wake = None
+        self._task = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        self._wake.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        self._loop = self._wake = self._task = None
+
+    def changed(self, players, courts):
+        """Players / courts changed (None: unknown, replan everything); thread-safe"""
+        with self._lock:
+            if players is None or courts is None:
+                self._full = True
+            else:
+                self._changed_players.update(players)
+                self._changed_courts.update(courts)
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake.set()
+        else:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def group(self, court_id: int):
+        with self._lock:
+            return self._groups.get(court_id)
+
+    def court_for(self, player_id: int):
+        """Court the player is staged for, or None"""
+        with self._lock:
+            return self._staged.get(player_id)
+
+    def status(self):
+        with self._lock:
+            staged = len(self._groups)
+        return {"enabled": self._task is not None, "staged_courts": staged, **self.stats}
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.resync_interval)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    self._full = True
+            await asyncio.sleep(self.debounce)
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self._restage_now)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Next-up staging failed: {e}")
+                with self._lock:
+                    self._full = True
+
+    def _restage_now(self):
+        with SessionLocal() as db:
+            self.restage(db)
+
+    def restage(self, db: Session):
+        """Replan the groups of dirty courts; returns the court ids replanned"""
+        # Imported here: the queue router imports this module for the boards
+        from ..api.queue import choose_players
+
+        with self._lock:
+            players, courts, full = self._changed_players, self._changed_courts, self._full
+            self._changed_players, self._changed_courts, self._full = set(), set(), False
+            groups, staged = dict(self._groups), dict(self._staged)
+
+        floor = FloorState.load(db)
+        fair_queue.ensure_fresh(db)
+        topology = court_topology(floor.courts.values())
+        order = sorted(
+            (c for c in floor.courts.values() if c.court_type != "training"),
+            key=release_order
+        )
+        groups = {court_id: group for court_id, group in groups.items()
+                  if court_id in floor.courts and floor.courts[court_id].court_type != "training"}
+
+        if full or topology.feeds != self._feeds:
+            dirty = {c.id for c in order}
+        else:
+            dirty = {c.id for c in order if c.id not in groups}
+            for court_id in courts:
+                dirty.add(court_id)
+                if court_id in topology.feeds:
+                    dirty.add(topology.feeds[court_id])
+            for player_id in players:
+                if player_id in staged:
+                    dirty.add(staged[player_id])
+                    continue
+                player = floor.players.get(player_id)
+                if player is not None and player.is_active and player.court_id is None:
+                    dirty.update(self._outranked(floor, groups, player))
+        dirty &= {c.id for c in order}
+
+        taken = {p.id for court_id, group in groups.items() if court_id not in dirty for p in group.players}
+        for court in order:
+            if court.id not in dirty:
+                continue
+            chosen, sides = choose_players(floor, topology, court, court.capacity, taken)
+            taken.update(p.id for p in chosen)
+            if chosen:
+                groups[court.id] = StagedGroup(court, chosen, sides)
+            else:
+                groups.pop(court.id, None)
+
+        with self._lock:
+            self._groups = groups
+            self._staged = {p.id: court_id for court_id, group in groups.items() for p in group.players}
+            self._feeds = topology.feeds
+        self.stats["passes"] += 1
+        self.stats["courts_restaged"] += len(dirty)
+        return dirty
+
+    @staticmethod
+    def _outranked(floor: FloorState, groups, player):
+        """Courts whose group a newly queued player should have been in"""
+        key = fair_queue.sort_key(player)
+        for court_id, group in groups.items():
+            court = floor.courts[court_id]
+            if court.court_type != player.qualification:
+                continue
+            if len(group.players) < court.capacity or any(
+                p.court_id is None and fair_queue.sort_key(p) > key for p in group.players
+            ):
+                yield court_id
+
+    def claim(self, floor: FloorState, court, spots: int, taken: set):
+        """The court's staged group, for a fill pass with `spots` free places.
+
+        Returns (players from `floor`, {player id: side}) and adds them to
+        `taken`, or ([], {}) when the group does not fit or any staged
+        player changed since planning - the pass then picks as usual. Lets
+        courts freed by any path (moves to the queue, removals, the pass
+        itself) take the group the boards show.
+        """
+        group = self.group(court.id)
+        if group is None or (court.court_type, court.capacity) != group.court_setup:
+            return [], {}
+        players = [floor.players.get(player_id) for player_id in group.versions]
+        if len(players) > spots or any(
+            p is None or p.id in taken or not p.is_active or p.version != group.versions[p.id]
+            for p in players
+        ):
+            self.stats["claim_stale"] += 1
+            return [], {}
+        taken.update(group.versions)
+        self.stats["claimed"] += 1
+        return players, group.sides
+
+    def promote(self, db: Session, court_id: int):
+        """Put the court's staged group on it as its game ends.
+
+        Call in the transaction that releases the court, before committing:
+        the release and the moves then commit together, so a fill pass
+        never sees the court free without its group. The staged rows are
+        read FOR UPDATE, so a pass moving one of them first makes this a
+        no-op rather than a conflict that would undo the release. Returns
+        the players moved, or [] when there is no usable group.
+        """
+        with self._lock:
+            group = self._groups.pop(court_id, None)
+            if group is not None:
+                for p in group.players:
+                    self._staged.pop(p.id, None)
+        if group is None:
+            self.stats["promote_misses"] += 1
+            return []
+
+        db.flush()  # the release, so it counts below
+        court = db.get(Court, court_id)
+        on_court = db.execute(
+            select(func.count()).select_from(Player).where(Player.court_id == court_id)
+        ).scalar()
+        players = db.query(Player).filter(Player.id.in_(group.versions)).with_for_update().all()
+        if (court is None or (court.court_type, court.capacity) != group.court_setup
+                or court.capacity - on_court < len(players)
+                or len(players) != len(group.versions)
+                or any(p.version != group.versions[p.id] or not p.is_active for p in players)):
+            self.stats["promote_stale"] += 1
+            return []
+
+        for player in players:
+            player.court_id = court_id
+        self.stats["promoted"] += 1
+        return players
+
+
+next_up = NextUpStaging(
+    debounce=config.NEXT_UP_DEBOUNCE_SECONDS,
+    resync_interval=config.NEXT_UP_RESYNC_SECONDS
+)
+
+
+@event_bus.subscribe
+def _mark_changed(payload):
+    if payload["kind"] == "state_changed":
+        next_up.changed(payload.get("players", []), payload.get("courts", []))
@@ -0,0 +1,65 @@
+import math
+
+
+class TimerWheel:
+    """Hashed timer wheel keyed by an arbitrary hashable id.
+
+    Deadlines are bucketed into `size` slots of `tick` seconds. schedule() and
+    cancel() are O(1); advance() only visits the slots the clock moved past,
+    so each tick costs O(1) plus the timers that actually expire, regardless
+    of how many are pending. Deadlines further out than one revolution stay
+    in their slot until the wheel comes round to them again.
+    """
+
+    def __init__(self, tick: float = 1.0, size: int = 4096):
+        self.tick = tick
+        self.size = size
+        self._slots = [dict() for _ in range(size)]
+        self._index = {}
+        self._current = None
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def _tick_of(self, when: float) -> int:
+        return math.ceil(when / self.tick)
+
+    def schedule(self, key, deadline: float, payload=None):
+        """Add or move the timer for `key`"""
+        self.cancel(key)
+        deadline_tick = self._tick_of(deadline)
+        if self._current is not None and deadline_tick <= self._current:
+            # Already due: make it fire on the next advance()
+            deadline_tick = self._current + 1
+        slot = deadline_tick % self.size
+        self._slots[slot][key] = (deadline_tick, payload)
+        self._index[key] = slot
+
+    def cancel(self, key):
+        slot = self._index.pop(key, None)
+        if slot is not None:
+            del self._slots[slot][key]
+
+    def advance(self, now: float):
+        """Move the clock to `now` and return [(key, payload)] for expired timers"""
+        target = math.floor(now / self.tick)
+        if self._current is None:
+            # First advance: sweep every slot so overdue timers fire right away
+            self._current = target - self.size
+        expired = []
+        # Never visit more than one revolution, even after a long pause
+        start = max(self._current + 1, target - self.size + 1)
+        for current in range(start, target + 1):
+            slot = self._slots[current % self.size]
+            if not slot:
+                continue
+            due = [key for key, (deadline_tick, _) in slot.items() if deadline_tick <= target]
+            for key in due:
+                _, payload = slot.pop(key)
+                del self._index[key]
+                expired.append((key, payload))
+        self._current = target
+        return expired
@@ -0,0 +1,92 @@
+import logging
+import threading
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class CourtTopology:
+    """Precomputed feeder graph for the warmup cascade.
+
+    Each court may feed players into one other court (Court.feeds_court_id),
+    e.g. W1 -> G1, or longer chains like X1 -> W1 -> G1. `order` lists court
+    ids so every court comes before the courts that feed it: filling in that
+    order lets a court pull from its feeders first, and the feeders refill
+    their own gaps later in the same pass. Within a level, higher
+    fill_priority goes first.
+    """
+
+    def __init__(self, courts):
+        # courts: iterable of (id, name, feeds_court_id, fill_priority)
+        courts = list(courts)
+        ids = {court_id for court_id, _, _, _ in courts}
+        priority = {court_id: fill_priority or 0 for court_id, _, _, fill_priority in courts}
+        feeds = {court_id: target for court_id, _, target, _ in courts
+                 if target in ids and target != court_id}
+        if not feeds:
+            feeds = self._legacy_feeds(courts)
+
+        self.feeds = self._drop_cycles(feeds)
+        self.feeders = defaultdict(list)
+        for feeder, target in self.feeds.items():
+            self.feeders[target].append(feeder)
+        for target in self.feeders:
+            self.feeders[target].sort(key=lambda c: (-priority[c], c))
+
+        # Breadth-first from the sinks: level = hops to the court a chain ends at
+        level = {}
+        frontier = deque(c for c in ids if c not in self.feeds)
+        for court_id in frontier:
+            level[court_id] = 0
+        while frontier:
+            target = frontier.popleft()
+            for feeder in self.feeders[target]:
+                level[feeder] = level[target] + 1
+                frontier.append(feeder)
+        self.order = sorted(ids, key=lambda c: (level[c], -priority[c], c))
+
+    @staticmethod
+    def _legacy_feeds(courts):
+        """No topology configured: W<n> feeds G<n>, the original hard-coded layout"""
+        by_name = {name: court_id for court_id, name, _, _ in courts}
+        return {
+            by_name[name]: by_name["G" + name[1:]]
+            for name in by_name
+            if name.startswith("W") and "G" + name[1:] in by_name
+        }
+
+    @staticmethod
+    def _drop_cycles(feeds):
+        """Remove edges that would close a loop (each court has one outgoing edge)"""
+        feeds = dict(feeds)
+        for start in list(feeds):
+            seen = set()
+            court = start
+            while court in feeds:
+                if court in seen:
+                    logger.warning(f"Court topology cycle at court {court}, ignoring its feeder link")
+                    del feeds[court]
+                    break
+                seen.add(court)
+                court = feeds[court]
+        return feeds
+
+    def describe(self, names):
+        return {
+            "order": [names[c] for c in self.order],
+            "feeds": {names[feeder]: names[target] for feeder, target in self.feeds.items()}
+        }
+
+
+_cache_lock = threading.Lock()
+_cached = (None, None)
+
+
+def court_topology(courts) -> CourtTopology:
+    """Topology for the given Court rows, rebuilt only when the structure changes"""
+    global _cached
+    signature = tuple(sorted((c.id, c.name, c.feeds_court_id, c.fill_priority) for c in courts))
+    with _cache_lock:
+        if _cached[0] != signature:
+            _cached = (signature, CourtTopology(signature))
+        return _cached[1]
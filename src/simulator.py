@@ -0,0 +1,254 @@
+"""Discrete-event simulator for club nights.
+
+Replays player arrivals, timed games and departures against the real fill
+logic (the warmup cascade in queue.auto_fill_courts_internal and the
+AutoAssignmentService / smart-assign policies in automation.py) running on
+an in-memory SQLite database with a virtual clock, so a whole night runs in
+seconds. Reports court utilization, wait per qualification and fill pass
+latency for each policy.
+
+    python -m src.simulator --players 300 --hours 4
+    python -m src.simulator --policies cascade smart --courts G1:advanced,G2:intermediate,W1:advanced,W2:intermediate
+    python -m src.simulator --courts G1:advanced:2,G2:intermediate,G3:intermediate:6
+"""
+import argparse
+import heapq
+import random
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from .database.database import set_clock
+from .database.models import Base, Court, Player
+from .api.queue import auto_fill_courts_internal
+from .api.automation import AutoAssignmentService, smart_assign_players
+from .services.fairness import fair_queue, track_queue_entries
+
+SESSION_START = datetime(2026, 1, 1, 18, 0)
+DEFAULT_COURTS = ("G1:advanced,G2:intermediate,G3:intermediate,G4:intermediate,"
+                  "W1:advanced,W2:intermediate,W3:intermediate,W4:intermediate")
+
+POLICIES = {
+    "cascade": lambda db: auto_fill_courts_internal(db),
+    "priority": lambda db: AutoAssignmentService(db).auto_fill_courts(),
+    "smart": lambda db: smart_assign_players(db),
+}
+
+# Same-timestamp ordering: games end and players leave before anyone arrives
+GAME_END, DEPARTURE, ARRIVAL, END = range(4)
+
+
+@dataclass
+class Scenario:
+    players: int = 300
+    hours: float = 4.0
+    arrival_minutes: float = 90.0
+    burst_share: float = 0.6
+    burst_minutes: float = 15.0
+    stay_minutes: tuple = (60.0, 180.0)
+    game_minutes: float = 15.0
+    advanced_share: float = 0.35
+    courts: str = DEFAULT_COURTS
+    seed: int = 1
+
+    def court_layout(self):
+        """(name, court type, capacity) per court; specs are name:type[:capacity]"""
+        layout = []
+        for spec in self.courts.split(","):
+            name, court_type, *capacity = spec.split(":")
+            layout.append((name, court_type, int(capacity[0]) if capacity else 4))
+        return layout
+
+
+def build_arrivals(scenario: Scenario, rng: random.Random):
+    """(arrival, departure, qualification) per player; a burst at the start, then a trickle"""
+    end = scenario.hours * 3600
+    players = []
+    for _ in range(scenario.players):
+        if rng.random() < scenario.burst_share:
+            arrival = rng.uniform(0, scenario.burst_minutes * 60)
+        else:
+            arrival = rng.uniform(0, scenario.arrival_minutes * 60)
+        departure = min(end, arrival + rng.uniform(*scenario.stay_minutes) * 60)
+        qualification = "advanced" if rng.random() < scenario.advanced_share else "intermediate"
+        players.append((arrival, departure, qualification))
+    return players
+
+
+def simulate(scenario: Scenario, policy: str):
+    rng = random.Random(scenario.seed)
+    arrivals = build_arrivals(scenario, rng)
+    end = scenario.hours * 3600
+
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    track_queue_entries(session_factory)
+
+    now = 0.0
+    set_clock(lambda: SESSION_START + timedelta(seconds=now))
+    fill = POLICIES[policy]
+
+    queued_since = {}
+    waits = defaultdict(list)
+    pass_ms = []
+    games = {}
+    games_started = 0
+    seat_seconds = 0.0
+    idle_seat_seconds = 0.0
+    last_t = 0.0
+    occupied = 0
+    idle_fillable = 0
+
+    try:
+        with session_factory() as db:
+            courts = [Court(name=name, court_type=court_type, capacity=capacity)
+                      for name, court_type, capacity in scenario.court_layout()]
+            db.add_all(courts)
+            players = [Player(name=f"Player {i}", email=f"player{i}@example.com",
+                              qualification=qualification, is_active=False)
+                       for i, (_, _, qualification) in enumerate(arrivals)]
+            db.add_all(players)
+            db.commit()
+            court_ids = [c.id for c in courts]
+            capacity_of = {c.id: c.capacity for c in courts}
+            qualification_of = {p.id: p.qualification for p in players}
+            fair_queue.passes.clear()
+            fair_queue.load(db)
+
+            events = [(end, END, 0, None)]
+            for player, (arrival, departure, _) in zip(players, arrivals):
+                events.append((arrival, ARRIVAL, player.id, None))
+                events.append((departure, DEPARTURE, player.id, None))
+            heapq.heapify(events)
+
+            wall_start = time.perf_counter()
+            while events:
+                t = events[0][0]
+                seat_seconds += occupied * (t - last_t)
+                idle_seat_seconds += idle_fillable * (t - last_t)
+                last_t = now = t
+
+                finished = False
+                while events and events[0][0] == t:
+                    _, kind, key, payload = heapq.heappop(events)
+                    if kind == END:
+                        finished = True
+                    elif kind == ARRIVAL:
+                        player = db.get(Player, key)
+                        player.is_active = True
+                        queued_since[key] = t
+                    elif kind == DEPARTURE:
+                        player = db.get(Player, key)
+                        player.is_active = False
+                        player.court_id = None
+                        queued_since.pop(key, None)
+                    elif kind == GAME_END and games.get(key) == payload:
+                        del games[key]
+                        for player in db.query(Player).filter(Player.court_id == key):
+                            player.court_id = None
+                            queued_since[player.id] = t
+                db.commit()
+                if finished:
+                    break
+
+                started = time.perf_counter()
+                fill(db)
+                db.commit()
+                pass_ms.append((time.perf_counter() - started) * 1000)
+
+                # Observe the floor: who got on a court, which courts start a game
+                rows = db.execute(
+                    select(Player.id, Player.court_id).where(Player.is_active == True)
+                ).all()
+                counts = defaultdict(int)
+                queued = 0
+                for player_id, court_id in rows:
+                    if court_id is None:
+                        queued += 1
+                        continue
+                    counts[court_id] += 1
+                    joined = queued_since.pop(player_id, None)
+                    if joined is not None:
+                        waits[qualification_of[player_id]].append(t - joined)
+                occupied = sum(min(c, capacity_of[court_id]) for court_id, c in counts.items())
+                empty_seats = sum(capacity_of.values()) - occupied
+                idle_fillable = min(empty_seats, queued)
+
+                for court_id in court_ids:
+                    if counts[court_id] >= capacity_of[court_id] and court_id not in games:
+                        games_started += 1
+                        games[court_id] = games_started
+                        duration = max(180.0, rng.gauss(scenario.game_minutes * 60,
+                                                        scenario.game_minutes * 12))
+                        heapq.heappush(events, (t + duration, GAME_END, court_id, games_started))
+            wall_s = time.perf_counter() - wall_start
+    finally:
+        set_clock(None)
+        engine.dispose()
+
+    capacity_seconds = sum(capacity_of.values()) * end
+    return {
+        "policy": policy,
+        "utilization": seat_seconds / capacity_seconds,
+        "idle_seat_minutes_with_queue": idle_seat_seconds / 60,
+        "games": games_started,
+        "waits": {
+            qualification: {
+                "placements": len(values),
+                "avg_minutes": statistics.fmean(values) / 60,
+                "max_minutes": max(values) / 60
+            }
+            for qualification, values in sorted(waits.items())
+        },
+        "still_waiting": len(queued_since),
+        "fill_passes": len(pass_ms),
+        "fill_ms_avg": statistics.fmean(pass_ms) if pass_ms else 0.0,
+        "fill_ms_p95": statistics.quantiles(pass_ms, n=20)[-1] if len(pass_ms) > 1 else 0.0,
+        "wall_seconds": wall_s
+    }
+
+
+def print_report(result):
+    print(f"== {result['policy']} ==")
+    print(f"  court utilization:        {result['utilization'] * 100:.1f}%")
+    print(f"  idle seats while queued:  {result['idle_seat_minutes_with_queue']:.0f} seat-min")
+    print(f"  games started:            {result['games']}")
+    for qualification, wait in result["waits"].items():
+        print(f"  wait {qualification:13} avg {wait['avg_minutes']:5.1f} min, "
+              f"max {wait['max_minutes']:5.1f} min ({wait['placements']} placements)")
+    print(f"  still waiting at close:   {result['still_waiting']}")
+    print(f"  fill latency:             avg {result['fill_ms_avg']:.2f} ms, "
+          f"p95 {result['fill_ms_p95']:.2f} ms over {result['fill_passes']} passes")
+    print(f"  simulated in:             {result['wall_seconds']:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES), default=sorted(POLICIES))
+    parser.add_argument("--players", type=int, default=Scenario.players)
+    parser.add_argument("--hours", type=float, default=Scenario.hours)
+    parser.add_argument("--game-minutes", type=float, default=Scenario.game_minutes)
+    parser.add_argument("--advanced-share", type=float, default=Scenario.advanced_share)
+    parser.add_argument("--courts", default=DEFAULT_COURTS,
+                        help="comma separated name:court_type[:capacity] list (capacity defaults to 4)")
+    parser.add_argument("--seed", type=int, default=Scenario.seed)
+    args = parser.parse_args()
+
+    scenario = Scenario(
+        players=args.players, hours=args.hours, game_minutes=args.game_minutes,
+        advanced_share=args.advanced_share, courts=args.courts, seed=args.seed
+    )
+    for policy in args.policies:
+        print_report(simulate(scenario, policy))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,20 +18,11 @@ function checkAuth() {
 }
 
 async function logout() {
-    const currentPlayer = localStorage.getItem('currentPlayer');
-    if (currentPlayer) {
-        const player = JSON.parse(currentPlayer);
-        try {
-            await fetch('/api/auth/logout', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(player.email),
-            });
-        } catch (error) {
-            console.error('Logout error:', error);
-        }
+    try {
+        // The session cookie identifies the player
+        await fetch('/api/auth/logout', { method: 'POST' });
+    } catch (error) {
+        console.error('Logout error:', error);
     }
     
     localStorage.removeItem('currentPlayer');
@@ -43,9 +34,45 @@ window.addEventListener('load', () => {
     checkAuth();
 });
 
+// Mutations sent with an Idempotency-Key and retried on network errors;
+// the server replays the first result instead of applying the change twice
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+}
+
+async function idempotentFetch(url, options = {}, retries = 2) {
+    const headers = { ...(options.headers || {}), 'Idempotency-Key': newIdempotencyKey() };
+    for (let attempt = 0; ; attempt++) {
+        try {
+            return await fetch(url, { ...options, headers });
+        } catch (error) {
+            if (attempt >= retries) {
+                throw error;
+            }
+            await new Promise(resolve => setTimeout(resolve, 500 * (attempt + 1)));
+        }
+    }
+}
+
+// Columnar player lists ({id: [...], name: [...], qualification: [...]})
+// back to one object per player
+function fromColumns(columns) {
+    return columns.id.map((id, i) => ({
+        id,
+        name: columns.name[i],
+        qualification: columns.qualification[i]
+    }));
+}
+
 // Badminton Queue Management System
 class BadmintonQueueApp {
     constructor() {
+        this.lastAutofillPassId = null;
+        this.autofillRefreshTimer = null;
+        this.eventRefreshTimer = null;
         this.init();
     }
 
@@ -57,24 +84,61 @@ class BadmintonQueueApp {
         
         await this.refreshAll();
         this.setupEventListeners();
+        this.subscribeToServerEvents();
+    }
+
+    // Refresh when any tablet or background pass changes the floor; bursts
+    // of events collapse into one refresh
+    subscribeToServerEvents() {
+        if (!window.EventSource) {
+            return;
+        }
+        const events = new EventSource('/api/queue/events');
+        events.addEventListener('state_changed', () => {
+            if (this.eventRefreshTimer) {
+                return;
+            }
+            this.eventRefreshTimer = setTimeout(() => {
+                this.eventRefreshTimer = null;
+                this.refreshAll();
+            }, 300);
+        });
     }
 
     // Single API call to get all data
     async refreshAll() {
         try {
-            const response = await fetch('/api/queue/refresh-all', {
+            const response = await fetch('/api/queue/refresh-all?format=columnar', {
                 method: 'POST'
             });
             if (response.ok) {
                 const data = await response.json();
-                console.log(data)
+                data.queues.advanced = fromColumns(data.queues.advanced);
+                data.queues.intermediate = fromColumns(data.queues.intermediate);
+                data.courts.forEach(court => {
+                    court.players = fromColumns(court.players);
+                    court.next_up = fromColumns(court.next_up);
+                });
                 this.renderQueues(data.queues);
                 this.renderCourts(data.courts);
                 
-                // Show auto-assignment notifications if any were made
-                if (data.auto_assignments && data.auto_assignments.length > 0) {
+                // Auto-fill runs in the background on the server; only notify
+                // about a pass we haven't shown yet
+                const autofill = data.autofill || {};
+                const isNewPass = this.lastAutofillPassId !== null &&
+                    autofill.last_pass_id !== this.lastAutofillPassId;
+                if (isNewPass && data.auto_assignments && data.auto_assignments.length > 0) {
                     this.showAutoAssignmentNotification(data.auto_assignments);
                 }
+                this.lastAutofillPassId = autofill.last_pass_id;
+
+                // A fill pass is queued or running - pick up its result shortly
+                if ((autofill.pending || autofill.running) && !this.autofillRefreshTimer) {
+                    this.autofillRefreshTimer = setTimeout(() => {
+                        this.autofillRefreshTimer = null;
+                        this.refreshAll();
+                    }, 1000);
+                }
             } else {
                 console.error('Failed to refresh data:', response.statusText);
             }
@@ -181,6 +245,18 @@ class BadmintonQueueApp {
             playersContainer.appendChild(playerElement);
         });
 
+        // Staged group that goes on when this game ends
+        let nextUpElement = courtElement.querySelector('.court-next-up');
+        if (!nextUpElement) {
+            nextUpElement = document.createElement('div');
+            nextUpElement.className = 'court-next-up';
+            courtElement.appendChild(nextUpElement);
+        }
+        const nextUp = courtData.next_up || [];
+        nextUpElement.textContent = nextUp.length
+            ? `Next: ${nextUp.map(player => player.name).join(', ')}`
+            : '';
+
         // Update court styling
         this.updateCourtStyling(courtElement, courtData.court.type);
     }
@@ -336,7 +412,7 @@ class BadmintonQueueApp {
     // Simplified API calls
     async movePlayerToCourt(playerId, courtId) {
         try {
-            const response = await fetch(`/api/queue/move-to-court/${playerId}/${courtId}`, {
+            const response = await idempotentFetch(`/api/queue/move-to-court/${playerId}/${courtId}`, {
                 method: 'POST'
             });
             
@@ -360,7 +436,7 @@ class BadmintonQueueApp {
                 ? `/api/queue/move-to-queue/${playerId}?qualification=${targetQualification}`
                 : `/api/queue/move-to-queue/${playerId}`;
                 
-            const response = await fetch(url, {
+            const response = await idempotentFetch(url, {
                 method: 'POST'
             });
             
@@ -445,7 +521,7 @@ async function deletePlayer() {
 
 async function autoFillCourts() {
     try {
-        const response = await fetch('/api/queue/auto-fill-courts', {
+        const response = await idempotentFetch('/api/queue/auto-fill-courts', {
             method: 'POST'
         });
         
@@ -587,7 +663,7 @@ function displayPlayersInModal(players) {
                 <span class="player-qualification ${player.qualification}">${player.qualification === 'advanced' ? 'A' : 'I'}</span>
             </div>
             <div class="player-actions">
-                <button onclick="togglePlayerStatus(${player.id}, ${!player.is_active})" 
+                <button onclick="togglePlayerStatus(${player.id}, ${!player.is_active}, ${player.version})" 
                         class="btn btn-sm ${player.is_active ? 'btn-warning' : 'btn-success'}">
                     ${player.is_active ? 'Deactivate' : 'Activate'}
                 </button>
@@ -599,17 +675,22 @@ function displayPlayersInModal(players) {
     });
 }
 
-async function togglePlayerStatus(playerId, newStatus) {
+async function togglePlayerStatus(playerId, newStatus, version) {
     try {
         const response = await fetch(`/api/players/${playerId}`, {
             method: 'PUT',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ is_active: newStatus })
+            body: JSON.stringify({ is_active: newStatus, version })
         });
         
         if (response.ok) {
             await loadAllPlayers(); // Refresh the list
             await app.refreshAll(); // Refresh the main app
+        } else if (response.status === 409) {
+            // Someone else changed this player first - show their version
+            const error = await response.json();
+            alert(error.detail.message);
+            await loadAllPlayers();
         } else {
             const error = await response.json();
             alert(`Error: ${error.detail}`);
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the app's module-level engine off the real database
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client():
+    """The app on an empty database, without the lifespan's background services"""
+    from src.database.database import engine
+    from src.database.models import Base
+    from src.main import app
+    from src.services.fairness import fair_queue
+
+    Base.metadata.create_all(bind=engine)
+    fair_queue.invalidate()
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db(client):
+    from src.database.database import SessionLocal
+
+    with SessionLocal(info={"source": "test"}) as session:
+        yield session
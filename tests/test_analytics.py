@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+
+from src.database.database import utcnow
+from src.database.models import Court, Player
+from src.services.analytics import SKETCH_ACCURACY, QuantileSketch, analytics_recorder
+
+
+@pytest.fixture
+def now():
+    return utcnow().replace(second=30, microsecond=0) - timedelta(minutes=5)
+
+
+@pytest.fixture
+def floor(db):
+    """A doubles court half full, one intermediate player queued"""
+    court = Court(name="G1", court_type="intermediate", capacity=4)
+    db.add(court)
+    db.flush()
+    db.add_all([
+        Player(name="On 1", qualification="intermediate", is_active=True, court_id=court.id),
+        Player(name="On 2", qualification="intermediate", is_active=True, court_id=court.id),
+        Player(name="Waiting", qualification="intermediate", is_active=True),
+    ])
+    db.commit()
+    return court.id
+
+
+def test_sketch_quantiles_stay_within_the_relative_error():
+    values = [0.5 * i for i in range(1, 401)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= SKETCH_ACCURACY * exact
+
+
+def test_merged_sketches_match_one_sketch_over_all_values():
+    whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for value in range(1, 101):
+        whole.add(value)
+        (first if value % 2 else second).add(value)
+    merged = QuantileSketch.from_json(first.to_json()).merge(second)
+    assert merged.count == whole.count
+    assert merged.quantile(0.9) == whole.quantile(0.9)
+
+
+def test_queue_statistics_count_players_placed_and_wait_percentiles(client, floor, now):
+    analytics_recorder.record_waits([("intermediate", m) for m in (2, 4, 6, 8)])
+    assert analytics_recorder.flush(now)
+    analytics_recorder.record_waits([("intermediate", 10), ("advanced", 3)])
+    assert analytics_recorder.flush(now + timedelta(minutes=1))
+
+    params = {"start": (now - timedelta(minutes=1)).isoformat(), "end": (now + timedelta(minutes=2)).isoformat()}
+    queues = client.get("/api/analytics/queues", params=params).json()["queues"]
+
+    intermediate = queues["intermediate"]
+    assert intermediate["players_placed"] == 5
+    assert intermediate["avg_wait_minutes"] == 6.0
+    assert intermediate["avg_queue_length"] == 1.0
+    assert abs(intermediate["p50_wait_minutes"] - 6) <= 6 * SKETCH_ACCURACY
+    assert abs(intermediate["p99_wait_minutes"] - 8) <= 8 * SKETCH_ACCURACY
+    assert queues["advanced"]["players_placed"] == 1
+    assert queues["advanced"]["avg_queue_length"] == 0.0
+
+
+def test_long_ranges_read_the_same_totals_from_hour_buckets(client, floor, now):
+    analytics_recorder.record_waits([("intermediate", 5)])
+    assert analytics_recorder.flush(now)
+
+    params = {"start": (now - timedelta(hours=12)).isoformat(), "end": (now + timedelta(hours=1)).isoformat()}
+    assert client.get("/api/analytics/queues", params=params).json()["queues"]["intermediate"]["players_placed"] == 1
+
+
+def test_court_utilization_is_places_in_use_over_capacity(client, floor, now):
+    assert analytics_recorder.flush(now)
+    assert analytics_recorder.flush(now)  # same minute: no second sample
+
+    params = {"start": (now - timedelta(minutes=1)).isoformat(), "end": (now + timedelta(minutes=1)).isoformat()}
+    assert client.get("/api/analytics/courts", params=params).json() == [{
+        "court_id": floor, "court_name": "G1", "utilization": 0.5, "avg_players": 2.0, "samples": 1
+    }]
+
+
+def test_a_range_ending_before_it_starts_is_rejected(client):
+    response = client.get("/api/analytics/queues",
+                          params={"start": "2026-01-02T00:00:00", "end": "2026-01-01T00:00:00"})
+    assert response.status_code == 400
@@ -0,0 +1,80 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.assets import IMMUTABLE, PrecompressedStaticFiles, asset_url, build_assets, load_manifest
+
+SCRIPT = "console.log('board');\n" * 200
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "scripts.js").write_text(SCRIPT)
+    (tmp_path / "styles.css").write_text("body { margin: 0; }\n")
+    (tmp_path / "logo.txt").write_text("not an asset")
+    return tmp_path
+
+
+@pytest.fixture
+def manifest(static_dir):
+    return build_assets(static_dir)
+
+
+@pytest.fixture
+def static_client(static_dir, manifest):
+    app = FastAPI()
+    app.mount("/static", PrecompressedStaticFiles(directory=static_dir), name="static")
+    return TestClient(app)
+
+
+def test_build_writes_hashed_and_gzipped_copies(static_dir):
+    manifest = build_assets(static_dir)
+
+    assert set(manifest) == {"scripts.js", "styles.css"}
+    hashed = static_dir / manifest["scripts.js"]
+    assert hashed.name.startswith("scripts.") and hashed.name != "scripts.js"
+    assert hashed.read_text() == SCRIPT
+    assert gzip.decompress(hashed.with_name(hashed.name + ".gz").read_bytes()).decode() == SCRIPT
+    assert json.loads((static_dir / "dist" / "manifest.json").read_text()) == manifest
+    assert load_manifest(static_dir) == manifest
+
+
+def test_rebuilding_unchanged_sources_gives_identical_files(static_dir):
+    first = build_assets(static_dir)
+    gz = (static_dir / (first["scripts.js"] + ".gz")).read_bytes()
+    assert build_assets(static_dir) == first
+    assert (static_dir / (first["scripts.js"] + ".gz")).read_bytes() == gz
+
+
+def test_hashed_assets_are_served_precompressed_and_immutable(static_client, manifest):
+    response = static_client.get(f"/static/{manifest['scripts.js']}", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "javascript" in response.headers["content-type"]
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == SCRIPT
+
+
+def test_clients_refusing_compression_get_the_plain_file(static_client, manifest):
+    for accept in ("identity", "gzip;q=0"):
+        response = static_client.get(f"/static/{manifest['scripts.js']}", headers={"Accept-Encoding": accept})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.text == SCRIPT
+        assert response.headers["cache-control"] == IMMUTABLE
+
+
+def test_unhashed_files_are_not_cached_forever(static_client):
+    response = static_client.get("/static/scripts.js", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers.get("cache-control") != IMMUTABLE
+
+
+def test_asset_url_falls_back_to_the_plain_path():
+    assert asset_url("missing.js") == "/static/missing.js"
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from src.database.database import SessionLocal
+from src.database.models import Court, Player
+from src.services import autofill
+from src.services.autofill import AutoFillScheduler
+
+
+@pytest.fixture
+def scheduler():
+    return AutoFillScheduler(debounce=0.02, max_delay=0.2, venue="test")
+
+
+@pytest.fixture
+def empty_court(db):
+    """An empty doubles court and four players waiting for it"""
+    court = Court(name="G1", court_type="intermediate", capacity=4)
+    db.add(court)
+    db.add_all(Player(name=f"Player {i}", qualification="intermediate", is_active=True)
+               for i in range(1, 5))
+    db.commit()
+    return court.id
+
+
+def on_court(court_id):
+    with SessionLocal() as db:
+        return sorted(p.id for p in db.get(Court, court_id).players)
+
+
+def run_scheduler(scheduler, action, passes=1):
+    """Start the scheduler, run `action`, wait for `passes` fill passes, stop"""
+    async def scenario():
+        await scheduler.start()
+        try:
+            action()
+            deadline = time.monotonic() + 5
+            while scheduler.stats["passes"] < passes and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)  # room for any extra pass to show up
+        finally:
+            await scheduler.stop()
+
+    asyncio.run(scenario())
+
+
+def test_a_notification_runs_a_fill_pass(scheduler, empty_court):
+    run_scheduler(scheduler, lambda: scheduler.notify("player_released"))
+
+    assert on_court(empty_court) == [1, 2, 3, 4]
+    assert scheduler.pass_id == 1
+    assert len(scheduler.last_assignments) == 4
+    assert not scheduler.status()["pending"]
+
+
+def test_a_burst_of_notifications_is_debounced_into_one_pass(scheduler, empty_court):
+    def burst():
+        for _ in range(20):
+            scheduler.notify("player_activated")
+
+    run_scheduler(scheduler, burst)
+    assert scheduler.stats["passes"] == 1
+    assert scheduler.stats["event:player_activated"] == 20
+
+
+def test_a_notification_before_start_is_not_lost(scheduler, empty_court):
+    scheduler.notify("startup")
+    run_scheduler(scheduler, lambda: None)
+    assert on_court(empty_court) == [1, 2, 3, 4]
+
+
+def test_a_busy_venue_lock_retries_the_pass(scheduler, empty_court, monkeypatch):
+    answers = [False]
+    take_lock = autofill.try_runner_lock
+    monkeypatch.setattr(autofill, "try_runner_lock",
+                        lambda db, key: answers.pop() if answers else take_lock(db, key))
+
+    run_scheduler(scheduler, lambda: scheduler.notify("player_released"))
+    assert scheduler.stats["skipped_locked"] == 1
+    assert on_court(empty_court) == [1, 2, 3, 4]
+
+
+def test_refresh_all_only_reads(client, empty_court):
+    response = client.post("/api/queue/refresh-all")
+    assert response.status_code == 200
+    assert response.json()["queues"]["total_queued"] == 4
+    assert on_court(empty_court) == []
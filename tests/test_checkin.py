@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from src.database.database import SessionLocal, utcnow
+from src.database.models import Player
+from src.services import checkin
+from src.services.checkin import CheckInBuffer
+
+
+@pytest.fixture
+def buffer():
+    return CheckInBuffer(flush_interval=0.05, max_batch=50)
+
+
+@pytest.fixture
+def player_ids(db):
+    db.add_all(Player(name=f"Player {i}", qualification="intermediate", is_active=False)
+               for i in range(1, 6))
+    db.commit()
+    return [p.id for p in db.query(Player).order_by(Player.id)]
+
+
+def active_ids():
+    with SessionLocal() as db:
+        return sorted(p.id for p in db.query(Player).filter(Player.is_active == True))
+
+
+def run_buffer(buffer, action, flushes=1):
+    """Start the buffer, run `action`, wait for `flushes` flushes, stop"""
+    async def scenario():
+        await buffer.start()
+        try:
+            action()
+            deadline = time.monotonic() + 5
+            while buffer.stats["flushes"] < flushes and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+        finally:
+            await buffer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_a_login_burst_is_activated_in_one_flush(buffer, player_ids):
+    # Arrival order differs from id order
+    arrivals = list(reversed(player_ids))
+
+    def burst():
+        for player_id in arrivals:
+            buffer.check_in(player_id)
+            time.sleep(0.001)  # distinct arrival times
+
+    run_buffer(buffer, burst)
+
+    assert active_ids() == player_ids
+    assert buffer.stats["flushes"] == 1
+    assert buffer.stats["activated"] == 5
+    with SessionLocal() as db:
+        queued = [p.id for p in db.query(Player).order_by(Player.queued_at, Player.id)]
+    assert queued == arrivals
+
+
+def test_large_bursts_are_split_into_batches(player_ids):
+    buffer = CheckInBuffer(flush_interval=0.05, max_batch=2)
+    run_buffer(buffer, lambda: [buffer.check_in(player_id) for player_id in player_ids], flushes=3)
+
+    assert active_ids() == player_ids
+    assert buffer.stats["flushes"] == 3
+
+
+def test_check_ins_before_start_are_applied_inline(buffer, player_ids):
+    buffer.check_in(player_ids[0])
+    assert active_ids() == [player_ids[0]]
+    assert buffer.status() == {"pending": 0, "checked_in": 1, "flushes": 1, "activated": 1}
+
+
+def test_a_player_who_logs_out_before_the_flush_stays_inactive(buffer, player_ids):
+    def login_then_logout():
+        buffer.check_in(player_ids[0])
+        buffer.check_in(player_ids[1])
+        buffer.cancel(player_ids[0])
+
+    run_buffer(buffer, login_then_logout)
+    assert active_ids() == [player_ids[1]]
+
+
+def test_a_failed_flush_keeps_its_batch_in_arrival_order(buffer, player_ids, monkeypatch):
+    def broken_session(**kwargs):
+        session = SessionLocal(**kwargs)
+        def commit():
+            raise RuntimeError("database is locked")
+        session.commit = commit
+        return session
+
+    buffer._pending.update((player_id, utcnow()) for player_id in player_ids[:3])
+    monkeypatch.setattr(checkin, "SessionLocal", broken_session)
+    assert buffer._flush() is None
+    assert list(buffer._pending) == player_ids[:3]
+    assert active_ids() == []
+
+    monkeypatch.undo()
+    assert buffer._flush() == 3
+    assert active_ids() == player_ids[:3]
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+
+from src.database.database import SessionLocal
+from src.database.models import Player
+from src.services.coalescing import SingleFlight, read_coalescer
+
+
+def player_name(db):
+    return db.get(Player, 1).name
+
+
+def test_concurrent_identical_reads_share_one_computation(db):
+    db.add(Player(name="Alex", qualification="advanced", is_active=True))
+    db.commit()
+    coalescer = SingleFlight()
+
+    async def scenario():
+        return await asyncio.gather(*(coalescer.run("name", player_name) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [b'"Alex"'] * 5
+    assert coalescer.stats["computed:name"] == 1
+    assert coalescer.stats["coalesced:name"] == 4
+
+
+def test_a_read_after_a_local_commit_does_not_join_an_older_flight(db):
+    db.add(Player(name="Alex", qualification="advanced", is_active=True))
+    db.commit()
+    # The shared coalescer: its generation follows every commit on SessionLocal
+    coalescer = read_coalescer
+    computed = coalescer.stats["computed:name"]
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_read(session):
+        name = player_name(session)
+        started.set()
+        finish.wait(5)
+        return name
+
+    async def scenario():
+        first = asyncio.ensure_future(coalescer.run("name", slow_read))
+        await asyncio.to_thread(started.wait, 5)
+        # The client's own write lands while the first read is still running
+        with SessionLocal() as writer:
+            writer.get(Player, 1).name = "Sam"
+            writer.commit()
+        second = asyncio.ensure_future(coalescer.run("name", player_name))
+        finish.set()
+        return await first, await second
+
+    assert asyncio.run(scenario()) == (b'"Alex"', b'"Sam"')
+    assert coalescer.stats["computed:name"] == computed + 2
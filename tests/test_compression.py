@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response
+from fastapi.testclient import TestClient
+
+from src.compression import SelectiveGZipMiddleware
+
+BODY = "x" * 4096
+SCRIPT = b"console.log('board');" * 100
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024)
+
+    @app.get("/api/queue/queues")
+    def queues():
+        return PlainTextResponse(BODY)
+
+    @app.get("/api/queue/events")
+    def events():
+        return PlainTextResponse(BODY, media_type="text/event-stream")
+
+    @app.get("/static/dist/scripts.js")
+    def precompressed():
+        # Stands in for a .gz variant served by PrecompressedStaticFiles
+        return Response(gzip.compress(SCRIPT), media_type="application/javascript",
+                        headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def test_api_responses_are_compressed(client):
+    response = client.get("/api/queue/queues", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+
+def test_event_stream_is_not_compressed(client):
+    response = client.get("/api/queue/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY
+
+
+def test_static_files_are_not_compressed_twice(client):
+    response = client.get("/static/dist/scripts.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    # Decoded once by the client, so compressed exactly once
+    assert response.content == SCRIPT
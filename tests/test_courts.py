@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database.database import SessionLocal
+from src.database.models import Court, Player
+from src.services.autofill import autofill_scheduler
+
+START = datetime(2026, 1, 1, 18, 0)
+
+
+@pytest.fixture
+def full_court(db):
+    """A doubles court with a game on; player 1 queued first, player 4 last"""
+    court = Court(name="G1", court_type="intermediate", capacity=4)
+    db.add(court)
+    db.flush()
+    db.add_all(
+        Player(name=f"Player {i}", qualification="intermediate", is_active=True,
+               court_id=court.id, queued_at=START + timedelta(minutes=i))
+        for i in range(1, 5)
+    )
+    db.commit()
+    assert court.game_started_at is not None
+    return court.id
+
+
+def court_state(court_id):
+    with SessionLocal() as db:
+        court = db.get(Court, court_id)
+        return court.capacity, sorted(p.id for p in court.players), court.game_started_at
+
+
+def test_lowering_capacity_sends_the_extra_players_back_to_the_queue(client, full_court):
+    _, _, started_at = court_state(full_court)
+    released = autofill_scheduler.stats["event:player_released"]
+
+    response = client.put(f"/api/courts/{full_court}", json={"court_type": "intermediate", "capacity": 2})
+    assert response.status_code == 200
+    assert sorted(p["id"] for p in response.json()["moved_players"]) == [3, 4]
+
+    # Still full at the new capacity, so the game and its clock carry on
+    assert court_state(full_court) == (2, [1, 2], started_at)
+    assert autofill_scheduler.stats["event:player_released"] == released + 1
+
+    queue = client.get("/api/queue/queues").json()
+    assert {3, 4} <= {p["id"] for p in queue["intermediate"]}
+
+
+def test_raising_capacity_stops_the_game_clock(client, full_court):
+    response = client.put(f"/api/courts/{full_court}", json={"court_type": "intermediate", "capacity": 6})
+    assert response.status_code == 200
+    assert response.json()["moved_players"] == []
+    assert court_state(full_court) == (6, [1, 2, 3, 4], None)
+
+
+def test_court_at_its_lowered_capacity_rejects_manual_moves(client, full_court):
+    assert client.put(f"/api/courts/{full_court}", json={"court_type": "intermediate", "capacity": 2}).status_code == 200
+    response = client.post(f"/api/queue/move-to-court/4/{full_court}")
+    assert response.status_code == 400
+    assert court_state(full_court)[1] == [1, 2]
+
+
+def test_switching_to_training_from_a_stale_view_moves_nobody(client, full_court):
+    response = client.put(f"/api/courts/{full_court}", json={"court_type": "training", "version": 0})
+    assert response.status_code == 409
+    assert court_state(full_court)[1] == [1, 2, 3, 4]
+
+
+def test_switching_to_training_that_loses_a_version_race_moves_nobody(client, full_court, monkeypatch):
+    from src.api import courts
+
+    def edit_in_between(db_court, expected, schema):
+        check_version(db_court, expected, schema)
+        with SessionLocal() as other:
+            other.get(Court, full_court).name = "G1 (renamed)"
+            other.commit()
+
+    check_version = courts.check_version
+    monkeypatch.setattr(courts, "check_version", edit_in_between)
+
+    response = client.put(f"/api/courts/{full_court}", json={"court_type": "training"})
+    assert response.status_code == 409
+    with SessionLocal() as db:
+        assert response.json()["detail"]["current"]["version"] == db.get(Court, full_court).version
+    assert court_state(full_court)[1] == [1, 2, 3, 4]
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import update
+
+from src.database.database import SessionLocal
+from src.database.models import Court, Player
+from src.services.events import WORKER_ID, EventBus, event_bus, mark_changed
+
+
+@pytest.fixture
+def court_id(db):
+    court = Court(name="G1", court_type="intermediate", capacity=4)
+    db.add(court)
+    db.commit()
+    return court.id
+
+
+@pytest.fixture
+def received(court_id):
+    events = []
+    handler = event_bus.subscribe(events.append)
+    yield events
+    event_bus._handlers.remove(handler)
+
+
+def state_changes(events):
+    return [(e["players"], e["courts"]) for e in events if e["kind"] == "state_changed"]
+
+
+def test_a_commit_publishes_the_players_and_courts_it_changed(received, court_id):
+    with SessionLocal() as db:
+        db.add_all(Player(name=f"Player {i}", qualification="intermediate", is_active=True,
+                          court_id=court_id) for i in range(4))
+        db.commit()
+
+    # The game clock starts in the commit's own flush and is in the same event
+    assert state_changes(received) == [([1, 2, 3, 4], [court_id])]
+    assert received[0]["origin"] == WORKER_ID
+
+
+def test_nothing_is_published_before_the_commit_or_after_a_rollback(received, court_id):
+    with SessionLocal() as db:
+        db.add(Player(name="Alex", qualification="advanced", is_active=True))
+        db.flush()
+        assert received == []
+        db.rollback()
+    assert received == []
+
+
+def test_core_updates_are_published_through_mark_changed(received, court_id):
+    with SessionLocal() as db:
+        db.execute(update(Court).where(Court.id == court_id).values(fill_priority=3))
+        mark_changed(db, courts=[court_id])
+        db.commit()
+    assert state_changes(received) == [([], [court_id])]
+
+
+def test_on_postgres_the_event_is_a_notify_inside_the_commit(client, court_id, monkeypatch):
+    notified = []
+
+    def record(self, connection, payload):
+        notified.append((connection, payload))
+
+    monkeypatch.setattr(EventBus, "uses_postgres", property(lambda self: True))
+    monkeypatch.setattr(EventBus, "_notify", record)
+
+    with SessionLocal() as db:
+        db.get(Court, court_id).name = "G1a"
+        transaction = db.connection()
+        db.commit()
+    # Sent on the session's own transaction, not a second pooled connection
+    assert [(c, p["courts"]) for c, p in notified] == [(transaction, [court_id])]
+
+
+def test_an_explicit_session_event_waits_for_the_commit(received, court_id):
+    with SessionLocal() as db:
+        event_bus.publish("session_revoked", session=db, session_id="abc")
+        assert received == []
+        db.commit()
+    assert [e["session_id"] for e in received if e["kind"] == "session_revoked"] == ["abc"]
@@ -0,0 +1,130 @@
+import random
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from src.services.fairness import FairQueue, IndexedHeap, RankIndex
+
+START = datetime(2026, 1, 1, 18, 0)
+
+
+def make_queue():
+    return FairQueue(wait_weight=1, games_weight=10, sit_out_weight=5, resync_interval=30)
+
+
+def test_indexed_heap_push_updates_and_remove_skips():
+    heap = IndexedHeap()
+    for key, priority in (("a", 3), ("b", 1), ("c", 2), ("d", 4)):
+        heap.push(key, priority)
+    heap.push("d", 0)
+    heap.remove("b")
+    heap.remove("missing")
+
+    assert len(heap) == 3 and "b" not in heap
+    assert heap.priority_of("d") == 0 and heap.priority_of("b") is None
+    assert heap.ordered() == ["d", "c", "a"]
+    assert heap.peek(2) == ["d", "c"]
+    assert heap.peek(2, exclude={"d"}) == ["c", "a"]
+    assert heap.peek(0) == []
+
+
+def test_indexed_heap_peek_matches_a_full_sort_after_churn():
+    heap = IndexedHeap()
+    priorities = {}
+    for step in range(500):
+        key = step % 37
+        priorities[key] = (step * 7919) % 101
+        heap.push(key, priorities[key])
+        if step % 5 == 0:
+            heap.remove((step * 3) % 37)
+            priorities.pop((step * 3) % 37, None)
+
+    expected = sorted(priorities, key=lambda k: (priorities[k], k))
+    assert heap.ordered() == expected
+    assert heap.peek(10) == expected[:10]
+
+
+def test_longest_waiting_player_is_served_first():
+    queue = make_queue()
+    queue.update(1, "advanced", True, None, START + timedelta(minutes=10), 0, 0)
+    queue.update(2, "advanced", True, None, START, 0, 0)
+    queue.update(3, "advanced", True, None, START + timedelta(minutes=5), 0, 0)
+    queue.update(4, "intermediate", True, None, START - timedelta(minutes=30), 0, 0)
+
+    assert queue.ordered("advanced") == [2, 3, 1]
+    assert queue.candidates("advanced", 2) == [2, 3]
+    assert queue.candidates("advanced", 2, exclude={2}) == [3, 1]
+
+
+def test_games_played_and_sit_outs_weigh_against_waiting():
+    queue = make_queue()
+    # Waited 15 minutes longer but played two more games (2 * 10 minutes)
+    queue.update(1, "advanced", True, None, START, 2, 0)
+    queue.update(2, "advanced", True, None, START + timedelta(minutes=15), 0, 0)
+    assert queue.ordered("advanced") == [2, 1]
+
+    # Joined after three more fill passes had run (3 * 5 minutes)
+    queue.update(3, "advanced", True, None, START + timedelta(minutes=1), 2, 3)
+    assert queue.ordered("advanced") == [2, 1, 3]
+
+
+def test_only_active_players_off_court_are_queued():
+    queue = make_queue()
+    queue.update(1, "advanced", True, None, START, 0, 0)
+    queue.update(2, "advanced", True, None, START, 0, 0)
+    queue.update(3, "advanced", False, None, START, 0, 0)
+
+    queue.update(1, "advanced", True, 7, START, 1, 0)  # went on court
+    queue.update(2, "intermediate", True, None, START, 0, 0)  # requalified
+    assert queue.ordered("advanced") == []
+    assert queue.ordered("intermediate") == [2]
+
+    queue.discard(2)
+    assert queue.ordered("intermediate") == []
+
+
+class SmallBlockRankIndex(RankIndex):
+    # Tiny blocks, so a few hundred keys exercise block splits and merges
+    BLOCK = 4
+
+
+def test_rank_index_matches_a_sorted_list_under_churn():
+    rng = random.Random(7)
+    keys = sorted(rng.sample(range(1000), 50))
+    index = SmallBlockRankIndex(keys)
+    for _ in range(2000):
+        if keys and rng.random() < 0.45:
+            key = keys.pop(rng.randrange(len(keys)))
+            index.remove(key)
+        else:
+            key = rng.randrange(1000)
+            if key not in keys:
+                index.add(key)
+                keys.insert(bisect_left(keys, key), key)
+        probe = rng.randrange(1001)
+        assert index.rank(probe) == bisect_left(keys, probe)
+        assert len(index) == len(keys)
+
+
+def test_rank_index_handles_empty_and_missing_keys():
+    index = RankIndex()
+    assert index.rank(5) == 0
+    index.remove(5)
+    index.add(5)
+    index.add(1)
+    index.remove(3)
+    assert (len(index), index.rank(5), index.rank(6)) == (2, 1, 2)
+
+
+def test_position_counts_players_ahead_in_the_same_queue():
+    queue = make_queue()
+    for player_id, minutes in ((1, 10), (2, 0), (3, 5)):
+        queue.update(player_id, "advanced", True, None, START + timedelta(minutes=minutes), 0, 0)
+    queue.update(4, "intermediate", True, None, START - timedelta(minutes=30), 0, 0)
+
+    assert queue.position(2) == ("advanced", 0, 3)
+    assert queue.position(1) == ("advanced", 2, 3)
+    assert queue.position(4) == ("intermediate", 0, 1)
+
+    queue.update(3, "advanced", True, 1, START, 1, 0)  # went on court
+    assert queue.position(3) is None
+    assert queue.position(1) == ("advanced", 1, 2)
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.database.models import Court, Player, Team
+from src.services.floor import FloorState
+
+
+@pytest.fixture
+def floor_ids(db):
+    court = Court(name="G1", court_type="advanced")
+    db.add(court)
+    db.flush()
+    team = Team(number="1")
+    db.add(team)
+    db.flush()
+    db.add_all([
+        Player(name="Alex", qualification="advanced", is_active=True, team_id=team.id),
+        Player(name="Sam", qualification="advanced", is_active=True, team_id=team.id),
+        Player(name="Kim", qualification="intermediate", is_active=True),
+        Player(name="Lee", qualification="advanced", is_active=True, court_id=court.id),
+        Player(name="Away", qualification="advanced", is_active=False),
+    ])
+    db.commit()
+    return court.id, {p.name: p.id for p in db.query(Player)}
+
+
+def test_load_keeps_the_active_and_on_court_players(db, floor_ids):
+    court_id, ids = floor_ids
+    floor = FloorState.load(db)
+
+    assert set(floor.players) == {ids["Alex"], ids["Sam"], ids["Kim"], ids["Lee"]}
+    assert [p.id for p in floor.on_court[court_id]] == [ids["Lee"]]
+    assert [p.id for p in floor.queued("advanced")] == [ids["Alex"], ids["Sam"]]
+    assert floor.courts[court_id].name == "G1"
+    assert floor.partner(floor.players[ids["Alex"]]).id == ids["Sam"]
+    assert floor.partner(floor.players[ids["Kim"]]) is None
+
+
+def test_moves_stay_in_memory_until_applied(db, floor_ids):
+    court_id, ids = floor_ids
+    floor = FloorState.load(db)
+    floor.move(floor.players[ids["Alex"]], court_id)
+    floor.move(floor.players[ids["Lee"]], None)
+
+    assert floor.diff() == {ids["Alex"]: court_id, ids["Lee"]: None}
+    assert not floor.is_queued(ids["Alex"], "advanced")
+    assert db.get(Player, ids["Alex"]).court_id is None
+
+    written = floor.apply(db)
+    db.commit()
+    assert sorted(p.id for p in written) == [ids["Alex"], ids["Lee"]]
+    assert db.get(Player, ids["Alex"]).court_id == court_id
+    assert db.get(Player, ids["Lee"]).court_id is None
+    assert floor.diff() == {}
+
+
+def test_apply_refuses_to_overwrite_a_player_changed_meanwhile(db, floor_ids):
+    court_id, ids = floor_ids
+    floor = FloorState.load(db)
+    floor.move(floor.players[ids["Alex"]], court_id)
+
+    db.get(Player, ids["Alex"]).name = "Alex B"
+    db.commit()
+
+    with pytest.raises(StaleDataError):
+        floor.apply(db)
+    db.rollback()
+    assert db.get(Player, ids["Alex"]).court_id is None
+
+
+def test_apply_refuses_when_a_moved_player_was_deleted(db, floor_ids):
+    court_id, ids = floor_ids
+    floor = FloorState.load(db)
+    floor.move(floor.players[ids["Kim"]], court_id)
+
+    db.delete(db.get(Player, ids["Kim"]))
+    db.commit()
+
+    with pytest.raises(StaleDataError):
+        floor.apply(db)
@@ -0,0 +1,58 @@
+from src.database.models import Court, Player
+
+NEW_PLAYER = {"name": "Alex", "email": "alex@example.com", "qualification": "advanced", "is_active": False}
+
+
+def test_retried_request_replays_the_stored_response(client, db):
+    headers = {"Idempotency-Key": "create-alex"}
+    first = client.post("/api/players/", json=NEW_PLAYER, headers=headers)
+    retry = client.post("/api/players/", json=NEW_PLAYER, headers=headers)
+
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert db.query(Player).count() == 1
+
+
+def test_key_reused_for_a_different_request_is_rejected(client, db):
+    headers = {"Idempotency-Key": "create-once"}
+    assert client.post("/api/players/", json=NEW_PLAYER, headers=headers).status_code == 200
+
+    other = client.post("/api/players/", json={**NEW_PLAYER, "name": "Sam"}, headers=headers)
+    assert other.status_code == 422
+    assert db.query(Player).count() == 1
+
+
+def test_requests_without_a_key_are_not_replayed(client):
+    assert client.post("/api/players/", json=NEW_PLAYER).status_code == 200
+    duplicate = client.post("/api/players/", json=NEW_PLAYER)
+    assert duplicate.status_code == 400
+    assert "idempotent-replayed" not in duplicate.headers
+
+
+def test_overlong_keys_are_rejected(client):
+    response = client.post("/api/players/", json=NEW_PLAYER, headers={"Idempotency-Key": "k" * 256})
+    assert response.status_code == 400
+
+
+def test_a_retried_4xx_replays_the_error_instead_of_rerunning(client, db):
+    court = Court(name="G1", court_type="intermediate", capacity=2)
+    db.add(court)
+    db.flush()
+    db.add_all(Player(name=f"Player {i}", qualification="intermediate", is_active=True,
+                      court_id=court.id if i < 3 else None) for i in range(1, 4))
+    db.commit()
+    headers = {"Idempotency-Key": "move-3"}
+
+    first = client.post(f"/api/queue/move-to-court/3/{court.id}", headers=headers)
+    assert first.status_code == 400
+    assert client.post("/api/queue/move-to-queue/1").status_code == 200
+
+    # The court has room now, but the retry gets the original answer
+    retry = client.post(f"/api/queue/move-to-court/3/{court.id}", headers=headers)
+    assert retry.status_code == 400
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert db.get(Player, 3).court_id is None
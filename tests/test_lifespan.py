@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_lifespan_loads_no_background_service():
+    loaded = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, src.lifespan; print(*sorted(m for m in sys.modules if m.startswith('src.services')))"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert loaded == []
+
+
+def test_lifespan_starts_and_stops_the_background_services(client):
+    from src.main import app
+    from src.services.staging import next_up
+
+    with TestClient(app) as running:
+        assert running.get("/api/health").status_code == 200
+        assert next_up.status()["enabled"]
+    assert not next_up.status()["enabled"]
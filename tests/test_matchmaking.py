@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src import config
+from src.database.database import SessionLocal
+from src.database.models import Court, Player
+from src.services.matchmaking import build_match, lineups
+
+START = datetime(2026, 1, 1, 18, 0)
+
+
+def candidates(*ratings):
+    return [SimpleNamespace(id=i, rating=rating) for i, rating in enumerate(ratings, start=1)]
+
+
+def no_pairs(player):
+    return None
+
+
+def ids(side):
+    return sorted(p.id for p in side)
+
+
+def test_lineups_always_include_the_longest_waiting_player():
+    doubles = lineups(5, 4)
+    assert len(doubles) == 12
+    assert all(0 in side_a and len(side_a) == len(side_b) == 2 for side_a, side_b in doubles)
+    # The fairest lineups (not reaching the fifth player) come first
+    assert all(4 not in side_a + side_b for side_a, side_b in doubles[:3])
+    assert lineups(2, 2) == (((0,), (1,)),)
+
+
+def test_the_most_balanced_game_is_chosen_from_the_window():
+    side_a, side_b = build_match(candidates(2000, 1900, 1000, 1500, 1400), no_pairs)
+    assert ids(side_a) == [1, 5]
+    assert ids(side_b) == [2, 4]
+
+
+def test_equally_balanced_games_prefer_players_waiting_longer():
+    side_a, side_b = build_match(candidates(1500, 1500, 1500, 1500, 1500), no_pairs)
+    assert ids(side_a + side_b) == [1, 2, 3, 4]
+
+
+def test_a_pair_plays_on_one_side():
+    players = candidates(2000, 2000, 1000, 1000)
+    pairs = {1: players[1], 2: players[0]}
+    side_a, side_b = build_match(players, lambda p: pairs.get(p.id))
+    assert ids(side_a) == [1, 2]
+    assert ids(side_b) == [3, 4]
+
+
+def test_too_few_candidates_build_no_match():
+    assert build_match(candidates(1500, 1500, 1500), no_pairs) is None
+
+
+@pytest.fixture
+def queued(db):
+    """An empty doubles court; five players queued in id order with uneven ratings"""
+    db.add(Court(name="G1", court_type="intermediate", capacity=4))
+    db.add_all(
+        Player(name=f"Player {i}", qualification="intermediate", is_active=True,
+               queued_at=START + timedelta(minutes=i), rating=rating)
+        for i, rating in enumerate((2000, 1900, 1000, 1500, 1400), start=1)
+    )
+    db.commit()
+
+
+def on_court(court_id):
+    with SessionLocal() as db:
+        return sorted(p.id for p in db.query(Player).filter(Player.court_id == court_id))
+
+
+def test_the_fill_pass_puts_a_balanced_game_on_an_empty_court(client, queued):
+    response = client.post("/api/queue/auto-fill-courts")
+
+    assert on_court(1) == [1, 2, 4, 5]
+    sides = {a["player"]["id"]: a["side"] for a in response.json()["assignments"]}
+    assert sides[1] == sides[5] != sides[2] == sides[4]
+
+
+def test_without_balancing_the_next_four_play(client, queued, monkeypatch):
+    monkeypatch.setattr(config, "MATCH_BALANCE_ENABLED", False)
+    response = client.post("/api/queue/auto-fill-courts")
+
+    assert on_court(1) == [1, 2, 3, 4]
+    assert all("side" not in a for a in response.json()["assignments"])
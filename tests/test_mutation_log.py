@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from src.database.database import SessionLocal
+from src.database.models import Court, Player
+from src.replay import DatabaseState, MemoryState, replay
+from src.services.mutation_log import mutation_log
+from src.services.ratings import RatingUpdater
+
+
+@pytest.fixture
+def log_path(client, tmp_path, monkeypatch):
+    path = tmp_path / "mutations.log"
+    monkeypatch.setattr(mutation_log, "path", str(path))
+    mutation_log.open()
+    yield path
+    mutation_log.close()
+
+
+def replay_both(path):
+    """Replay stats into plain memory and into a fresh in-memory database"""
+    return [replay(str(path), state) for state in (MemoryState(), DatabaseState("sqlite://"))]
+
+
+def test_a_recorded_session_replays_to_the_same_state(client, db, log_path):
+    court = Court(name="G1", court_type="intermediate", capacity=4)
+    db.add(court)
+    db.commit()
+    for i in range(1, 6):
+        assert client.post("/api/players/", json={"name": f"Player {i}"}).status_code == 200
+    for player_id in range(1, 5):
+        assert client.post(f"/api/queue/move-to-court/{player_id}/{court.id}").status_code == 200
+    assert client.post(f"/api/courts/{court.id}/result",
+                       json={"winner": "B", "side_a": [1, 2], "side_b": [3, 4]}).status_code == 200
+    RatingUpdater(k_factor=32, batch_size=500, debounce=0, venue="test").process_batch()
+    assert client.put(f"/api/courts/{court.id}", json={"court_type": "training"}).status_code == 200
+    assert client.delete("/api/players/5").status_code == 200
+    mutation_log.close()
+
+    for stats in replay_both(log_path):
+        assert stats["checkpoints"] == 1
+        assert stats["mismatches"] == []
+        assert stats["entries"] >= 10
+
+
+def test_concurrent_commits_are_logged_in_commit_order(client, db, log_path, monkeypatch):
+    db.add(Player(name="Alex", qualification="advanced", is_active=True))
+    db.commit()
+
+    # Hold the first commit's log write until the second one has committed
+    first_logging, second_done = threading.Event(), threading.Event()
+    append = mutation_log.append
+
+    def slow_append(source, ops):
+        if source == "first":
+            first_logging.set()
+            second_done.wait(1)
+        append(source, ops)
+
+    monkeypatch.setattr(mutation_log, "append", slow_append)
+
+    def rename(source, name):
+        with SessionLocal(info={"source": source}) as session:
+            session.get(Player, 1).name = name
+            session.commit()
+
+    first = threading.Thread(target=rename, args=("first", "Sam"))
+    first.start()
+    first_logging.wait(1)
+    second = threading.Thread(target=lambda: (rename("second", "Kim"), second_done.set()))
+    second.start()
+    first.join()
+    second.join()
+    mutation_log.close()
+
+    with SessionLocal() as check:
+        assert check.get(Player, 1).name == "Kim"
+    for stats in replay_both(log_path):
+        assert list(stats["sources"]) == ["test", "first", "second"]
+        assert stats["mismatches"] == []
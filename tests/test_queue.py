@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database.models import Court, Player
+
+START = datetime(2026, 1, 1, 18, 0)
+
+
+@pytest.fixture
+def floor(db):
+    """Court 1 with player 1 on it; players 2-4 queued in that order; 5 inactive"""
+    court = Court(name="G1", court_type="advanced")
+    db.add(court)
+    db.flush()
+    db.add(Player(name="On court", qualification="advanced", is_active=True, court_id=court.id))
+    db.add_all(
+        Player(name=f"Queued {i}", qualification="advanced", is_active=True,
+               queued_at=START + timedelta(minutes=i))
+        for i in range(3)
+    )
+    db.add(Player(name="Home", qualification="advanced", is_active=False))
+    db.commit()
+
+
+def test_position_of_queued_players(client, floor):
+    third = client.get("/api/queue/position/4").json()
+    assert (third["status"], third["position"], third["players_ahead"], third["queue_length"]) == ("queued", 3, 2, 3)
+    assert client.get("/api/queue/position/2").json()["position"] == 1
+
+
+def test_position_of_players_on_court_and_at_home(client, floor):
+    on_court = client.get("/api/queue/position/1").json()
+    assert (on_court["status"], on_court["court_name"], on_court["position"]) == ("on_court", "G1", None)
+    assert client.get("/api/queue/position/5").json()["status"] == "inactive"
+    assert client.get("/api/queue/position/99").status_code == 404
+
+
+def test_position_follows_queue_moves(client, floor):
+    assert client.post("/api/queue/move-to-court/2/1").status_code == 200
+    moved = client.get("/api/queue/position/4").json()
+    assert (moved["position"], moved["queue_length"]) == (2, 2)
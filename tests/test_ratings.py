@@ -0,0 +1,79 @@
+import pytest
+
+from src.database.database import SessionLocal, engine
+from src.database.models import Court, Player
+from src.services import ratings
+from src.services.ratings import RatingUpdater, apply_elo
+
+
+@pytest.fixture
+def updater():
+    return RatingUpdater(k_factor=32, batch_size=500, debounce=0, venue="test")
+
+
+@pytest.fixture
+def finished_game(client, db):
+    """Players 1-4 played on court 1; side A won"""
+    court = Court(name="G1", court_type="advanced")
+    db.add(court)
+    db.flush()
+    db.add_all(
+        Player(name=f"Player {i}", qualification="advanced", is_active=True, court_id=court.id)
+        for i in range(1, 5)
+    )
+    db.commit()
+    response = client.post(f"/api/courts/{court.id}/result",
+                           json={"winner": "A", "side_a": [1, 2], "side_b": [3, 4]})
+    assert response.status_code == 200
+
+
+def player_state(player_id):
+    with SessionLocal() as db:
+        player = db.get(Player, player_id)
+        return player.rating, player.version
+
+
+def test_apply_elo_moves_equal_points_between_sides():
+    ratings_ = {1: 1500.0, 2: 1500.0, 3: 1500.0, 4: 1500.0}
+    apply_elo(ratings_, {"A": [1, 2], "B": [3, 4]}, "A", k=32)
+    assert ratings_ == {1: 1516.0, 2: 1516.0, 3: 1484.0, 4: 1484.0}
+
+
+def test_batch_bumps_versions_so_stale_edits_get_a_409(client, finished_game, updater):
+    _, version = player_state(1)
+    assert updater.process_batch() == 1
+    assert player_state(1) == (1516.0, version + 1)
+    assert updater.process_batch() == 0
+
+    response = client.put("/api/players/1", json={"rating": 1400, "version": version})
+    assert response.status_code == 409
+    assert player_state(1) == (1516.0, version + 1)
+
+
+# Drivers that cannot count executemany matches get one UPDATE per player
+@pytest.mark.parametrize("multi_rowcount", [True, False])
+def test_batch_reruns_when_a_player_is_edited_under_it(client, finished_game, updater, monkeypatch,
+                                                       multi_rowcount):
+    monkeypatch.setattr(engine.dialect, "supports_sane_multi_rowcount", multi_rowcount)
+    # As on PostgreSQL, where the runner lock does not block request writes
+    monkeypatch.setattr(ratings, "try_runner_lock", lambda db, key: True)
+    original_apply_elo = ratings.apply_elo
+    edits = []
+
+    def apply_elo_with_an_edit(*args, **kwargs):
+        if not edits:
+            edits.append(client.put("/api/players/1", json={"rating": 1600}).status_code)
+        return original_apply_elo(*args, **kwargs)
+
+    monkeypatch.setattr(ratings, "apply_elo", apply_elo_with_an_edit)
+    assert updater.process_batch() is None
+    assert edits == [200]
+    assert updater.stats["version_conflicts"] == 1
+    assert player_state(1)[0] == 1600.0
+    assert player_state(3)[0] == 1500.0
+
+    # The rerun applies the game on top of the operator's edit
+    assert updater.process_batch() == 1
+    assert player_state(1)[0] > 1600.0
+    assert player_state(3)[0] < 1500.0
+
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.database import SessionLocal, replica_router
+from src.database.models import Base, Player
+from src.database.replica import STICKY_COOKIE, ReplicaRouter
+
+NEW_PLAYER = {"name": "Alex", "email": "alex@example.com", "qualification": "advanced", "is_active": False}
+
+
+def router(**overrides):
+    options = dict(max_lag=5.0, sticky_seconds=10.0, check_interval=60.0)
+    return ReplicaRouter("primary", "replica", **{**options, **overrides})
+
+
+def test_a_cookie_is_sticky_until_its_deadline():
+    replicas = router()
+    assert replicas.is_sticky(f"{time.time() + 5:.3f}")
+    assert not replicas.is_sticky(f"{time.time() - 5:.3f}")
+    assert not replicas.is_sticky(None)
+    assert not replicas.is_sticky("garbage")
+
+
+def test_reads_go_to_the_replica_unless_the_client_just_wrote(monkeypatch):
+    replicas = router()
+    monkeypatch.setattr(replicas, "_check", lambda: None)
+
+    assert replicas.session_factory() == "replica"
+    assert replicas.session_factory(f"{replicas.sticky_until():.3f}") == "primary"
+    assert replicas.stats == {"replica": 1, "primary_sticky": 1}
+
+
+def test_a_lagging_or_unreachable_replica_falls_back_to_the_primary(monkeypatch):
+    replicas = router(check_interval=0)
+
+    monkeypatch.setattr(replicas, "_check", lambda: setattr(replicas, "_lag", 30.0))
+    assert replicas.session_factory() == "primary"
+
+    monkeypatch.setattr(replicas, "_check", lambda: setattr(replicas, "_lag", 1.0))
+    assert replicas.session_factory() == "replica"
+
+    def unreachable():
+        replicas._healthy = False
+    monkeypatch.setattr(replicas, "_check", unreachable)
+    assert replicas.session_factory() == "primary"
+    assert replicas.stats["primary_fallback"] == 2
+
+
+def test_without_a_replica_everything_reads_from_the_primary():
+    replicas = ReplicaRouter("primary", None, max_lag=5.0, sticky_seconds=10.0, check_interval=60.0)
+    assert replicas.session_factory() == "primary"
+    assert replicas.status() == {"enabled": False}
+
+
+@pytest.fixture
+def replica(client, tmp_path, monkeypatch):
+    """A second database standing in for a replica that has not caught up"""
+    replica_engine = create_engine(f"sqlite:///{tmp_path}/replica.db",
+                                   connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=replica_engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    with factory() as db:
+        db.add(Player(name="Stale copy", qualification="advanced", is_active=False))
+        db.commit()
+    monkeypatch.setattr(replica_router, "replica_factory", factory)
+    monkeypatch.setattr(replica_router, "_checked_at", None)
+    monkeypatch.setattr(replica_router, "_lag", None)
+    monkeypatch.setattr(replica_router, "_healthy", True)
+    yield factory
+    replica_engine.dispose()
+
+
+def test_a_client_reads_its_own_write_from_the_primary(client, replica):
+    created = client.post("/api/players/", json=NEW_PLAYER)
+    assert created.status_code == 200
+    assert STICKY_COOKIE in created.cookies
+
+    assert client.get(f"/api/players/{created.json()['id']}").json()["name"] == "Alex"
+
+    # Another client (no cookie) reads the replica
+    client.cookies.clear()
+    assert client.get(f"/api/players/{created.json()['id']}").json()["name"] == "Stale copy"
+
+
+def test_reads_do_not_set_the_sticky_cookie(client, replica):
+    with SessionLocal() as db:
+        db.add(Player(name="Sam", qualification="advanced", is_active=False))
+        db.commit()
+    response = client.get("/api/players/1")
+    assert response.json()["name"] == "Stale copy"
+    assert STICKY_COOKIE not in response.cookies
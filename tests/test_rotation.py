@@ -0,0 +1,28 @@
+import asyncio
+
+from src.services.rotation import GameRotationScheduler
+
+
+def test_remote_changes_reload_courts_only_while_running(monkeypatch):
+    scheduler = GameRotationScheduler(tick=60, resync_interval=3600, venue="test")
+    calls = []
+    monkeypatch.setattr(scheduler, "resync", lambda: calls.append("resync"))
+    monkeypatch.setattr(scheduler, "reload_courts", lambda court_ids: calls.append(list(court_ids)))
+
+    scheduler.changed([1])
+    assert calls == []
+
+    async def run():
+        await scheduler.start()
+        scheduler.changed([1, 2])
+        scheduler.changed([])
+        scheduler.changed(None)
+        await scheduler.stop()
+
+    asyncio.run(run())
+    assert [call for call in calls if call != "resync"] == [[1, 2]]
+    assert "resync" in calls
+
+    calls.clear()
+    scheduler.changed(None)
+    assert calls == []
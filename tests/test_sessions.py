@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+
+from src.database.models import AuthSession, Player
+from src.services.sessions import SessionStore, session_store
+
+
+@pytest.fixture
+def player_id(db):
+    player = Player(name="Alex", email="alex@example.com", qualification="advanced", is_active=False)
+    db.add(player)
+    db.commit()
+    return player.id
+
+
+def store(ttl=timedelta(hours=1)):
+    return SessionStore(secret="test-secret", ttl=ttl, cache_seconds=60.0, max_entries=100)
+
+
+def test_an_issued_token_is_valid_without_a_database_lookup(db, player_id):
+    sessions = store()
+    token, _ = sessions.issue(db, player_id)
+    db.commit()
+
+    session_id, owner = sessions.validate(token)
+    assert owner == player_id
+    assert db.get(AuthSession, session_id).player_id == player_id
+    assert sessions.stats["cache_hits"] == 1
+    assert sessions.stats["cache_misses"] == 0
+
+
+def test_another_worker_validates_from_the_sessions_table(db, player_id):
+    token, _ = store().issue(db, player_id)
+    db.commit()
+
+    other = store()
+    assert other.validate(token)[1] == player_id
+    assert other.stats["cache_misses"] == 1
+    assert other.validate(token)[1] == player_id
+    assert other.stats["cache_hits"] == 1
+
+
+def test_forged_and_expired_tokens_are_rejected(db, player_id):
+    sessions = store()
+    token, _ = sessions.issue(db, player_id)
+    db.commit()
+    session_id, expires, signature = token.split(".")
+
+    assert sessions.validate(f"{session_id}.{int(expires) + 3600}.{signature}") is None
+    assert SessionStore("other-secret", timedelta(hours=1), 60.0, 100).validate(token) is None
+    assert sessions.validate("not-a-token") is None
+    assert sessions.stats["bad_signature"] == 1
+
+    expired, _ = store(ttl=timedelta(seconds=-1)).issue(db, player_id)
+    db.commit()
+    assert sessions.validate(expired) is None
+    assert sessions.stats["expired"] == 1
+
+
+def test_a_revoked_session_is_rejected_everywhere(db, player_id):
+    token, _ = session_store.issue(db, player_id)
+    db.commit()
+    session_id = session_store.validate(token)[0]
+
+    # Revoked through another store: this one only hears the session_revoked event
+    other = SessionStore(session_store._secret.decode(), session_store.ttl, 60.0, 100)
+    other.revoke(db, session_id)
+
+    assert session_store.validate(token) is None
+    assert other.validate(token) is None
+
+
+def test_login_me_and_logout(client, player_id):
+    login = client.post("/api/auth/login", json={"email": "alex@example.com"})
+    assert login.status_code == 200
+    headers = {"Authorization": f"Bearer {login.json()['token']}"}
+
+    assert client.get("/api/auth/me", headers=headers).json()["id"] == player_id
+    assert client.get("/api/auth/me").status_code == 200  # session cookie
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+    client.cookies.clear()
+    assert client.get("/api/auth/me").status_code == 401
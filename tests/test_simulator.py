@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from src.simulator import Scenario, build_arrivals, simulate
+
+SMALL = dict(players=40, hours=1.0, arrival_minutes=30.0, burst_minutes=5.0,
+             stay_minutes=(30.0, 60.0), courts="G1:advanced,G2:intermediate,W2:intermediate:2")
+
+
+def test_court_layout_reads_optional_capacities():
+    assert Scenario(courts="G1:advanced,W1:intermediate:2").court_layout() == [
+        ("G1", "advanced", 4), ("W1", "intermediate", 2)
+    ]
+
+
+def test_arrivals_stay_within_the_night():
+    scenario = Scenario(**SMALL)
+    for arrival, departure, qualification in build_arrivals(scenario, random.Random(1)):
+        assert 0 <= arrival <= scenario.arrival_minutes * 60
+        assert arrival <= departure <= scenario.hours * 3600
+        assert qualification in ("advanced", "intermediate")
+
+
+@pytest.mark.parametrize("policy", ["cascade", "priority", "smart"])
+def test_every_policy_runs_a_night(policy):
+    result = simulate(Scenario(**SMALL), policy)
+    assert 0 < result["utilization"] <= 1
+    assert result["games"] > 0
+    assert result["fill_passes"] > 0
+    assert sum(w["placements"] for w in result["waits"].values()) >= result["games"] * 2
+
+
+def test_a_seed_replays_the_same_night():
+    first, second = (simulate(Scenario(**SMALL, seed=7), "cascade") for _ in range(2))
+    for field in ("utilization", "games", "waits", "still_waiting", "fill_passes"):
+        assert first[field] == second[field]
@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database.database import SessionLocal
+from src.database.models import Court, Player
+from src.services.staging import NextUpStaging
+
+START = datetime(2026, 1, 1, 18, 0)
+
+
+@pytest.fixture
+def staging():
+    return NextUpStaging(debounce=0, resync_interval=60)
+
+
+@pytest.fixture
+def floor(db):
+    """Courts 1 and 2 each with a game on (players 1-8); players 9-16 queued in order"""
+    courts = [Court(name=f"G{i}", court_type="intermediate", capacity=4) for i in (1, 2)]
+    db.add_all(courts)
+    db.flush()
+    db.add_all(
+        Player(name=f"Player {i}", qualification="intermediate", is_active=True,
+               court_id=courts[(i - 1) // 4].id, queued_at=START)
+        for i in range(1, 9)
+    )
+    db.add_all(
+        Player(name=f"Player {i}", qualification="intermediate", is_active=True,
+               queued_at=START + timedelta(minutes=i))
+        for i in range(9, 17)
+    )
+    db.commit()
+
+
+def restage(staging):
+    with SessionLocal() as db:
+        return staging.restage(db)
+
+
+def end_game(court_id):
+    """Release the court's players and commit"""
+    with SessionLocal() as db:
+        for player in db.query(Player).filter(Player.court_id == court_id):
+            player.court_id = None
+        db.commit()
+
+
+def finish_game(staging, court_id):
+    """What game rotation does: release the players, promote, commit once"""
+    with SessionLocal() as db:
+        for player in db.query(Player).filter(Player.court_id == court_id):
+            player.court_id = None
+        promoted = sorted(p.id for p in staging.promote(db, court_id))
+        db.commit()
+        return promoted
+
+
+def on_court(court_id):
+    with SessionLocal() as db:
+        return sorted(p.id for p in db.get(Court, court_id).players)
+
+
+def staged_ids(staging, court_id):
+    group = staging.group(court_id)
+    return sorted(p.id for p in group.players) if group else []
+
+
+def test_every_court_gets_its_own_group_in_queue_order(staging, floor):
+    assert restage(staging) == {1, 2}
+    first, second = staged_ids(staging, 1), staged_ids(staging, 2)
+    assert len(first) == len(second) == 4
+    assert not set(first) & set(second)
+    assert set(first) | set(second) == set(range(9, 17))
+    assert staging.court_for(first[0]) == 1
+
+
+def test_promote_puts_the_staged_group_on_the_freed_court(staging, floor):
+    restage(staging)
+    staged = staged_ids(staging, 1)
+
+    assert finish_game(staging, 1) == staged
+    assert on_court(1) == staged
+    assert staging.group(1) is None
+    assert staging.stats["promoted"] == 1
+
+
+def test_promote_skips_a_group_with_a_changed_player_but_keeps_the_release(staging, floor):
+    restage(staging)
+    staged = staged_ids(staging, 1)
+    with SessionLocal() as db:
+        db.get(Player, staged[0]).is_active = False
+        db.commit()
+
+    assert finish_game(staging, 1) == []
+    assert on_court(1) == []
+    assert staging.stats["promote_stale"] == 1
+
+
+def test_promote_skips_a_group_planned_for_a_different_court_setup(client, staging, floor):
+    restage(staging)
+    assert client.put("/api/courts/1", json={"court_type": "training"}).status_code == 200
+
+    assert finish_game(staging, 1) == []
+    assert on_court(1) == []
+    assert staging.stats["promote_stale"] == 1
+
+
+def test_promote_skips_a_group_planned_before_a_capacity_change(client, staging, floor):
+    restage(staging)
+    assert client.put("/api/courts/1", json={"court_type": "intermediate", "capacity": 6}).status_code == 200
+
+    assert finish_game(staging, 1) == []
+    assert staging.stats["promote_stale"] == 1
+
+
+def test_recording_a_result_promotes_in_the_same_commit(client, staging, floor, monkeypatch):
+    from src.api import courts
+
+    monkeypatch.setattr(courts, "next_up", staging)
+    restage(staging)
+    staged = staged_ids(staging, 1)
+
+    response = client.post("/api/courts/1/result", json={"side_a": [1, 2], "side_b": [3, 4], "winner": "A"})
+    assert response.status_code == 200
+    assert on_court(1) == staged
+
+
+def test_fill_pass_gives_a_court_freed_by_hand_its_staged_group(client, staging, floor, monkeypatch):
+    from src.api import queue
+
+    monkeypatch.setattr(queue, "next_up", staging)
+    restage(staging)
+    staged = staged_ids(staging, 2)
+    for player_id in range(5, 9):
+        assert client.post(f"/api/queue/move-to-queue/{player_id}").status_code == 200
+
+    assert client.post("/api/queue/auto-fill-courts").status_code == 200
+    assert on_court(2) == staged
+    assert on_court(1) == [1, 2, 3, 4]
+    assert staging.stats["claimed"] == 1
+
+
+def test_fill_pass_picks_as_usual_for_a_stale_group(client, staging, floor, monkeypatch):
+    from src.api import queue
+
+    monkeypatch.setattr(queue, "next_up", staging)
+    restage(staging)
+    staged = staged_ids(staging, 2)
+    with SessionLocal() as db:
+        db.get(Player, staged[0]).is_active = False
+        db.commit()
+    end_game(2)
+
+    assert client.post("/api/queue/auto-fill-courts").status_code == 200
+    assert len(on_court(2)) == 4
+    assert staged[0] not in on_court(2)
+    assert staging.stats["claim_stale"] == 1
+
+
+def test_changes_only_replan_the_courts_they_touch(staging, floor):
+    restage(staging)
+    assert restage(staging) == set()
+
+    staging.changed(players=[], courts=[2])
+    assert restage(staging) == {2}
+    staging.changed(players=[staged_ids(staging, 1)[0]], courts=[])
+    assert restage(staging) == {1}
+    staging.changed(players=None, courts=None)
+    assert restage(staging) == {1, 2}
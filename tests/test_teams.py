@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.database.database import SessionLocal
+from src.database.models import Court, Player
+from src.services.fairness import pick_keeping_pairs
+
+START = datetime(2026, 1, 1, 18, 0)
+
+
+def test_a_pair_is_placed_when_its_second_member_comes_up():
+    a, b, c, d, e = (SimpleNamespace(id=i) for i in range(1, 6))
+    pairs = {1: c, 3: a}
+    assert pick_keeping_pairs([a, b, c, d, e], 4, lambda p: pairs.get(p.id)) == [b, a, c, d]
+
+
+def test_a_pair_that_no_longer_fits_is_skipped():
+    a, b, c, d, e = (SimpleNamespace(id=i) for i in range(1, 6))
+    pairs = {3: e, 5: c}
+    assert pick_keeping_pairs([a, b, c, d, e], 4, lambda p: pairs.get(p.id)) == [a, b, d]
+
+
+@pytest.fixture
+def player_ids(db):
+    """Six intermediate players queued in id order, and one advanced player"""
+    db.add_all(
+        Player(name=f"Player {i}", email=f"player{i}@example.com", qualification="intermediate",
+               is_active=True, queued_at=START + timedelta(minutes=i))
+        for i in range(1, 7)
+    )
+    db.add(Player(name="Player 7", qualification="advanced", is_active=True))
+    db.commit()
+    return [p.id for p in db.query(Player).order_by(Player.id)]
+
+
+def test_pairs_are_created_listed_and_split(client, player_ids):
+    created = client.post("/api/teams/", json={"player_ids": [1, 3]})
+    assert created.status_code == 200
+    team_id = created.json()["id"]
+    assert sorted(p["id"] for p in client.get(f"/api/teams/{team_id}").json()["players"]) == [1, 3]
+    assert [t["id"] for t in client.get("/api/teams/").json()] == [team_id]
+
+    assert client.delete(f"/api/teams/{team_id}").status_code == 200
+    assert client.get(f"/api/teams/{team_id}").status_code == 404
+    with SessionLocal() as db:
+        assert db.get(Player, 1).team_id is None
+
+
+@pytest.mark.parametrize("player_ids_in_team, status", [
+    ([1, 1], 400),     # the same player twice
+    ([1, 7], 400),     # different qualifications
+    ([1, 99], 404),    # unknown player
+])
+def test_invalid_pairs_are_rejected(client, player_ids, player_ids_in_team, status):
+    assert client.post("/api/teams/", json={"player_ids": player_ids_in_team}).status_code == status
+
+
+def test_a_player_can_only_be_in_one_pair(client, player_ids):
+    assert client.post("/api/teams/", json={"player_ids": [1, 2]}).status_code == 200
+    assert client.post("/api/teams/", json={"player_ids": [1, 3]}).status_code == 400
+
+
+def test_a_logged_in_player_pairs_with_a_partner_by_email(client, player_ids):
+    login = client.post("/api/auth/login", json={"email": "player1@example.com"})
+    response = client.post("/api/teams/partner", json={"partner_email": "player2@example.com"},
+                           headers={"Authorization": f"Bearer {login.json()['token']}"})
+    assert response.status_code == 200
+    assert sorted(p["id"] for p in response.json()["players"]) == [1, 2]
+
+
+def on_court(court_id):
+    with SessionLocal() as db:
+        return sorted(p.id for p in db.query(Player).filter(Player.court_id == court_id))
+
+
+def test_the_fill_pass_puts_a_pair_on_court_together(client, db, player_ids):
+    db.add(Court(name="G1", court_type="intermediate", capacity=4))
+    db.commit()
+    assert client.post("/api/teams/", json={"player_ids": [1, 3]}).status_code == 200
+
+    assert client.post("/api/queue/auto-fill-courts").status_code == 200
+    placed = on_court(1)
+    assert len(placed) == 4
+    assert {1, 3} <= set(placed)
+
+
+def test_a_player_waits_while_their_partner_is_still_playing(client, db, player_ids):
+    db.add_all([Court(name="G1", court_type="intermediate", capacity=4),
+                Court(name="G2", court_type="intermediate", capacity=1)])
+    db.commit()
+    assert client.post("/api/teams/", json={"player_ids": [1, 6]}).status_code == 200
+    assert client.post("/api/queue/move-to-court/6/2").status_code == 200
+
+    assert client.post("/api/queue/auto-fill-courts").status_code == 200
+    assert on_court(1) == [2, 3, 4, 5]
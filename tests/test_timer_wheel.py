@@ -0,0 +1,56 @@
+from src.services.timer_wheel import TimerWheel
+
+
+def test_timers_fire_once_their_tick_passes():
+    wheel = TimerWheel(tick=1.0, size=8)
+    wheel.advance(0)
+    wheel.schedule("a", 2.5, "payload-a")
+    wheel.schedule("b", 1.0)
+
+    assert wheel.advance(1) == [("b", None)]
+    assert wheel.advance(2) == []
+    assert wheel.advance(3) == [("a", "payload-a")]
+    assert len(wheel) == 0
+
+
+def test_schedule_moves_and_cancel_removes():
+    wheel = TimerWheel(tick=1.0, size=8)
+    wheel.advance(0)
+    wheel.schedule("a", 2)
+    wheel.schedule("a", 5)
+    wheel.schedule("b", 3)
+    wheel.cancel("b")
+    wheel.cancel("missing")
+
+    assert "b" not in wheel
+    assert wheel.advance(4) == []
+    assert wheel.advance(5) == [("a", None)]
+
+
+def test_deadlines_beyond_one_revolution_wait_for_their_turn():
+    wheel = TimerWheel(tick=1.0, size=8)
+    wheel.advance(0)
+    wheel.schedule("far", 11)  # same slot as tick 3
+
+    assert wheel.advance(3) == []
+    assert wheel.advance(10) == []
+    assert wheel.advance(11) == [("far", None)]
+
+
+def test_overdue_timers_fire_on_the_first_advance_and_next_tick_after():
+    wheel = TimerWheel(tick=1.0, size=8)
+    wheel.schedule("overdue", 95)
+    assert wheel.advance(100) == [("overdue", None)]
+
+    wheel.schedule("late", 50)
+    assert wheel.advance(100) == []
+    assert wheel.advance(101) == [("late", None)]
+
+
+def test_a_long_pause_visits_at_most_one_revolution():
+    wheel = TimerWheel(tick=1.0, size=8)
+    wheel.advance(0)
+    wheel.schedule("a", 3)
+    wheel.schedule("b", 6)
+
+    assert sorted(wheel.advance(1000)) == [("a", None), ("b", None)]
@@ -0,0 +1,61 @@
+import pytest
+
+from src.database.models import Court
+from src.services.topology import CourtTopology
+
+
+def topology(*courts):
+    """Courts as (id, name, feeds_court_id, fill_priority)"""
+    return CourtTopology(courts)
+
+
+def test_courts_come_before_the_courts_that_feed_them():
+    layout = topology((1, "G1", None, 0), (2, "W1", 1, 0), (3, "X1", 2, 0))
+    assert layout.order == [1, 2, 3]
+    assert layout.feeds == {2: 1, 3: 2}
+    assert layout.feeders[1] == [2]
+
+
+def test_fill_priority_orders_courts_within_a_level():
+    layout = topology((1, "A", None, 0), (2, "B", None, 5), (3, "C", 1, 0), (4, "D", 1, 2))
+    assert layout.order == [2, 1, 4, 3]
+    assert layout.feeders[1] == [4, 3]
+
+
+def test_without_links_w_courts_feed_their_g_courts():
+    layout = topology((1, "G1", None, 0), (2, "G2", None, 0), (3, "W1", None, 0), (4, "W3", None, 0))
+    assert layout.feeds == {3: 1}
+
+
+def test_a_cycle_is_broken_instead_of_looping():
+    layout = topology((1, "A", 2, 0), (2, "B", 1, 0), (3, "C", None, 0))
+    assert len(layout.feeds) == 1
+    assert sorted(layout.order) == [1, 2, 3]
+
+
+@pytest.fixture
+def courts(db):
+    db.add_all(Court(name=name, court_type="intermediate") for name in ("G1", "W1", "X1"))
+    db.commit()
+    return {c.name: c.id for c in db.query(Court)}
+
+
+def test_topology_is_set_and_described_through_the_api(client, courts):
+    assert client.put(f"/api/courts/{courts['X1']}/topology",
+                      json={"feeds_court_id": courts["W1"], "fill_priority": 0}).status_code == 200
+    assert client.put(f"/api/courts/{courts['W1']}/topology",
+                      json={"feeds_court_id": courts["G1"], "fill_priority": 0}).status_code == 200
+
+    assert client.get("/api/courts/topology").json() == {
+        "order": ["G1", "W1", "X1"], "feeds": {"W1": "G1", "X1": "W1"}
+    }
+
+
+def test_links_that_would_close_a_loop_are_rejected(client, courts):
+    assert client.put(f"/api/courts/{courts['W1']}/topology",
+                      json={"feeds_court_id": courts["G1"], "fill_priority": 0}).status_code == 200
+    response = client.put(f"/api/courts/{courts['G1']}/topology",
+                          json={"feeds_court_id": courts["W1"], "fill_priority": 0})
+    assert response.status_code == 400
+    assert client.put(f"/api/courts/{courts['G1']}/topology",
+                      json={"feeds_court_id": courts["G1"], "fill_priority": 0}).status_code == 400
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.database.database import SessionLocal
+from src.database.models import Court, Player
+
+
+@pytest.fixture
+def player_id(db):
+    player = Player(name="Alex", qualification="advanced", is_active=False)
+    db.add(player)
+    db.commit()
+    return player.id
+
+
+def test_update_with_the_current_version_bumps_it(client, player_id):
+    response = client.put(f"/api/players/{player_id}", json={"name": "Alexa", "version": 1})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+
+def test_update_from_a_stale_view_is_a_409_with_the_current_row(client, player_id):
+    assert client.put(f"/api/players/{player_id}", json={"name": "Alexa", "version": 1}).status_code == 200
+
+    response = client.put(f"/api/players/{player_id}", json={"name": "Sam", "version": 1})
+    assert response.status_code == 409
+    current = response.json()["detail"]["current"]
+    assert (current["name"], current["version"]) == ("Alexa", 2)
+
+
+def test_update_without_a_version_is_last_write_wins(client, player_id):
+    assert client.put(f"/api/players/{player_id}", json={"name": "Alexa"}).status_code == 200
+    assert client.put(f"/api/players/{player_id}", json={"name": "Sam"}).json()["version"] == 3
+
+
+def test_court_edits_are_versioned_too(client, db):
+    court = Court(name="G1", court_type="advanced")
+    db.add(court)
+    db.commit()
+
+    assert client.put(f"/api/courts/{court.id}", json={"name": "G1a", "version": 1}).status_code == 200
+    assert client.put(f"/api/courts/{court.id}", json={"name": "G1b", "version": 1}).status_code == 409
+
+
+def test_concurrent_orm_writes_lose_the_race_with_stale_data(client, player_id):
+    with SessionLocal() as first, SessionLocal() as second:
+        first.get(Player, player_id).name = "First"
+        second.get(Player, player_id).name = "Second"
+        first.commit()
+        with pytest.raises(StaleDataError):
+            second.commit()
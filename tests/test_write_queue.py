@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Base, Court, Player
+from src.database.write_queue import WriteQueue
+from src.services.locks import try_runner_lock
+
+TIMEOUT = 1.0
+
+
+@pytest.fixture
+def queued_sessions(tmp_path):
+    """A SQLite file with WAL and the write queue attached, as with SQLITE_WRITE_QUEUE=1"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(TIMEOUT * 1000)}")
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.close()
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    write_queue = WriteQueue(timeout=TIMEOUT)
+    write_queue.attach(session_factory)
+    Base.metadata.create_all(bind=engine)
+    with session_factory() as db:
+        db.add(Court(name="G1", court_type="intermediate"))
+        db.add_all(Player(name=f"Player {i}", qualification="intermediate", is_active=True) for i in range(2))
+        db.commit()
+    yield session_factory, write_queue
+    engine.dispose()
+
+
+def test_sessions_carry_their_write_queue(queued_sessions):
+    session_factory, write_queue = queued_sessions
+    with session_factory(info={"source": "test"}) as db:
+        assert db.info["write_queue"] is write_queue
+        assert db.info["source"] == "test"
+
+
+def test_runner_lock_waits_its_turn_with_queued_writes(queued_sessions):
+    """A runner-locked job and a request write both finish, neither waits out the timeout"""
+    session_factory, write_queue = queued_sessions
+    locked = threading.Event()
+    errors = []
+
+    def runner_job():
+        with session_factory() as db:
+            try:
+                assert try_runner_lock(db, "test-runner")
+                locked.set()
+                # Let the request queue up behind the runner before it writes
+                deadline = time.monotonic() + TIMEOUT / 2
+                while write_queue.status()["waiting"] == 0 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                db.get(Player, 1).court_id = 1
+                db.commit()
+            except Exception as e:
+                errors.append(e)
+
+    def request_write():
+        locked.wait()
+        with session_factory() as db:
+            try:
+                db.get(Player, 2).court_id = 1
+                db.commit()
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=runner_job), threading.Thread(target=request_write)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert time.monotonic() - started < TIMEOUT
+    status = write_queue.status()
+    assert (status["active"], status["waiting"], status["max_waiting"]) == (False, 0, 1)
+    with session_factory() as db:
+        assert [p.court_id for p in db.query(Player).order_by(Player.id)] == [1, 1]
+
+
+def test_runner_lock_gives_up_when_the_turn_times_out(queued_sessions):
+    session_factory, write_queue = queued_sessions
+    with session_factory() as holder, session_factory() as db:
+        write_queue.acquire(holder)
+        write_queue.timeout = 0.05
+        assert not try_runner_lock(db, "test-runner")
+        write_queue.release(holder)